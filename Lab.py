@@ -1,225 +1,24 @@
-import sqlite3
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QLineEdit, QComboBox, QTableWidget, QTableWidgetItem, QScrollArea, QMessageBox, QHBoxLayout, QGridLayout
-import json
-import re
-import csv
-from typing import List, Union
-
-class Person:
-    """
-    This is a base class representation of a person in the School Management System.
-
-    :param name: The name of the person
-    :type name: str
-    :param age: The age of the person
-    :type age: int
-    :param email: The email address of the person
-    :type email: str
-    """
-
-    def __init__(self, name: str, age: int, email: str):
-
-        self.name = name
-        self.age = age
-        self._email = email
-
-    def introduce(self):
-        """
-        Prints an introduction of the person.
-        """
-        print(f"Hi, I'm {self.name}, {self.age} years old.")
-
-
-
-
-class Student(Person):
-    """
-    This class represents a student in the School Management System. It inherits from the Person class.
-
-    :param name: The name of the student
-    :type name: str
-    :param age: The age of the student
-    :type age: int
-    :param email: The email address of the student
-    :type email: str
-    :param student_id: The unique identifier for the student
-    :type student_id: str
-    """
-
-    def __init__(self, name: str, age: int, email: str, student_id: str):
-
-        super().__init__(name, age, email)
-        self.student_id = student_id
-        self.registered_courses: List[Course] = []
-
-    def register_course(self, course: 'Course'):
-        """
-        Registers the student for a course.
-
-        :param course: The course to register for
-        :type course: Course
-        """
-        self.registered_courses.append(course)
-        print(f"{self.name} has registered for {course.course_name}.")
-
-
-class Instructor(Person):
-    """
-    This class represents an instructor in the School Management System. It inherits from the Person class.
-
-    :param name: The name of the instructor
-    :type name: str
-    :param age: The age of the instructor
-    :type age: int
-    :param email: The email address of the instructor
-    :type email: str
-    :param instructor_id: The unique identifier for the instructor
-    :type instructor_id: str
-    """
-
-    def __init__(self, name: str, age: int, email: str, instructor_id: str):
-
-        super().__init__(name, age, email)
-        self.instructor_id = instructor_id
-        self.assigned_courses: List['Course'] = []
-
-    def assign_course(self, course: 'Course'):
-        """
-        Assigns a course to the instructor.
-
-        :param course: The course to assign
-        :type course: Course
-        """
-        self.assigned_courses.append(course)
-        print(f"{self.name} is assigned to teach {course.course_name}.")
-
-
-class Course:
-    """
-    This class represents a course in the School Management System.
-
-    :param course_id: The unique identifier for the course
-    :type course_id: str
-    :param course_name: The name of the course
-    :type course_name: str
-    :param instructor: The instructor teaching the course
-    :type instructor: Instructor
-    """
-
-    def __init__(self, course_id: str, course_name: str, instructor: Instructor):
-
-        self.course_id = course_id
-        self.course_name = course_name
-        self.instructor = instructor
-        self.enrolled_students: List[Student] = []
-
-    def add_student(self, student: Student):
-        """
-        Adds a student to the course.
-
-        :param student: The student to add to the course
-        :type student: Student
-        """
-        self.enrolled_students.append(student)
-        print(f"{student.name} has been added to {self.course_name}.")
-
-
-def create_tables():
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-
-    cursor.execute('''CREATE TABLE IF NOT EXISTS students (
-        student_id TEXT PRIMARY KEY,
-        name TEXT,
-        age INTEGER,
-        email TEXT
-    )''')
-
-    cursor.execute('''CREATE TABLE IF NOT EXISTS instructors (
-        instructor_id TEXT PRIMARY KEY,
-        name TEXT,
-        age INTEGER,
-        email TEXT
-    )''')
-
-    cursor.execute('''CREATE TABLE IF NOT EXISTS courses (
-        course_id TEXT PRIMARY KEY,
-        course_name TEXT,
-        instructor_id TEXT,
-        FOREIGN KEY (instructor_id) REFERENCES instructors (instructor_id)
-    )''')
-
-    cursor.execute('''CREATE TABLE IF NOT EXISTS registrations (
-        student_id TEXT,
-        course_id TEXT,
-        FOREIGN KEY (student_id) REFERENCES students (student_id),
-        FOREIGN KEY (course_id) REFERENCES courses (course_id),
-        PRIMARY KEY (student_id, course_id)
-    )''')
-
-    conn.commit()
-    conn.close()
-
-def save_data_to_file(data: List[Union[Student, Instructor, Course]], filename: str):
-    """
-    Saves data to a JSON file.
-
-    :param data: The list of objects to save
-    :type data: List[Union[Student, Instructor, Course]]
-    :param filename: The name of the file to save the data to
-    :type filename: str
-    """
-    with open(filename, 'w') as f:
-        json.dump([obj.__dict__ for obj in data], f)
-
-
-def load_data_from_file(filename: str, class_type: type) -> List[Union[Student, Instructor, Course]]:
-    """
-    Loads data from a JSON file.
-
-    :param filename: The name of the file to load the data from
-    :type filename: str
-    :param class_type: The type of class to instantiate (Student, Instructor, or Course)
-    :type class_type: type
-    :return: A list of instantiated objects
-    :rtype: List[Union[Student, Instructor, Course]]
-    """
-    with open(filename, 'r') as f:
-        data = json.load(f)
-    return [class_type(**item) for item in data]
-
-
-def is_valid_email(email: str) -> bool:
-    """
-    Checks if an email address is valid.
-
-    :param email: The email address to validate
-    :type email: str
-    :return: True if the email is valid, False otherwise
-    :rtype: bool
-    """
-    return re.match(r"[^@]+@[^@]+\.[^@]+", email) is not None
-
-
-def validate_person_data(name: str, age: int, email: str):
-    """
-    Validates the data for a person (Student or Instructor).
-
-    :param name: The name to validate
-    :type name: str
-    :param age: The age to validate
-    :type age: int
-    :param email: The email address to validate
-    :type email: str
-    :raises ValueError: If any of the data is invalid
-    """
-    if not name:
-        raise ValueError("Name cannot be empty")
-    if age < 0:
-        raise ValueError("Age cannot be negative")
-    if not is_valid_email(email):
-        raise ValueError("Invalid email format")
-
+import argparse
+import sys
+from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QLineEdit, QComboBox, QTableView, QScrollArea, QMessageBox, QHBoxLayout, QGridLayout, QCheckBox, QProgressDialog, QSpinBox, QShortcut, QListView, QAbstractItemView
+from PyQt5.QtCore import QThreadPool, Qt
+from PyQt5.QtGui import QKeySequence
+from typing import Any, Callable, Optional, Union
+from database import DB_PATH_ENV, DEFAULT_DB_PATH, RECORDS_SQL, Database, get_database, set_database
+from models import Course, Instructor, Person, Student, create_tables, load_data_from_file, save_data_to_file
+from search import build_search_query
+from snapshot import BINARY_FORMAT, JSON_LINES_FORMAT, load_snapshot, save_snapshot
+from combo_model import ChoiceListModel, attach_choices
+from diagnostics import DiagnosticsPanel
+from metrics import get_metrics
+from profiling import get_profiler
+from paging import KeysetPager
+from reports import REPORTS, create_report_summaries, drop_report_summaries, has_report_summaries, run_report
+from table_model import RecordTableModel
+from validation import is_valid_email, validate_person_data
+from csv_io import errors_path
+from repository import SchoolRepository, StudentFilter
+from workers import DatabaseWriter, ExportTask, ImportTask, SearchController
 
 class SchoolManagementSystem(QMainWindow):
     """
@@ -227,7 +26,8 @@ class SchoolManagementSystem(QMainWindow):
     Attributes:
         layout (QVBoxLayout): The main layout of the application window
         instructor_combo_options (list): A list of instructor options for combo boxes
-        table (QTableWidget): The table widget for displaying records
+        table (QTableView): The table view for displaying records, created on first use
+        records_model (RecordTableModel): The model streaming records into the table
         student_id_input (QLineEdit): Input field for student ID
         student_name_input (QLineEdit): Input field for student name
         student_age_input (QLineEdit): Input field for student age
@@ -241,7 +41,33 @@ class SchoolManagementSystem(QMainWindow):
         course_instructor_combo (QComboBox): Combo box for selecting course instructor
         student_combo (QComboBox): Combo box for selecting a student
         course_combo (QComboBox): Combo box for selecting a course
+        student_choices (ChoiceListModel): Student choices shared by the student combo boxes
+        instructor_choices (ChoiceListModel): Instructor choices shared by the instructor combo boxes
+        course_choices (ChoiceListModel): Course choices shared by the course combo boxes
+        batch_student_list (QListView): Multi-select list of the students to register in one batch
+        batch_course_list (QListView): Multi-select list of the courses to register them to
+        batch_prefix_input (QLineEdit): Input field for an ID prefix selecting the students instead of the list
+        browse_combo (QComboBox): Combo box for choosing between all records and paging through one record type
+        page_size_spin (QSpinBox): Spin box for the number of records per page
+        previous_page_button (QPushButton): Button for showing the previous page
+        next_page_button (QPushButton): Button for showing the next page
+        jump_input (QLineEdit): Input field for the ID a page should start at
+        page_label (QLabel): Label describing the page shown
+        pager (KeysetPager): Pages through the record type being browsed, if any
+        report_combo (QComboBox): Combo box for choosing the report to show
+        report_summaries_check (QCheckBox): Check box for keeping report totals in trigger-maintained summary tables
         search_input (QLineEdit): Input field for search queries
+        snapshot_format_combo (QComboBox): Combo box for choosing the format used by Save Data and Load Data
+        search_controller (SearchController): Runs debounced searches on a worker thread as the user types
+        export_per_entity_check (QCheckBox): Check box for exporting one CSV file per entity
+        export_gzip_check (QCheckBox): Check box for gzip-compressing exported CSV files
+        export_task (ExportTask): The CSV export running in the background, if any
+        import_task (ImportTask): The CSV import running in the background, if any
+        writer (DatabaseWriter): Runs the add, update, delete and register writes off the GUI thread,
+            through the repository interface
+        metrics (Metrics): Times the button handlers and traces their SQL when enabled
+        profiler (Profiler): Profiles the slow handlers with cProfile and tracemalloc when enabled
+        diagnostics_panel (DiagnosticsPanel): Shows the metrics, opened with Ctrl+Shift+D
     """
     def __init__(self):
         """
@@ -261,6 +87,20 @@ class SchoolManagementSystem(QMainWindow):
 
         self.instructor_combo_options = []
         self.table = None
+        self.records_model = None
+        self.pager = None
+        self.export_task = None
+        self.export_progress = None
+        self.import_task = None
+        self.import_progress = None
+        self.db = get_database()
+        self.metrics = get_metrics()
+        self.profiler = get_profiler()
+        self.diagnostics_panel = None
+        self.writer = DatabaseWriter(self.db, parent=self)
+        self.student_choices = ChoiceListModel(self.db, 'students', 'student_id', 'name', parent=self)
+        self.instructor_choices = ChoiceListModel(self.db, 'instructors', 'instructor_id', 'name', parent=self)
+        self.course_choices = ChoiceListModel(self.db, 'courses', 'course_id', 'course_name', parent=self)
 
         self.setup_ui()
 
@@ -289,11 +129,11 @@ class SchoolManagementSystem(QMainWindow):
 
         student_button_layout = QHBoxLayout()
         self.add_student_button = QPushButton("Add Student")
-        self.add_student_button.clicked.connect(self.add_student)
+        self.add_student_button.clicked.connect(self.instrumented('add_student'))
         self.update_student_button = QPushButton("Update Student")
-        self.update_student_button.clicked.connect(self.update_student)
+        self.update_student_button.clicked.connect(self.instrumented('update_student'))
         self.delete_student_button = QPushButton("Delete Student")
-        self.delete_student_button.clicked.connect(self.delete_student)
+        self.delete_student_button.clicked.connect(self.instrumented('delete_student'))
         student_button_layout.addWidget(self.add_student_button)
         student_button_layout.addWidget(self.update_student_button)
         student_button_layout.addWidget(self.delete_student_button)
@@ -320,11 +160,11 @@ class SchoolManagementSystem(QMainWindow):
 
         instructor_button_layout = QHBoxLayout()
         self.add_instructor_button = QPushButton("Add Instructor")
-        self.add_instructor_button.clicked.connect(self.add_instructor)
+        self.add_instructor_button.clicked.connect(self.instrumented('add_instructor'))
         self.update_instructor_button = QPushButton("Update Instructor")
-        self.update_instructor_button.clicked.connect(self.update_instructor)
+        self.update_instructor_button.clicked.connect(self.instrumented('update_instructor'))
         self.delete_instructor_button = QPushButton("Delete Instructor")
-        self.delete_instructor_button.clicked.connect(self.delete_instructor)
+        self.delete_instructor_button.clicked.connect(self.instrumented('delete_instructor'))
         instructor_button_layout.addWidget(self.add_instructor_button)
         instructor_button_layout.addWidget(self.update_instructor_button)
         instructor_button_layout.addWidget(self.delete_instructor_button)
@@ -338,6 +178,7 @@ class SchoolManagementSystem(QMainWindow):
         self.course_id_input = QLineEdit()
         self.course_name_input = QLineEdit()
         self.course_instructor_combo = QComboBox()
+        attach_choices(self.course_instructor_combo, self.instructor_choices)
         
         course_layout.addWidget(QLabel("Course ID:"), 0, 0)
         course_layout.addWidget(self.course_id_input, 0, 1)
@@ -348,11 +189,11 @@ class SchoolManagementSystem(QMainWindow):
 
         course_button_layout = QHBoxLayout()
         self.add_course_button = QPushButton("Add Course")
-        self.add_course_button.clicked.connect(self.add_course)
+        self.add_course_button.clicked.connect(self.instrumented('add_course'))
         self.update_course_button = QPushButton("Update Course")
-        self.update_course_button.clicked.connect(self.update_course)
+        self.update_course_button.clicked.connect(self.instrumented('update_course'))
         self.delete_course_button = QPushButton("Delete Course")
-        self.delete_course_button.clicked.connect(self.delete_course)
+        self.delete_course_button.clicked.connect(self.instrumented('delete_course'))
         course_button_layout.addWidget(self.add_course_button)
         course_button_layout.addWidget(self.update_course_button)
         course_button_layout.addWidget(self.delete_course_button)
@@ -364,7 +205,9 @@ class SchoolManagementSystem(QMainWindow):
         self.layout.addLayout(registration_layout)
 
         self.student_combo = QComboBox()
+        attach_choices(self.student_combo, self.student_choices)
         self.course_combo = QComboBox()
+        attach_choices(self.course_combo, self.course_choices)
         
         registration_layout.addWidget(QLabel("Student:"), 0, 0)
         registration_layout.addWidget(self.student_combo, 0, 1)
@@ -372,59 +215,160 @@ class SchoolManagementSystem(QMainWindow):
         registration_layout.addWidget(self.course_combo, 1, 1)
 
         self.register_button = QPushButton("Register Student to Course")
-        self.register_button.clicked.connect(self.register_student_to_course)
+        self.register_button.clicked.connect(self.instrumented('register_student_to_course'))
         registration_layout.addWidget(self.register_button, 2, 0, 1, 2)
 
+        self.batch_student_list = QListView()
+        self.batch_student_list.setModel(self.student_choices)
+        self.batch_student_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.batch_course_list = QListView()
+        self.batch_course_list.setModel(self.course_choices)
+        self.batch_course_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.batch_prefix_input = QLineEdit()
+        self.batch_prefix_input.setPlaceholderText("Or every student whose ID starts with")
+        self.batch_register_button = QPushButton("Register Selected Students to Selected Courses")
+        self.batch_register_button.clicked.connect(self.instrumented('register_selected'))
+        registration_layout.addWidget(QLabel("Students:"), 3, 0)
+        registration_layout.addWidget(self.batch_student_list, 3, 1)
+        registration_layout.addWidget(QLabel("Courses:"), 4, 0)
+        registration_layout.addWidget(self.batch_course_list, 4, 1)
+        registration_layout.addWidget(self.batch_prefix_input, 5, 1)
+        registration_layout.addWidget(self.batch_register_button, 6, 0, 1, 2)
+
         # Other buttons
         self.display_records_button = QPushButton("Display Records")
-        self.display_records_button.clicked.connect(self.display_records)
+        self.display_records_button.clicked.connect(self.instrumented('display_records'))
         self.layout.addWidget(self.display_records_button)
 
+        browse_layout = QHBoxLayout()
+        self.browse_combo = QComboBox()
+        self.browse_combo.addItem("All records", None)
+        self.browse_combo.addItem("Students", 'students')
+        self.browse_combo.addItem("Instructors", 'instructors')
+        self.browse_combo.addItem("Courses", 'courses')
+        self.browse_combo.currentIndexChanged.connect(self.display_records)
+        self.page_size_spin = QSpinBox()
+        self.page_size_spin.setRange(10, 1000)
+        self.page_size_spin.setSingleStep(10)
+        self.page_size_spin.setValue(100)
+        self.page_size_spin.valueChanged.connect(self.change_page_size)
+        self.previous_page_button = QPushButton("Previous")
+        self.previous_page_button.clicked.connect(self.instrumented('previous_page'))
+        self.next_page_button = QPushButton("Next")
+        self.next_page_button.clicked.connect(self.instrumented('next_page'))
+        self.jump_input = QLineEdit()
+        self.jump_input.setPlaceholderText("Jump to ID")
+        self.jump_input.returnPressed.connect(self.instrumented('jump_to_record'))
+        self.page_label = QLabel()
+        browse_layout.addWidget(QLabel("Browse:"))
+        browse_layout.addWidget(self.browse_combo)
+        browse_layout.addWidget(QLabel("Page size:"))
+        browse_layout.addWidget(self.page_size_spin)
+        browse_layout.addWidget(self.previous_page_button)
+        browse_layout.addWidget(self.next_page_button)
+        browse_layout.addWidget(self.jump_input)
+        browse_layout.addWidget(self.page_label)
+        self.layout.addLayout(browse_layout)
+        self.update_page_controls()
+
+        report_layout = QHBoxLayout()
+        self.report_combo = QComboBox()
+        for name, (title, _, _, _) in REPORTS.items():
+            self.report_combo.addItem(title, name)
+        self.show_report_button = QPushButton("Show Report")
+        self.show_report_button.clicked.connect(self.instrumented('show_report'))
+        self.report_summaries_check = QCheckBox("Keep report totals up to date")
+        self.report_summaries_check.setChecked(has_report_summaries(self.db))
+        self.report_summaries_check.toggled.connect(self.set_report_summaries)
+        report_layout.addWidget(QLabel("Report:"))
+        report_layout.addWidget(self.report_combo)
+        report_layout.addWidget(self.show_report_button)
+        report_layout.addWidget(self.report_summaries_check)
+        self.layout.addLayout(report_layout)
+
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_button = QPushButton("Search")
-        self.search_button.clicked.connect(self.search_records)
+        self.search_button.clicked.connect(self.instrumented('search_records'))
+        self.search_controller = SearchController(self.db, parent=self)
+        self.search_controller.started.connect(self.on_search_started)
+        self.search_controller.rows_ready.connect(self.on_search_rows)
+        self.search_controller.failed.connect(self.on_search_failed)
+        self.search_input.textChanged.connect(self.search_as_you_type)
         search_layout.addWidget(QLabel("Search:"))
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(self.search_button)
         self.layout.addLayout(search_layout)
 
+        snapshot_layout = QHBoxLayout()
+        self.snapshot_format_combo = QComboBox()
+        self.snapshot_format_combo.addItem("JSON Lines", JSON_LINES_FORMAT)
+        self.snapshot_format_combo.addItem("Binary (columnar)", BINARY_FORMAT)
+        snapshot_layout.addWidget(QLabel("Snapshot format:"))
+        snapshot_layout.addWidget(self.snapshot_format_combo)
+        self.layout.addLayout(snapshot_layout)
+
         self.save_button = QPushButton("Save Data")
-        self.save_button.clicked.connect(self.save_data)
+        self.save_button.clicked.connect(self.instrumented('save_data'))
         self.layout.addWidget(self.save_button)
 
         self.load_button = QPushButton("Load Data")
-        self.load_button.clicked.connect(self.load_data)
+        self.load_button.clicked.connect(self.instrumented('load_data'))
         self.layout.addWidget(self.load_button)
 
+        export_layout = QHBoxLayout()
         self.export_button = QPushButton("Export to CSV")
-        self.export_button.clicked.connect(self.export_to_csv)
-        self.layout.addWidget(self.export_button)
+        self.export_button.clicked.connect(self.instrumented('export_to_csv'))
+        self.export_per_entity_check = QCheckBox("One file per entity")
+        self.export_gzip_check = QCheckBox("Gzip")
+        export_layout.addWidget(self.export_button)
+        export_layout.addWidget(self.export_per_entity_check)
+        export_layout.addWidget(self.export_gzip_check)
+        self.import_button = QPushButton("Import from CSV")
+        self.import_button.clicked.connect(self.instrumented('import_from_csv'))
+        export_layout.addWidget(self.import_button)
+        self.layout.addLayout(export_layout)
+
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.show_diagnostics)
 
         self.update_dropdowns()
 
-    def update_dropdowns(self):
-        """Updates the combo boxes with the latest data from the database."""
-        self.course_instructor_combo.clear()
-        self.student_combo.clear()
-        self.course_combo.clear()
+    def instrumented(self, name: str) -> Callable[[], Any]:
+        """
+        Returns a handler of the window wrapped for metrics and, when it is selected, profiling.
 
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
+        :param name: The name of the handler method
+        :type name: str
+        :return: The wrapped handler
+        :rtype: Callable[[], Any]
+        """
+        return self.metrics.instrument(name, self.profiler.wrap(name, getattr(self, name)))
 
-        cursor.execute("SELECT instructor_id, name FROM instructors")
-        instructors = cursor.fetchall()
-        self.course_instructor_combo.addItems([f"{i[0]} - {i[1]}" for i in instructors])
+    def show_diagnostics(self):
+        """Opens the hidden diagnostics panel."""
+        if self.diagnostics_panel is None:
+            self.diagnostics_panel = DiagnosticsPanel(self.metrics, self.profiler, parent=self)
+        self.diagnostics_panel.refresh()
+        self.diagnostics_panel.show()
+        self.diagnostics_panel.raise_()
 
-        cursor.execute("SELECT student_id, name FROM students")
-        students = cursor.fetchall()
-        self.student_combo.addItems([f"{s[0]} - {s[1]}" for s in students])
+    def closeEvent(self, event):
+        """
+        Commits the queued writes before the window closes.
 
-        cursor.execute("SELECT course_id, course_name FROM courses")
-        courses = cursor.fetchall()
-        self.course_combo.addItems([f"{c[0]} - {c[1]}" for c in courses])
+        :param event: The close event
+        :type event: QCloseEvent
+        """
+        self.writer.close()
+        if self.records_model is not None:
+            self.records_model.close()
+        super().closeEvent(event)
 
-        conn.close()
+    def update_dropdowns(self):
+        """Reloads the choice models behind the combo boxes from the database."""
+        self.instructor_choices.reload()
+        self.student_choices.reload()
+        self.course_choices.reload()
 
     def show_popup(self, message, is_error=False):
         """
@@ -457,9 +401,13 @@ class SchoolManagementSystem(QMainWindow):
             validate_person_data(name, age, email)
 
             student = Student(name, age, email, student_id)
-            self.add_to_database('students', student)
-            self.show_popup(f"Student {name} added successfully.")
-            self.update_dropdowns()
+
+            def added(_):
+                self.show_popup(f"Student {name} added successfully.")
+                self.student_choices.insert(student_id, name)
+
+            self.add_to_database('students', student, added,
+                                 lambda message: self.show_popup(f"Error adding student: {message}", is_error=True))
         except ValueError as e:
             self.show_popup(f"Error adding student: {str(e)}", is_error=True)
 
@@ -473,42 +421,28 @@ class SchoolManagementSystem(QMainWindow):
 
             validate_person_data(name, age, email)
 
-            conn = sqlite3.connect('school_management.db')
-            cursor = conn.cursor()
-            cursor.execute("UPDATE students SET name=?, age=?, email=? WHERE student_id=?",
-                           (name, age, email, student_id))
-            conn.commit()
-            conn.close()
+            def updated(_):
+                self.show_popup(f"Student {name} updated successfully.")
+                self.student_choices.update(student_id, name)
 
-            self.show_popup(f"Student {name} updated successfully.")
-            self.update_dropdowns()
+            self.writer.submit(lambda repository: repository.update_student(student_id, name, age, email), updated,
+                               lambda message: self.show_popup(f"Error updating student: {message}", is_error=True))
         except ValueError as e:
             self.show_popup(f"Error updating student: {str(e)}", is_error=True)
 
     def delete_student(self):
-        """Deletes a student from the database."""
+        """Deletes a student and their registrations from the database."""
         student_id = self.student_id_input.text()
         if not student_id:
             self.show_popup("Please enter a student ID to delete.", is_error=True)
             return
 
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
-
-        # Delete student's registrations first
-        cursor.execute("DELETE FROM registrations WHERE student_id=?", (student_id,))
-
-        # Then delete the student
-        cursor.execute("DELETE FROM students WHERE student_id=?", (student_id,))
-        
-        if cursor.rowcount == 0:
-            self.show_popup(f"No student found with ID {student_id}", is_error=True)
-        else:
-            conn.commit()
+        def deleted(_):
             self.show_popup(f"Student with ID {student_id} deleted successfully.")
-            self.update_dropdowns()
+            self.student_choices.remove(student_id)
 
-        conn.close()
+        self.writer.submit(lambda repository: repository.delete_student(student_id), deleted,
+                           lambda message: self.show_popup(message, is_error=True))
 
     def add_instructor(self):
         """Adds an instructor to the database."""
@@ -521,9 +455,13 @@ class SchoolManagementSystem(QMainWindow):
             validate_person_data(name, age, email)
 
             instructor = Instructor(name, age, email, instructor_id)
-            self.add_to_database('instructors', instructor)
-            self.show_popup(f"Instructor {name} added successfully.")
-            self.update_dropdowns()
+
+            def added(_):
+                self.show_popup(f"Instructor {name} added successfully.")
+                self.instructor_choices.insert(instructor_id, name)
+
+            self.add_to_database('instructors', instructor, added,
+                                 lambda message: self.show_popup(f"Error adding instructor: {message}", is_error=True))
         except ValueError as e:
             self.show_popup(f"Error adding instructor: {str(e)}", is_error=True)
 
@@ -537,46 +475,29 @@ class SchoolManagementSystem(QMainWindow):
 
             validate_person_data(name, age, email)
 
-            conn = sqlite3.connect('school_management.db')
-            cursor = conn.cursor()
-            cursor.execute("UPDATE instructors SET name=?, age=?, email=? WHERE instructor_id=?",
-                           (name, age, email, instructor_id))
-            conn.commit()
-            conn.close()
+            def updated(_):
+                self.show_popup(f"Instructor {name} updated successfully.")
+                self.instructor_choices.update(instructor_id, name)
 
-            self.show_popup(f"Instructor {name} updated successfully.")
-            self.update_dropdowns()
+            self.writer.submit(lambda repository: repository.update_instructor(instructor_id, name, age, email),
+                               updated,
+                               lambda message: self.show_popup(f"Error updating instructor: {message}", is_error=True))
         except ValueError as e:
             self.show_popup(f"Error updating instructor: {str(e)}", is_error=True)
 
     def delete_instructor(self):
-        """Deletes an instructor from the database."""
+        """Deletes an instructor from the database, unless a course is assigned to them."""
         instructor_id = self.instructor_id_input.text()
         if not instructor_id:
             self.show_popup("Please enter an instructor ID to delete.", is_error=True)
             return
 
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
+        def deleted(_):
+            self.show_popup(f"Instructor with ID {instructor_id} deleted successfully.")
+            self.instructor_choices.remove(instructor_id)
 
-        # Check if instructor is assigned to any courses
-        cursor.execute("SELECT COUNT(*) FROM courses WHERE instructor_id=?", (instructor_id,))
-        course_count = cursor.fetchone()[0]
-
-        if course_count > 0:
-            self.show_popup(f"Cannot delete instructor. They are assigned to {course_count} course(s).", is_error=True)
-        else:
-            # Delete the instructor
-            cursor.execute("DELETE FROM instructors WHERE instructor_id=?", (instructor_id,))
-            
-            if cursor.rowcount == 0:
-                self.show_popup(f"No instructor found with ID {instructor_id}", is_error=True)
-            else:
-                conn.commit()
-                self.show_popup(f"Instructor with ID {instructor_id} deleted successfully.")
-                self.update_dropdowns()
-
-        conn.close()
+        self.writer.submit(lambda repository: repository.delete_instructor(instructor_id), deleted,
+                           lambda message: self.show_popup(message, is_error=True))
 
     def add_course(self):
         """Adds a course to the database."""
@@ -584,15 +505,12 @@ class SchoolManagementSystem(QMainWindow):
         course_name = self.course_name_input.text()
         instructor_id = self.course_instructor_combo.currentText().split(' - ')[0]
 
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO courses (course_id, course_name, instructor_id) VALUES (?, ?, ?)",
-                       (course_id, course_name, instructor_id))
-        conn.commit()
-        conn.close()
+        def added(_):
+            self.show_popup(f"Course {course_name} added successfully.")
+            self.course_choices.insert(course_id, course_name)
 
-        self.show_popup(f"Course {course_name} added successfully.")
-        self.update_dropdowns()
+        self.writer.submit(lambda repository: repository.add_course(course_id, course_name, instructor_id), added,
+                           lambda message: self.show_popup(f"Error adding course: {message}", is_error=True))
 
     def update_course(self):
         """Updates a course in the database."""
@@ -600,254 +518,423 @@ class SchoolManagementSystem(QMainWindow):
         course_name = self.course_name_input.text()
         instructor_id = self.course_instructor_combo.currentText().split(' - ')[0]
 
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
-        cursor.execute("UPDATE courses SET course_name=?, instructor_id=? WHERE course_id=?",
-                       (course_name, instructor_id, course_id))
-        
-        if cursor.rowcount == 0:
-            self.show_popup(f"No course found with ID {course_id}", is_error=True)
-        else:
-            conn.commit()
+        def updated(_):
             self.show_popup(f"Course {course_name} updated successfully.")
-            self.update_dropdowns()
+            self.course_choices.update(course_id, course_name)
 
-        conn.close()
+        self.writer.submit(lambda repository: repository.update_course(course_id, course_name, instructor_id),
+                           updated, lambda message: self.show_popup(message, is_error=True))
 
     def delete_course(self):
-        """Deletes a course from the database."""
+        """Deletes a course and its registrations from the database."""
         course_id = self.course_id_input.text()
         if not course_id:
             self.show_popup("Please enter a course ID to delete.", is_error=True)
             return
 
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
-
-        # Delete course registrations first
-        cursor.execute("DELETE FROM registrations WHERE course_id=?", (course_id,))
-
-        # Then delete the course
-        cursor.execute("DELETE FROM courses WHERE course_id=?", (course_id,))
-        
-        if cursor.rowcount == 0:
-            self.show_popup(f"No course found with ID {course_id}", is_error=True)
-        else:
-            conn.commit()
+        def deleted(_):
             self.show_popup(f"Course with ID {course_id} deleted successfully.")
-            self.update_dropdowns()
+            self.course_choices.remove(course_id)
 
-        conn.close()
+        self.writer.submit(lambda repository: repository.delete_course(course_id), deleted,
+                           lambda message: self.show_popup(message, is_error=True))
 
     def register_student_to_course(self):
         """Registers a student to a course."""
         student_id = self.student_combo.currentText().split(' - ')[0]
         course_id = self.course_combo.currentText().split(' - ')[0]
 
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
+        self.writer.submit(
+            lambda repository: repository.register(student_id, course_id),
+            lambda _: self.show_popup(f"Student {student_id} registered to course {course_id} successfully."),
+            lambda message: self.show_popup(message, is_error=True))
 
-        try:
-            cursor.execute("INSERT INTO registrations (student_id, course_id) VALUES (?, ?)",
-                           (student_id, course_id))
-            conn.commit()
-            self.show_popup(f"Student {student_id} registered to course {course_id} successfully.")
-        except sqlite3.IntegrityError:
-            self.show_popup(f"Student {student_id} is already registered to course {course_id}.", is_error=True)
-        finally:
-            conn.close()
-
-    def add_to_database(self, table: str, obj: Union[Student, Instructor]):
-        """Adds a new record to the specified table in the database.
+    def register_selected(self):
+        """
+        Registers the selected students, or every student whose ID starts with the prefix typed, to the
+        selected courses in one transaction, reporting the counts in a single popup.
+        """
+        course_ids = self.selected_ids(self.batch_course_list)
+        prefix = self.batch_prefix_input.text().strip()
+        student_ids = None if prefix else self.selected_ids(self.batch_student_list)
+        if not course_ids or not (prefix or student_ids):
+            self.show_popup("Select at least one course, and students or an ID prefix.", is_error=True)
+            return
+        student_filter = StudentFilter(prefix) if prefix else None
+
+        def on_done(summary: dict):
+            message = (f"Registered {summary['inserted']} student-course pairs; "
+                       f"{summary['duplicates']} were already registered.")
+            if summary['unknown_students']:
+                message += f" {summary['unknown_students']} students no longer exist."
+            self.show_popup(message)
+
+        self.writer.submit(
+            lambda repository: repository.register_many(course_ids, student_ids, student_filter),
+            on_done,
+            lambda message: self.show_popup(message, is_error=True))
+
+    def selected_ids(self, view: QListView) -> list:
+        """
+        Returns the IDs of the choices selected in a list, in list order.
+
+        :param view: A list showing a ChoiceListModel
+        :type view: QListView
+        :rtype: list
+        """
+        rows = sorted(index.row() for index in view.selectionModel().selectedRows())
+        return [view.model().index(row).data(Qt.UserRole) for row in rows]
+
+    def add_to_database(self, table: str, obj: Union[Student, Instructor],
+                        on_done: Optional[Callable[[Any], None]] = None,
+                        on_error: Optional[Callable[[str], None]] = None) -> int:
+        """Queues a new record for the specified table on the database writer.
 
 :param table: The name of the table to add the record to
 :type table: str
 :param obj: The object (Student or Instructor) to add to the database
-:type obj: Union[Student, Instructor]"""
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
+:type obj: Union[Student, Instructor]
+:param on_done: Called once the record is committed, defaults to None
+:type on_done: Callable[[Any], None], optional
+:param on_error: Called with the error message if the insert failed, defaults to None
+:type on_error: Callable[[str], None], optional
+:return: The writer request ID
+:rtype: int"""
+        def command(repository: SchoolRepository):
+            if table == 'students':
+                repository.add_student(obj.student_id, obj.name, obj.age, obj._email)
+            elif table == 'instructors':
+                repository.add_instructor(obj.instructor_id, obj.name, obj.age, obj._email)
+
+        return self.writer.submit(command, on_done, on_error)
+
+    def show_records_table(self):
+        """
+        Creates the records table view on first use and returns its model.
 
-        if table == 'students':
-            cursor.execute("INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)",
-                           (obj.student_id, obj.name, obj.age, obj._email))
-        elif table == 'instructors':
-            cursor.execute("INSERT INTO instructors (instructor_id, name, age, email) VALUES (?, ?, ?, ?)",
-                           (obj.instructor_id, obj.name, obj.age, obj._email))
+        The same view and model are reused for every refresh.
 
-        conn.commit()
-        conn.close()
+        :return: The model backing the records table
+        :rtype: RecordTableModel
+        """
+        if self.table is None:
+            self.records_model = RecordTableModel(self.db, parent=self)
+            self.table = QTableView(self)
+            self.table.setModel(self.records_model)
+            self.layout.addWidget(self.table)
+        return self.records_model
 
     def display_records(self):
-        """Displays all records in the database."""
-        if self.table:
-            self.layout.removeWidget(self.table)
-            self.table.deleteLater()
-            self.table = None
-
-        self.table = QTableWidget(self)
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Type", "ID", "Name", "Age/Course Name", "Email/Instructor ID"])
-
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT 'Student' as type, student_id, name, age, email FROM students")
-        students = cursor.fetchall()
+        """
+        Displays all records in the database, or the first page of the record type chosen to browse.
+        """
+        self.search_controller.cancel()
+        table = self.browse_combo.currentData()
+        if table is None:
+            self.pager = None
+            self.show_records_table().set_query(RECORDS_SQL)
+            self.update_page_controls()
+        else:
+            self.pager = KeysetPager(self.db, table, self.page_size_spin.value())
+            self.show_page(self.pager.first())
 
-        cursor.execute("SELECT 'Instructor' as type, instructor_id, name, age, email FROM instructors")
-        instructors = cursor.fetchall()
+    def show_page(self, rows: list):
+        """
+        Shows a page of records read by the pager.
 
-        cursor.execute("SELECT 'Course' as type, course_id, course_name, instructor_id, '' FROM courses")
-        courses = cursor.fetchall()
+        :param rows: The records of the page
+        :type rows: list
+        """
+        self.show_records_table().set_rows(rows)
+        self.update_page_controls()
+
+    def next_page(self):
+        """Shows the next page of the record type being browsed."""
+        if self.pager is not None:
+            self.show_page(self.pager.next())
+
+    def previous_page(self):
+        """Shows the previous page of the record type being browsed."""
+        if self.pager is not None:
+            self.show_page(self.pager.previous())
+
+    def jump_to_record(self):
+        """Shows the page of the record type being browsed that starts at the ID typed."""
+        key = self.jump_input.text().strip()
+        if self.pager is not None and key:
+            self.show_page(self.pager.jump(key))
+
+    def change_page_size(self, size: int):
+        """
+        Reloads the current page with a new number of records.
 
-        conn.close()
+        :param size: The number of records per page
+        :type size: int
+        """
+        if self.pager is not None:
+            self.pager.page_size = size
+            self.show_page(self.pager.refresh())
+
+    def update_page_controls(self):
+        """Enables the paging controls that apply to what the records table shows."""
+        paging = self.pager is not None
+        self.previous_page_button.setEnabled(paging and self.pager.has_previous)
+        self.next_page_button.setEnabled(paging and self.pager.has_next)
+        self.jump_input.setEnabled(paging)
+        self.page_size_spin.setEnabled(paging)
+        if not paging:
+            self.page_label.setText("")
+        elif self.pager.rows:
+            self.page_label.setText(f"{self.pager.first_key} to {self.pager.last_key}")
+        else:
+            self.page_label.setText("No records")
 
-        all_records = students + instructors + courses
-        self.table.setRowCount(len(all_records))
+    def show_report(self):
+        """Shows the chosen report in the records table."""
+        self.search_controller.cancel()
+        self.pager = None
+        self.update_page_controls()
+        try:
+            headers, rows = run_report(self.db, self.report_combo.currentData())
+        except Exception as e:
+            self.show_popup(f"Error computing report: {str(e)}", is_error=True)
+            return
+        self.show_records_table().set_rows(rows, headers)
 
-        for row, record in enumerate(all_records):
-            for col, value in enumerate(record):
-                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+    def set_report_summaries(self, enabled: bool):
+        """
+        Creates or drops the summary tables that keep the report totals.
 
-        self.layout.addWidget(self.table)
+        :param enabled: Whether to keep the totals
+        :type enabled: bool
+        """
+        try:
+            if enabled:
+                create_report_summaries(self.db)
+            else:
+                drop_report_summaries(self.db)
+        except Exception as e:
+            self.show_popup(f"Error changing report totals: {str(e)}", is_error=True)
 
     def search_records(self):
         """Searches for records in the database based on the search query."""
-        if self.table:
-            self.layout.removeWidget(self.table)
-            self.table.deleteLater()
-            self.table = None
-
-        self.table = QTableWidget(self)
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Type", "ID", "Name", "Age/Course Name", "Email/Instructor ID"])
-
+        self.search_controller.cancel()
+        self.pager = None
+        self.update_page_controls()
         query = self.search_input.text()
-        conn = sqlite3.connect('school_management.db')
-        cursor = conn.cursor()
+        self.show_records_table().set_query(*build_search_query(self.db, query))
 
-        cursor.execute("SELECT 'Student' as type, student_id, name, age, email FROM students WHERE name LIKE ? OR student_id LIKE ?",
-                       (f"%{query}%", f"%{query}%"))
-        students = cursor.fetchall()
+    def search_as_you_type(self, text: str):
+        """
+        Schedules a background search for the text typed so far.
 
-        cursor.execute("SELECT 'Instructor' as type, instructor_id, name, age, email FROM instructors WHERE name LIKE ? OR instructor_id LIKE ?",
-                       (f"%{query}%", f"%{query}%"))
-        instructors = cursor.fetchall()
+        Clearing the search box shows all records again.
+
+        :param text: The current search text
+        :type text: str
+        """
+        if text.strip():
+            self.search_controller.schedule(text)
+        else:
+            self.search_controller.cancel()
+            self.display_records()
 
-        cursor.execute("SELECT 'Course' as type, course_id, course_name, instructor_id, '' FROM courses WHERE course_name LIKE ? OR course_id LIKE ?",
-                       (f"%{query}%", f"%{query}%"))
-        courses = cursor.fetchall()
+    def on_search_started(self):
+        """Empties the records table before a background search streams in its results."""
+        self.pager = None
+        self.update_page_controls()
+        self.show_records_table().clear()
 
-        conn.close()
+    def on_search_rows(self, rows: list):
+        """
+        Appends a batch of rows streamed by the background search.
 
-        all_records = students + instructors + courses
-        self.table.setRowCount(len(all_records))
+        :param rows: The rows found so far
+        :type rows: list
+        """
+        self.show_records_table().append_rows(rows)
 
-        for row, record in enumerate(all_records):
-            for col, value in enumerate(record):
-                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+    def on_search_failed(self, message: str):
+        """
+        Reports a background search that failed.
 
-        self.layout.addWidget(self.table)
+        :param message: The error message
+        :type message: str
+        """
+        self.show_popup(f"Error searching records: {message}", is_error=True)
 
     def save_data(self):
-        """Saves the data from the database to JSON files."""
+        """Saves the data from the database to a snapshot in the selected format."""
         try:
-            conn = sqlite3.connect('school_management.db')
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM students")
-            students = [Student(name=row[1], age=row[2], email=row[3], student_id=row[0]) for row in cursor.fetchall()]
-
-            cursor.execute("SELECT * FROM instructors")
-            instructors = [Instructor(name=row[1], age=row[2], email=row[3], instructor_id=row[0]) for row in cursor.fetchall()]
-
-            cursor.execute("SELECT * FROM courses")
-            courses = []
-            for row in cursor.fetchall():
-                instructor = next((i for i in instructors if i.instructor_id == row[2]), None)
-                courses.append(Course(course_id=row[0], course_name=row[1], instructor=instructor))
-
-            conn.close()
-
-            save_data_to_file(students, 'students.json')
-            save_data_to_file(instructors, 'instructors.json')
-            save_data_to_file(courses, 'courses.json')
+            save_snapshot(self.db, snapshot_format=self.snapshot_format_combo.currentData())
 
             self.show_popup("Data saved successfully.")
         except Exception as e:
             self.show_popup(f"Error saving data: {str(e)}", is_error=True)
 
     def load_data(self):
-        """Loads the data from JSON files into the database."""
+        """Loads the snapshot in the selected format into the database, replacing its contents."""
         try:
-            students = load_data_from_file('students.json', Student)
-            instructors = load_data_from_file('instructors.json', Instructor)
-            courses = load_data_from_file('courses.json', Course)
+            load_snapshot(self.db, snapshot_format=self.snapshot_format_combo.currentData())
 
-            conn = sqlite3.connect('school_management.db')
-            cursor = conn.cursor()
+            self.show_popup("Data loaded successfully.")
+            self.update_dropdowns()
+        except Exception as e:
+            self.db.rollback()
+            self.show_popup(f"Error loading data: {str(e)}", is_error=True)
 
-            cursor.execute("DELETE FROM registrations")
-            cursor.execute("DELETE FROM courses")
-            cursor.execute("DELETE FROM students")
-            cursor.execute("DELETE FROM instructors")
+    def export_to_csv(self):
+        """Exports the data from the database to CSV on a worker thread, showing progress."""
+        if self.export_task is not None:
+            return
 
-            for student in students:
-                cursor.execute("INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)",
-                               (student.student_id, student.name, student.age, student._email))
+        task = ExportTask(self.db, per_entity=self.export_per_entity_check.isChecked(),
+                          compress=self.export_gzip_check.isChecked())
+        progress = QProgressDialog("Exporting data to CSV...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Export to CSV")
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(task.cancel)
+        task.signals.progress.connect(self.on_export_progress)
+        task.signals.finished.connect(self.on_export_finished)
+        task.signals.cancelled.connect(self.on_export_cancelled)
+        task.signals.failed.connect(self.on_export_failed)
+
+        self.export_task = task
+        self.export_progress = progress
+        self.export_button.setEnabled(False)
+        QThreadPool.globalInstance().start(task)
+
+    def on_export_progress(self, done: int, total: int):
+        """
+        Updates the export progress dialog.
 
-            for instructor in instructors:
-                cursor.execute("INSERT INTO instructors (instructor_id, name, age, email) VALUES (?, ?, ?, ?)",
-                               (instructor.instructor_id, instructor.name, instructor.age, instructor._email))
+        :param done: The number of rows exported so far
+        :type done: int
+        :param total: The total number of rows to export
+        :type total: int
+        """
+        self.export_progress.setMaximum(max(total, 1))
+        self.export_progress.setValue(min(done, max(total, 1) - 1))
 
-            for course in courses:
-                instructor_id = next((i.instructor_id for i in instructors if i.name == course.instructor.name), None)
-                cursor.execute("INSERT INTO courses (course_id, course_name, instructor_id) VALUES (?, ?, ?)",
-                               (course.course_id, course.course_name, instructor_id))
+    def on_export_finished(self, counts: dict):
+        """
+        Reports a completed export.
 
-            conn.commit()
-            conn.close()
+        :param counts: The number of rows exported for each entity
+        :type counts: dict
+        """
+        self.end_export()
+        self.show_popup(f"Data exported to CSV successfully ({sum(counts.values())} rows).")
 
-            self.show_popup("Data loaded successfully.")
-            self.update_dropdowns()
-        except Exception as e:
-            self.show_popup(f"Error loading data: {str(e)}", is_error=True)
+    def on_export_cancelled(self):
+        """Reports a cancelled export."""
+        self.end_export()
+        self.show_popup("Export to CSV cancelled.")
 
-    def export_to_csv(self):
-        """Exports the data from the database to a CSV file."""
-        try:
-            conn = sqlite3.connect('school_management.db')
-            cursor = conn.cursor()
+    def on_export_failed(self, message: str):
+        """
+        Reports a failed export.
 
-            cursor.execute("SELECT 'Student' as type, student_id, name, age, email FROM students")
-            students = cursor.fetchall()
+        :param message: The error message
+        :type message: str
+        """
+        self.end_export()
+        self.show_popup(f"Error exporting data: {message}", is_error=True)
+
+    def end_export(self):
+        """Closes the export progress dialog and re-enables the export button."""
+        self.export_progress.reset()
+        self.export_progress.deleteLater()
+        self.export_progress = None
+        self.export_task = None
+        self.export_button.setEnabled(True)
+
+    def import_from_csv(self):
+        """Imports the CSV file into the database on a worker thread, showing progress."""
+        if self.import_task is not None:
+            return
 
-            cursor.execute("SELECT 'Instructor' as type, instructor_id, name, age, email FROM instructors")
-            instructors = cursor.fetchall()
+        task = ImportTask(self.db)
+        progress = QProgressDialog("Importing data from CSV...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Import from CSV")
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(task.cancel)
+        task.signals.progress.connect(self.on_import_progress)
+        task.signals.finished.connect(self.on_import_finished)
+        task.signals.cancelled.connect(self.on_import_cancelled)
+        task.signals.failed.connect(self.on_import_failed)
+
+        self.import_task = task
+        self.import_progress = progress
+        self.import_button.setEnabled(False)
+        QThreadPool.globalInstance().start(task)
+
+    def on_import_progress(self, done: int, total: int):
+        """
+        Updates the import progress dialog.
 
-            cursor.execute("SELECT 'Course' as type, course_id, course_name, instructor_id, '' FROM courses")
-            courses = cursor.fetchall()
+        :param done: The number of KiB read so far
+        :type done: int
+        :param total: The size of the file in KiB
+        :type total: int
+        """
+        self.import_progress.setMaximum(max(total, 1))
+        self.import_progress.setValue(min(done, max(total, 1) - 1))
 
-            cursor.execute("SELECT 'Registration' as type, student_id, course_id, '', '' FROM registrations")
-            registrations = cursor.fetchall()
+    def on_import_finished(self, counts: dict):
+        """
+        Reports a completed import with a single summary.
 
-            conn.close()
+        :param counts: The number of rows inserted or updated in each table, plus 'rejected'
+        :type counts: dict
+        """
+        filename = self.import_task.filename
+        self.end_import()
+        self.update_dropdowns()
+        rejected = counts.pop('rejected', 0)
+        message = f"Data imported from CSV successfully ({sum(counts.values())} rows imported, {rejected} rejected)."
+        if rejected:
+            message += f" Rejected rows were written to {errors_path(filename)}."
+        self.show_popup(message)
+
+    def on_import_cancelled(self):
+        """Reports a cancelled import. Batches committed before cancelling are kept."""
+        self.end_import()
+        self.update_dropdowns()
+        self.show_popup("Import from CSV cancelled.")
 
-            with open('school_data.csv', 'w', newline='') as csvfile:
-                csvwriter = csv.writer(csvfile)
-                csvwriter.writerow(['Type', 'ID', 'Name', 'Age/Course Name', 'Email/Instructor ID'])
+    def on_import_failed(self, message: str):
+        """
+        Reports a failed import.
 
-                for record in students + instructors + courses + registrations:
-                    csvwriter.writerow(record)
+        :param message: The error message
+        :type message: str
+        """
+        self.end_import()
+        self.update_dropdowns()
+        self.show_popup(f"Error importing data: {message}", is_error=True)
 
-            self.show_popup("Data exported to CSV successfully.")
-        except Exception as e:
-            self.show_popup(f"Error exporting data: {str(e)}", is_error=True)
+    def end_import(self):
+        """Closes the import progress dialog and re-enables the import button."""
+        self.import_progress.reset()
+        self.import_progress.deleteLater()
+        self.import_progress = None
+        self.import_task = None
+        self.import_button.setEnabled(True)
 
 def main():
-    """The main function that runs the School Management System application."""
+    """
+    The main function that runs the School Management System application.
+
+    ``--db PATH`` selects the database file, as does the SCHOOL_DB_PATH environment variable.
+    """
+    parser = argparse.ArgumentParser(description="School Management System")
+    parser.add_argument('--db', help=f"database file, defaults to ${DB_PATH_ENV} or {DEFAULT_DB_PATH}")
+    args, qt_args = parser.parse_known_args()
+    if args.db:
+        set_database(Database(args.db))
     create_tables()
-    app = QApplication([])
+    app = QApplication(sys.argv[:1] + qt_args)
     window = SchoolManagementSystem()
     window.show()
     app.exec_()
@@ -0,0 +1,80 @@
+"""
+Compares loading students, instructors and courses row by row against the bulk loader.
+
+Run from the repository root::
+
+    python benchmarks/bench_bulk_load.py --students 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk import bulk_load
+from database import Database
+from search import create_search_index
+
+
+def make_rows(students: int):
+    instructors = max(1, students // 100)
+    return {
+        'instructors': [(f"I{i}", f"Instructor {i}", 40, f"i{i}@school.edu") for i in range(instructors)],
+        'students': [(f"S{i}", f"Student {i}", 20, f"s{i}@school.edu") for i in range(students)],
+        'courses': [(f"C{i}", f"Course {i}", f"I{i % instructors}") for i in range(instructors * 2)],
+    }
+
+
+def row_by_row(db: Database, rows):
+    """
+    The old load path: one execute per record, committed at the end.
+    """
+    conn = db.connection
+    cursor = conn.cursor()
+    for table in ('registrations', 'courses', 'students', 'instructors'):
+        cursor.execute(f"DELETE FROM {table}")
+    for row in rows['students']:
+        cursor.execute("INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)", row)
+    for row in rows['instructors']:
+        cursor.execute("INSERT INTO instructors (instructor_id, name, age, email) VALUES (?, ?, ?, ?)", row)
+    instructors = rows['instructors']
+    for course_id, name, instructor_id in rows['courses']:
+        instructor = next((i[0] for i in instructors if i[0] == instructor_id), None)
+        cursor.execute("INSERT INTO courses (course_id, course_name, instructor_id) VALUES (?, ?, ?)",
+                       (course_id, name, instructor))
+    conn.commit()
+
+
+def run(label: str, tmp: str, rows, load, full_text: bool):
+    db = Database(os.path.join(tmp, f"{label.replace(' ', '_')}.db"))
+    db.create_tables()
+    if full_text:
+        create_search_index(db)
+    start = time.perf_counter()
+    load(db, rows)
+    elapsed = time.perf_counter() - start
+    count = db.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+    db.close()
+    print(f"{label:<32} {elapsed:8.2f} s   {count} students")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=200000, help="number of students to load")
+    parser.add_argument('--no-search-index', action='store_true', help="load without the FTS5 search index")
+    parser.add_argument('--skip-row-by-row', action='store_true', help="skip the slow baseline")
+    args = parser.parse_args()
+
+    rows = make_rows(args.students)
+    full_text = not args.no_search_index
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.skip_row_by_row:
+            run("row by row (before)", tmp, rows, row_by_row, full_text)
+        run("bulk_load", tmp, rows, lambda db, r: bulk_load(db, r), full_text)
+        run("bulk_load, deferred indexes", tmp, rows, lambda db, r: bulk_load(db, r, defer_indexes=True), full_text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares the cold-start time of the GUI module against the headless command line.
+
+Run from the repository root::
+
+    python benchmarks/bench_cold_start.py --runs 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    ("import Lab (PyQt5)", "import Lab"),
+    ("import cli", "import cli"),
+    ("cli.py stats", "import sys, cli; sys.argv[1:] = ['--db', DB, 'stats']; cli.main()"),
+]
+
+
+def time_runs(code: str, runs: int, db: str) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"DB = {db!r}\n{code}"], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10, help="number of runs per target")
+    parser.add_argument('--db', default=os.path.join(ROOT, 'bench_cold_start.db'), help="database used by stats")
+    args = parser.parse_args()
+
+    baseline = time_runs("pass", args.runs, args.db)
+    print(f"{'interpreter only':<24} {baseline * 1000:8.1f} ms")
+    for label, code in TARGETS:
+        print(f"{label:<24} {time_runs(code, args.runs, args.db) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compares per-operation latency of opening a connection for every handler call
+against going through the shared :class:`database.Database` connection.
+
+Run from the repository root::
+
+    python benchmarks/bench_connection.py --ops 2000
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+
+def per_call_connection(path: str, ops: int) -> list:
+    """
+    Inserts and reads back students the way the handlers used to, one connection per call.
+    """
+    timings = []
+    for i in range(ops):
+        start = time.perf_counter()
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)",
+                       (f"S{i}", f"Student {i}", 20, f"s{i}@school.edu"))
+        conn.commit()
+        conn.close()
+        conn = sqlite3.connect(path)
+        conn.execute("SELECT student_id, name FROM students WHERE student_id=?", (f"S{i}",)).fetchall()
+        conn.close()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def shared_connection(db: Database, ops: int) -> list:
+    """
+    Inserts and reads back students through the shared connection.
+    """
+    timings = []
+    for i in range(ops):
+        start = time.perf_counter()
+        db.execute("INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)",
+                   (f"S{i}", f"Student {i}", 20, f"s{i}@school.edu"))
+        db.commit()
+        db.execute("SELECT student_id, name FROM students WHERE student_id=?", (f"S{i}",)).fetchall()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(timings) * 1e6:9.1f} us   "
+          f"median {statistics.median(timings) * 1e6:9.1f} us   p95 {p95 * 1e6:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ops', type=int, default=1000, help="number of insert+select operations")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path = os.path.join(tmp, 'before.db')
+        Database(before_path, pragmas={}).create_tables()
+        report("connect per call (before)", per_call_connection(before_path, args.ops))
+
+        after = Database(os.path.join(tmp, 'after.db'))
+        after.create_tables()
+        report("shared connection (after)", shared_connection(after, args.ops))
+        after.close()
+
+
+if __name__ == "__main__":
+    main()
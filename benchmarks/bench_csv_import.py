@@ -0,0 +1,66 @@
+"""
+Measures importing an exported CSV file, with some invalid rows mixed in.
+
+Run from the repository root::
+
+    python benchmarks/bench_csv_import.py --students 1000000
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csv_io import CSV_HEADER, import_csv
+from database import Database
+from search import create_search_index
+
+
+def write_csv(filename: str, students: int, invalid_every: int):
+    instructors = max(1, students // 100)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(('Instructor', f"I{i}", f"Instructor {i}", 40, f"i{i}@school.edu")
+                         for i in range(instructors))
+        writer.writerows(('Student', f"S{i}", f"Student {i}", 20,
+                          "not-an-email" if invalid_every and i % invalid_every == 0 else f"s{i}@school.edu")
+                         for i in range(students))
+        writer.writerows(('Course', f"C{i}", f"Course {i}", f"I{i % instructors}", '')
+                         for i in range(instructors * 2))
+        writer.writerows(('Registration', f"S{i}", f"C{i % (instructors * 2)}", '', '')
+                         for i in range(students))
+
+
+def run(label: str, tmp: str, filename: str, full_text: bool, batch_size: int):
+    db = Database(os.path.join(tmp, f"{label.replace(' ', '_')}.db"))
+    db.create_tables()
+    if full_text:
+        create_search_index(db)
+    start = time.perf_counter()
+    counts = import_csv(db, filename, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    db.close()
+    rows = sum(counts.values())
+    print(f"{label:<32} {elapsed:8.2f} s   {rows / elapsed:10.0f} rows/s   {counts['rejected']} rejected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=200000, help="number of students in the file")
+    parser.add_argument('--invalid-every', type=int, default=1000, help="make every Nth student invalid, 0 for none")
+    parser.add_argument('--batch-size', type=int, default=20000, help="rows committed per transaction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'import.csv')
+        write_csv(filename, args.students, args.invalid_every)
+        run("import_csv", tmp, filename, False, args.batch_size)
+        run("import_csv, search index", tmp, filename, True, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measures how fast a registration graph of domain objects is rebuilt with domain events off, logged, or printed.
+
+"print" writes the messages the domain methods used to print to stdout, which
+is redirected to os.devnull; "logged" sends the events through a StreamHandler
+to os.devnull; "silent" is the default, with the models logger below INFO.
+
+Run from the repository root::
+
+    python benchmarks/bench_domain_events.py --registrations 1000000
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, Student, logger
+
+
+def rebuild(students: int, per_student: int, echo: bool) -> float:
+    courses = [Course(f"C{i}", f"Course {i}", None) for i in range(max(per_student, students // 50))]
+    start = time.perf_counter()
+    for i in range(students):
+        student = Student(f"Student {i}", 20, f"s{i}@school.edu", f"S{i}")
+        for j in range(per_student):
+            course = courses[(i + j * 7919) % len(courses)]
+            student.register_course(course)
+            if echo:
+                print(f"{student.name} has registered for {course.course_name}.")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--registrations', type=int, default=1000000, help="number of registrations")
+    parser.add_argument('--per-student', type=int, default=5, help="registrations per student")
+    args = parser.parse_args()
+    students = args.registrations // args.per_student
+
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            timings = {'print': rebuild(students, args.per_student, echo=True)}
+        timings['silent'] = rebuild(students, args.per_student, echo=False)
+        handler = logging.StreamHandler(devnull)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            timings['logged'] = rebuild(students, args.per_student, echo=False)
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(logging.NOTSET)
+
+    registrations = students * args.per_student
+    for mode, seconds in timings.items():
+        print(f"{mode:<7} {seconds:7.2f} s   {registrations / seconds:12,.0f} registrations/s")
+
+
+if __name__ == "__main__":
+    main()
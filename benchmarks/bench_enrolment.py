@@ -0,0 +1,75 @@
+"""
+Compares answering roster and timetable questions from an EnrolmentGraph with one SQL query per question.
+
+Run from the repository root::
+
+    python benchmarks/bench_enrolment.py --students 100000 --per-student 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, insert_statement
+from enrolment import EnrolmentGraph
+from schema import migrate
+
+
+def populate(db: Database, students: int, per_student: int) -> int:
+    courses = max(per_student, students // 50)
+    rng = random.Random(0)
+    with db.transaction() as conn:
+        conn.execute(insert_statement('instructors'), ("I0", "Instructor", 40, "i@school.edu"))
+        conn.executemany(insert_statement('courses'), ((f"C{i}", f"Course {i}", "I0") for i in range(courses)))
+        conn.executemany(insert_statement('students'),
+                         ((f"S{i}", f"Student {i}", 20, f"s{i}@school.edu") for i in range(students)))
+        conn.executemany(insert_statement('registrations'),
+                         ((f"S{i}", f"C{c}") for i in range(students) for c in rng.sample(range(courses), per_student)))
+    return courses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=50000, help="number of students")
+    parser.add_argument('--per-student', type=int, default=5, help="registrations per student")
+    parser.add_argument('--questions', type=int, default=100000, help="lookups of each kind")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        migrate(db)
+        courses = populate(db, args.students, args.per_student)
+        rng = random.Random(1)
+        pairs = [(f"S{rng.randrange(args.students)}", f"C{rng.randrange(courses)}") for _ in range(args.questions)]
+
+        start = time.perf_counter()
+        graph = EnrolmentGraph.from_database(db)
+        print(f"load {len(graph)} registrations: {time.perf_counter() - start:.3f} s")
+
+        start = time.perf_counter()
+        for student_id, course_id in pairs:
+            graph.courses_of(student_id)
+            graph.students_in(course_id)
+            graph.is_registered(student_id, course_id)
+        graph_elapsed = time.perf_counter() - start
+
+        conn = db.connection
+        start = time.perf_counter()
+        for student_id, course_id in pairs:
+            conn.execute("SELECT course_id FROM registrations WHERE student_id=?", (student_id,)).fetchall()
+            conn.execute("SELECT student_id FROM registrations WHERE course_id=?", (course_id,)).fetchall()
+            conn.execute("SELECT 1 FROM registrations WHERE student_id=? AND course_id=?",
+                         (student_id, course_id)).fetchone()
+        sql_elapsed = time.perf_counter() - start
+
+        print(f"graph: {graph_elapsed:.3f} s   SQL: {sql_elapsed:.3f} s   "
+              f"({args.questions * 3 / graph_elapsed:,.0f} vs {args.questions * 3 / sql_elapsed:,.0f} lookups/s)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
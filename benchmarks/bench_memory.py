@@ -0,0 +1,69 @@
+"""
+Compares the memory footprint of student objects with and without __slots__.
+
+Run from the repository root::
+
+    python benchmarks/bench_memory.py --counts 100000 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Student
+
+
+class DictStudent:
+    """
+    The previous student layout: a per-instance __dict__ and an eager course list.
+    """
+
+    def __init__(self, name: str, age: int, email: str, student_id: str):
+
+        self.name = name
+        self.age = age
+        self._email = email
+        self.student_id = student_id
+        self.registered_courses = []
+
+
+LAYOUTS = [
+    ("__dict__ objects (before)", lambda i, name, email: DictStudent(name, 20, email, i)),
+    ("__slots__ objects", lambda i, name, email: Student(name, 20, email, i)),
+    ("to_row() tuples", lambda i, name, email: (i, name, 20, email)),
+]
+
+
+def footprint(count: int, make) -> int:
+    """
+    Returns the bytes allocated for ``count`` records, not counting their strings.
+    """
+    ids = [f"S{i}" for i in range(count)]
+    names = [f"Student {i}" for i in range(count)]
+    emails = [f"s{i}@school.edu" for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    records = [make(i, name, email) for i, name, email in zip(ids, names, emails)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--counts', type=int, nargs='+', default=[100000, 1000000], help="numbers of objects")
+    args = parser.parse_args()
+
+    for count in args.counts:
+        print(f"{count} students")
+        for label, make in LAYOUTS:
+            size = footprint(count, make)
+            print(f"  {label:<28} {size / 2 ** 20:8.1f} MiB   {size / count:6.1f} bytes/object")
+
+
+if __name__ == "__main__":
+    main()
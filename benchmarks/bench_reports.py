@@ -0,0 +1,76 @@
+"""
+Times every report computed from the base tables and from the trigger-maintained summary tables.
+
+Also measures what the summary triggers add to registering students.
+
+Run from the repository root::
+
+    python benchmarks/bench_reports.py --students 250000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from datagen import populate
+from reports import REPORTS, create_report_summaries, drop_report_summaries, run_report
+from schema import migrate
+
+
+def time_reports(db: Database, use_summaries: bool, repeat: int):
+    for name in REPORTS:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _, rows = run_report(db, name, use_summaries)
+            best = min(best, time.perf_counter() - start)
+        print(f"{'summaries' if use_summaries else 'live':<10} {name:<18} {best * 1000:9.1f} ms {len(rows):8d} rows")
+
+
+def time_registrations(db: Database, count: int) -> float:
+    conn = db.connection
+    students = [row[0] for row in conn.execute("SELECT student_id FROM students LIMIT ?", (count,))]
+    course = conn.execute("SELECT course_id FROM courses ORDER BY course_id DESC LIMIT 1").fetchone()[0]
+    start = time.perf_counter()
+    with db.transaction() as conn:
+        conn.executemany("INSERT OR IGNORE INTO registrations (student_id, course_id) VALUES (?, ?)",
+                         ((student_id, course) for student_id in students))
+    elapsed = time.perf_counter() - start
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM registrations WHERE course_id = ?", (course,))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=250000, help="number of students, about 4 courses each")
+    parser.add_argument('--repeat', type=int, default=3, help="runs of each report, the fastest is kept")
+    parser.add_argument('--writes', type=int, default=50000, help="registrations inserted to time the triggers")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        migrate(db)
+        counts = populate(db, args.students)
+        print(f"{counts}")
+
+        time_reports(db, False, args.repeat)
+        plain = time_registrations(db, args.writes)
+
+        start = time.perf_counter()
+        create_report_summaries(db)
+        print(f"create summaries: {time.perf_counter() - start:.3f} s")
+        time_reports(db, True, args.repeat)
+        maintained = time_registrations(db, args.writes)
+        print(f"insert {args.writes} registrations: {plain:.3f} s without summaries, {maintained:.3f} s with")
+
+        drop_report_summaries(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
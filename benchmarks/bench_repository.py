@@ -0,0 +1,74 @@
+"""
+Runs the same add, register, lookup and delete workload against each repository engine.
+
+Run from the repository root::
+
+    python benchmarks/bench_repository.py --students 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, memory_database
+from repository import MemoryRepository, SchoolRepository, SQLiteRepository
+from schema import migrate
+
+
+def workload(repository: SchoolRepository, students: int):
+    courses = max(1, students // 100)
+    timings = {}
+
+    start = time.perf_counter()
+    with repository.transaction():
+        repository.add_instructor("I0", "Instructor", 40, "i@school.edu")
+        for i in range(courses):
+            repository.add_course(f"C{i}", f"Course {i}", "I0")
+        for i in range(students):
+            repository.add_student(f"S{i}", f"Student {i}", 20, f"s{i}@school.edu")
+            repository.register(f"S{i}", f"C{i % courses}")
+    timings['add'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, students, 10):
+        repository.get_student(f"S{i}")
+        repository.courses_of_student(f"S{i}")
+    for i in range(courses):
+        repository.students_in_course(f"C{i}")
+    timings['lookup'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with repository.transaction():
+        for i in range(0, students, 10):
+            repository.delete_student(f"S{i}")
+    timings['delete'] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=50000, help="number of students")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_db = Database(os.path.join(tmp, 'bench.db'))
+        memory_db = memory_database('bench')
+        engines = [
+            ("MemoryRepository", MemoryRepository),
+            ("SQLite :memory:", lambda: SQLiteRepository(memory_db)),
+            ("SQLite file", lambda: SQLiteRepository(file_db)),
+        ]
+        migrate(file_db)
+        migrate(memory_db)
+        for label, factory in engines:
+            timings = workload(factory(), args.students)
+            print(f"{label:<18} " + "   ".join(f"{name} {seconds:6.2f} s" for name, seconds in timings.items()))
+        file_db.close()
+        memory_db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the LIKE search path against the FTS5 trigram index at several table sizes.
+
+Run from the repository root::
+
+    python benchmarks/bench_search.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, search_query
+from search import create_search_index, full_text_query
+
+FIRST_NAMES = ["Ann", "Bob", "Carla", "Dmitri", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jamal"]
+LAST_NAMES = ["Haddad", "Khoury", "Smith", "Tanaka", "Garcia", "Nasser", "Okafor", "Rossi", "Larsen", "Moreau"]
+QUERIES = ["Khoury", "S00042", "ace Tan", "Dmitri Ros"]
+
+
+def populate(db: Database, size: int):
+    """
+    Fills the database with ``size`` students and a tenth as many instructors and courses.
+    """
+    rng = random.Random(size)
+
+    def name() -> str:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    with db.transaction() as conn:
+        conn.executemany("INSERT INTO students VALUES (?, ?, ?, ?)",
+                         ((f"S{i:06d}", name(), rng.randint(17, 30), f"s{i}@school.edu") for i in range(size)))
+        conn.executemany("INSERT INTO instructors VALUES (?, ?, ?, ?)",
+                         ((f"I{i:06d}", name(), rng.randint(28, 70), f"i{i}@school.edu") for i in range(size // 10)))
+        conn.executemany("INSERT INTO courses VALUES (?, ?, ?)",
+                         ((f"C{i:06d}", f"Course {i}", f"I{i:06d}") for i in range(size // 10)))
+
+
+def time_query(db: Database, sql: str, params, repeat: int):
+    """
+    Returns the median run time of a query and the number of rows it returned.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = db.execute(sql, params).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help="number of students per run")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per query, the median is reported")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}  {'query':<12} {'LIKE (ms)':>10} {'hits':>7} {'FTS5 (ms)':>10} {'hits':>7} {'speedup':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, 'bench.db'))
+            db.create_tables()
+            populate(db, size)
+            create_search_index(db)
+            for query in QUERIES:
+                like, like_hits = time_query(db, *search_query(query), args.repeat)
+                fts, fts_hits = time_query(db, *full_text_query(query), args.repeat)
+                print(f"{size:>9}  {query:<12} {like * 1000:>10.2f} {like_hits:>7} "
+                      f"{fts * 1000:>10.2f} {fts_hits:>7} {like / fts:>7.1f}x")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compares saving and loading a snapshot in the JSON Lines and binary formats.
+
+Run from the repository root::
+
+    python benchmarks/bench_snapshot.py --students 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk import bulk_load
+from database import Database
+from snapshot import BINARY_FORMAT, JSON_LINES_FORMAT, save_snapshot, load_snapshot
+
+TABLES = ('students', 'instructors', 'courses', 'registrations')
+
+
+def populate(db: Database, students: int):
+    instructors = max(1, students // 100)
+    courses = instructors * 2
+    bulk_load(db, {
+        'instructors': ((f"I{i}", f"Instructor {i}", 40, f"i{i}@school.edu") for i in range(instructors)),
+        'students': ((f"S{i}", f"Student {i}", 17 + i % 13, f"s{i}@school.edu") for i in range(students)),
+        'courses': ((f"C{i}", f"Course {i}", f"I{i % instructors}") for i in range(courses)),
+        'registrations': ((f"S{i}", f"C{(i * 7 + k) % courses}") for i in range(students) for k in range(3)),
+    })
+
+
+def snapshot_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=200000, help="number of students in the database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        db.create_tables()
+        populate(db, args.students)
+        print(f"{'format':<8} {'save (s)':>9} {'load (s)':>9} {'size (MB)':>10}")
+        for snapshot_format in (JSON_LINES_FORMAT, BINARY_FORMAT):
+            directory = os.path.join(tmp, snapshot_format)
+            os.mkdir(directory)
+            start = time.perf_counter()
+            save_snapshot(db, directory, TABLES, snapshot_format=snapshot_format)
+            saved = time.perf_counter() - start
+            start = time.perf_counter()
+            load_snapshot(db, directory, TABLES, snapshot_format=snapshot_format)
+            loaded = time.perf_counter() - start
+            print(f"{snapshot_format:<8} {saved:>9.2f} {loaded:>9.2f} {snapshot_size(directory) / 1e6:>10.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares committing every write on the GUI thread against the group-committing DatabaseWriter.
+
+Run from the repository root::
+
+    python benchmarks/bench_writer.py --writes 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication
+
+from database import Database, DEFAULT_PRAGMAS
+from search import create_search_index
+from workers import DatabaseWriter
+
+INSERT = "INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)"
+
+
+def commit_per_write(db: Database, writes: int) -> float:
+    """
+    The old handler path: execute and commit on the calling thread. Returns the longest stall.
+    """
+    longest = 0.0
+    conn = db.connection
+    for i in range(writes):
+        start = time.perf_counter()
+        conn.execute(INSERT, (f"S{i}", f"Student {i}", 20, f"s{i}@school.edu"))
+        conn.commit()
+        longest = max(longest, time.perf_counter() - start)
+    return longest
+
+
+def queued(db: Database, writes: int) -> float:
+    """
+    Submits every write to a DatabaseWriter and waits for the results. Returns the longest submit.
+    """
+    app = QCoreApplication.instance() or QCoreApplication([])
+    writer = DatabaseWriter(db)
+    longest = 0.0
+    for i in range(writes):
+        row = (f"S{i}", f"Student {i}", 20, f"s{i}@school.edu")
+        start = time.perf_counter()
+        writer.submit(lambda repository, row=row: repository.add_student(*row))
+        longest = max(longest, time.perf_counter() - start)
+    while writer.pending():
+        app.processEvents()
+    writer.close()
+    return longest
+
+
+def run(label: str, tmp: str, writes: int, synchronous: str, write):
+    pragmas = dict(DEFAULT_PRAGMAS, synchronous=synchronous)
+    db = Database(os.path.join(tmp, f"{label.replace(' ', '_')}_{synchronous}.db"), pragmas)
+    db.create_tables()
+    create_search_index(db)
+    start = time.perf_counter()
+    longest = write(db, writes)
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(f"{label:<20} synchronous={synchronous:<7} {elapsed:8.2f} s   {writes / elapsed:9.0f} writes/s   "
+          f"longest GUI-thread stall {longest * 1000:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writes', type=int, default=2000, help="number of inserts")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for synchronous in ('NORMAL', 'FULL'):
+            run("commit per write", tmp, args.writes, synchronous, commit_per_write)
+            run("DatabaseWriter", tmp, args.writes, synchronous, queued)
+
+
+if __name__ == "__main__":
+    main()
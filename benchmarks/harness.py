@@ -0,0 +1,220 @@
+"""
+Runs every SchoolManagementSystem operation headlessly against a generated dataset and records the results as JSON.
+
+For each operation, the harness records the wall time, the process peak RSS,
+and the number of SQL statements run on every connection, including those of
+worker threads. Results can be gated on absolute thresholds or compared with
+an earlier results file; either check exits with status 1 on a regression.
+
+Run from the repository root::
+
+    python benchmarks/harness.py --scale 1k --output results-1k.json --check benchmarks/thresholds.json
+    python benchmarks/harness.py --scale 100k --baseline results-100k.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtWidgets import QApplication
+
+from database import Database, set_database, set_statement_tracer
+from datagen import SCALES, populate
+from models import Student, create_tables
+
+import Lab
+
+OPERATIONS = ('add_to_database', 'update_dropdowns', 'display_records', 'search_records',
+              'save_data', 'load_data', 'export_to_csv')
+
+_statements = [0]
+
+
+def _count_statement(sql: str):
+    _statements[0] += 1
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _wait(app: QApplication, done: Callable[[], bool]):
+    while not done():
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def run_operations(app: QApplication, window: Lab.SchoolManagementSystem, adds: int,
+                   search: str) -> Dict[str, Dict[str, Any]]:
+    errors: List[str] = []
+    window.show_popup = lambda message, is_error=False: errors.append(message) if is_error else None
+
+    def add_to_database():
+        for i in range(adds):
+            window.add_to_database('students', Student(f"Bench {i}", 20, f"bench{i}@school.edu", f"X{i:07d}"))
+        _wait(app, lambda: not window.writer.pending())
+
+    def search_records():
+        window.search_input.blockSignals(True)
+        window.search_input.setText(search)
+        window.search_input.blockSignals(False)
+        window.search_records()
+
+    def export_to_csv():
+        window.export_to_csv()
+        _wait(app, lambda: window.export_task is None)
+        QThreadPool.globalInstance().waitForDone()
+
+    steps = {
+        'add_to_database': add_to_database,
+        'update_dropdowns': window.update_dropdowns,
+        'display_records': window.display_records,
+        'search_records': search_records,
+        'save_data': window.save_data,
+        'load_data': window.load_data,
+        'export_to_csv': export_to_csv,
+    }
+    results = {}
+    for name in OPERATIONS:
+        del errors[:]
+        rss_before = _peak_rss_mib()
+        statements_before = _statements[0]
+        start = time.perf_counter()
+        steps[name]()
+        app.processEvents()
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'seconds': round(elapsed, 4),
+            'statements': _statements[0] - statements_before,
+            'peak_rss_mib': round(_peak_rss_mib(), 1),
+            'rss_growth_mib': round(_peak_rss_mib() - rss_before, 1),
+            'errors': list(errors),
+        }
+        print(f"{name:<17} {elapsed:8.3f} s {results[name]['statements']:8d} statements "
+              f"{results[name]['peak_rss_mib']:8.1f} MiB peak", file=sys.stderr)
+    return results
+
+
+def run(scale: str, seed: int, adds: int, search: str) -> Dict[str, Any]:
+    """
+    Generates a dataset in a temporary directory and runs every operation against it.
+
+    :return: The results document
+    :rtype: Dict[str, Any]
+    """
+    students = SCALES[scale] if scale in SCALES else int(scale)
+    set_statement_tracer(_count_statement)
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            db = Database(os.path.join(tmp, 'bench.db'))
+            set_database(db)
+            create_tables()
+            start = time.perf_counter()
+            counts = populate(db, students, seed)
+            generated = time.perf_counter() - start
+            print(f"generated {counts} in {generated:.1f} s", file=sys.stderr)
+
+            app = QApplication.instance() or QApplication([])
+            window = Lab.SchoolManagementSystem()
+            operations = run_operations(app, window, adds, search)
+            window.close()
+            db.close()
+        finally:
+            os.chdir(cwd)
+    return {
+        'scale': scale,
+        'seed': seed,
+        'rows': counts,
+        'generate_seconds': round(generated, 2),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'operations': operations,
+    }
+
+
+def check_thresholds(results: Dict[str, Any], thresholds: Dict[str, Any]) -> List[str]:
+    """
+    Lists the operations that exceed the limits given for the scale of the results.
+
+    The thresholds file maps a scale to operations, each with optional
+    ``seconds``, ``statements`` and ``peak_rss_mib`` limits.
+    """
+    failures = []
+    for name, limits in thresholds.get(results['scale'], {}).items():
+        measured = results['operations'].get(name)
+        if measured is None:
+            continue
+        for metric, limit in limits.items():
+            if measured[metric] > limit:
+                failures.append(f"{name}: {metric} {measured[metric]} exceeds {limit}")
+    return failures
+
+
+def compare_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Lists the operations that got slower, or run more SQL statements, than in a
+    baseline run by more than the tolerance.
+    """
+    failures = []
+    for name, measured in results['operations'].items():
+        before = baseline.get('operations', {}).get(name)
+        if before is None:
+            continue
+        if measured['seconds'] > before['seconds'] * (1 + tolerance):
+            failures.append(f"{name}: {measured['seconds']} s against {before['seconds']} s")
+        # Group commit makes the writer's statement count vary a little between runs.
+        if measured['statements'] > before['statements'] * (1 + tolerance):
+            failures.append(f"{name}: {measured['statements']} statements against {before['statements']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', default='1k', help=f"one of {', '.join(SCALES)} or a number of students")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the dataset")
+    parser.add_argument('--adds', type=int, default=1000, help="students added through add_to_database")
+    parser.add_argument('--search', default='khoury', help="text searched by search_records")
+    parser.add_argument('--output', help="results file, defaults to standard output")
+    parser.add_argument('--check', help="thresholds file to gate on")
+    parser.add_argument('--baseline', help="earlier results file to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.seed, args.adds, args.search)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    failures = [f"{name}: {result['errors'][0]}" for name, result in results['operations'].items()
+                if result['errors']]
+    if args.check:
+        with open(args.check, encoding='utf-8') as file:
+            failures += check_thresholds(results, json.load(file))
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            failures += compare_baseline(results, json.load(file), args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
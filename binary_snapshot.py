@@ -0,0 +1,200 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from bulk import bulk_load
+from database import Database, TABLE_COLUMNS, iter_table
+
+BINARY_SNAPSHOT_FILE = 'school_snapshot.bin'
+BINARY_TABLES = ('students', 'instructors', 'courses', 'registrations')
+
+MAGIC = b'SCHLSNAP'
+VERSION = 1
+
+# The file ends with the offset and length of a small JSON directory, then the magic.
+_TRAILER = struct.Struct('<QQ8s')
+
+INTEGER_COLUMNS = {'age'}
+
+# Stands in for NULL in integer columns.
+NULL_INTEGER = -(2 ** 63)
+
+
+def save_binary_snapshot(db: Database, filename: str = BINARY_SNAPSHOT_FILE,
+                         tables: Sequence[str] = BINARY_TABLES, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Writes tables to a compact columnar binary snapshot.
+
+    Each table is stored column by column: integer columns as little-endian
+    64-bit arrays, text columns as a UTF-8 string table with a 64-bit offset per
+    row, and every column with a one-byte-per-row NULL mask. A JSON directory at
+    the end of the file records where each column lives.
+
+    :param db: The database to save
+    :type db: Database
+    :param filename: The name of the file to write, defaults to BINARY_SNAPSHOT_FILE
+    :type filename: str, optional
+    :param tables: The tables to save, defaults to BINARY_TABLES
+    :type tables: Sequence[str], optional
+    :param batch_size: The number of rows fetched at a time, defaults to 1000
+    :type batch_size: int, optional
+    :return: The number of rows written for each table
+    :rtype: Dict[str, int]
+    """
+    directory = {'version': VERSION, 'tables': {}}
+    temporary = filename + '.tmp'
+    try:
+        with open(temporary, 'wb') as f, db.transaction():
+            f.write(MAGIC)
+            for table in tables:
+                columns = TABLE_COLUMNS[table]
+                builders = [_IntegerColumn() if column in INTEGER_COLUMNS else _TextColumn() for column in columns]
+                rows = 0
+                for row in iter_table(db, table, batch_size):
+                    for builder, value in zip(builders, row):
+                        builder.append(value)
+                    rows += 1
+                directory['tables'][table] = {
+                    'rows': rows,
+                    'columns': [dict(name=column, **builder.write(f)) for column, builder in zip(columns, builders)],
+                }
+            directory_offset = f.tell()
+            encoded = json.dumps(directory).encode('utf-8')
+            f.write(encoded)
+            f.write(_TRAILER.pack(directory_offset, len(encoded), MAGIC))
+        os.replace(temporary, filename)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return {table: meta['rows'] for table, meta in directory['tables'].items()}
+
+
+def load_binary_snapshot(db: Database, filename: str = BINARY_SNAPSHOT_FILE,
+                         defer_indexes: bool = True) -> Dict[str, int]:
+    """
+    Replaces the contents of the database with a binary snapshot.
+
+    The file is memory-mapped and rows are decoded straight from its columns
+    into the bulk loader; no text is parsed.
+
+    :param db: The database to load into
+    :type db: Database
+    :param filename: The name of the file to read, defaults to BINARY_SNAPSHOT_FILE
+    :type filename: str, optional
+    :param defer_indexes: Whether to rebuild indexes once after loading, defaults to True
+    :type defer_indexes: bool, optional
+    :return: The number of rows inserted into each table
+    :rtype: Dict[str, int]
+    """
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        directory = _read_directory(mapped)
+        view = memoryview(mapped)
+        rows = {table: _iter_rows(view, meta) for table, meta in directory['tables'].items()}
+        try:
+            return bulk_load(db, rows, defer_indexes=defer_indexes)
+        finally:
+            for table_rows in rows.values():
+                table_rows.close()
+            view.release()
+
+
+class _IntegerColumn:
+
+    def __init__(self):
+        self.values = array('q')
+        self.nulls = bytearray()
+
+    def append(self, value: Optional[int]):
+        self.nulls.append(value is None)
+        self.values.append(NULL_INTEGER if value is None else value)
+
+    def write(self, f) -> Dict[str, int]:
+        nulls = _write_aligned(f, self.nulls)
+        values = _write_aligned(f, _little_endian(self.values))
+        return {'type': 'integer', 'nulls': nulls, 'values': values}
+
+
+class _TextColumn:
+
+    def __init__(self):
+        self.offsets = array('q', [0])
+        self.nulls = bytearray()
+        self.strings = bytearray()
+
+    def append(self, value: Optional[Any]):
+        self.nulls.append(value is None)
+        if value is not None:
+            self.strings += str(value).encode('utf-8')
+        self.offsets.append(len(self.strings))
+
+    def write(self, f) -> Dict[str, int]:
+        nulls = _write_aligned(f, self.nulls)
+        offsets = _write_aligned(f, _little_endian(self.offsets))
+        strings = _write_aligned(f, self.strings)
+        return {'type': 'text', 'nulls': nulls, 'offsets': offsets, 'strings': strings,
+                'strings_length': len(self.strings)}
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _write_aligned(f, data) -> int:
+    padding = -f.tell() % 8
+    f.write(b'\0' * padding)
+    offset = f.tell()
+    f.write(data)
+    return offset
+
+
+def _read_directory(mapped: mmap.mmap) -> Dict[str, Any]:
+    if len(mapped) < len(MAGIC) + _TRAILER.size or mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a school binary snapshot")
+    offset, length, magic = _TRAILER.unpack_from(mapped, len(mapped) - _TRAILER.size)
+    if magic != MAGIC:
+        raise ValueError("Truncated binary snapshot")
+    directory = json.loads(mapped[offset:offset + length].decode('utf-8'))
+    if directory.get('version') != VERSION:
+        raise ValueError(f"Unsupported binary snapshot version {directory.get('version')}")
+    return directory
+
+
+def _integers(view: memoryview, offset: int, count: int) -> Sequence[int]:
+    values = view[offset:offset + count * 8]
+    if sys.byteorder == 'big':
+        swapped = array('q', values.tobytes())
+        swapped.byteswap()
+        return swapped
+    return values.cast('q')
+
+
+def _iter_rows(view: memoryview, meta: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+    rows = meta['rows']
+    readers = []
+    for column in meta['columns']:
+        nulls = view[column['nulls']:column['nulls'] + rows]
+        if column['type'] == 'integer':
+            values = _integers(view, column['values'], rows)
+            readers.append((nulls, values, None))
+        else:
+            offsets = _integers(view, column['offsets'], rows + 1)
+            strings = view[column['strings']:column['strings'] + column['strings_length']]
+            readers.append((nulls, offsets, strings))
+
+    for i in range(rows):
+        row = []
+        for nulls, values, strings in readers:
+            if nulls[i]:
+                row.append(None)
+            elif strings is None:
+                row.append(values[i])
+            else:
+                row.append(str(strings[values[i]:values[i + 1]], 'utf-8'))
+        yield tuple(row)
@@ -0,0 +1,77 @@
+import sqlite3
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+from database import Database, insert_statement
+from reports import COURSE_COUNTS_TABLE, populate_report_summaries
+from search import SEARCH_INDEX_TABLE, populate_search_index
+
+# Referenced tables first; deletes run in the reverse order.
+LOAD_ORDER = ('instructors', 'students', 'courses', 'registrations')
+
+
+@contextmanager
+def deferred_indexes(conn: sqlite3.Connection, tables: Sequence[str]) -> Iterator[None]:
+    """
+    Drops the secondary indexes and triggers of some tables, and recreates them afterwards.
+
+    Primary keys are kept. If the search index or the report summaries exist,
+    they are rebuilt in one pass once their sync triggers are back. Must run
+    inside a transaction.
+
+    :param conn: The connection to use
+    :type conn: sqlite3.Connection
+    :param tables: The tables whose indexes and triggers are deferred
+    :type tables: Sequence[str]
+    """
+    placeholders = ", ".join("?" * len(tables))
+    saved = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        f"WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders}) "
+        "ORDER BY type",
+        tuple(tables)).fetchall()
+    for kind, name, _ in saved:
+        conn.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+    yield
+    for _, _, sql in saved:
+        conn.execute(sql)
+    has_search_index = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                                    (SEARCH_INDEX_TABLE,)).fetchone()
+    if has_search_index:
+        populate_search_index(conn)
+    has_summaries = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                                 (COURSE_COUNTS_TABLE,)).fetchone()
+    if has_summaries:
+        populate_report_summaries(conn)
+
+
+def bulk_load(db: Database, rows: Dict[str, Iterable[Sequence[Any]]], replace: bool = True,
+              defer_indexes: bool = False) -> Dict[str, int]:
+    """
+    Loads rows into the school tables with ``executemany`` inside one transaction.
+
+    :param db: The database to load into
+    :type db: Database
+    :param rows: The rows to insert, keyed by table name, in the column order of TABLE_COLUMNS
+    :type rows: Dict[str, Iterable[Sequence[Any]]]
+    :param replace: Whether to delete the existing rows of every table first, defaults to True
+    :type replace: bool, optional
+    :param defer_indexes: Whether to drop secondary indexes and triggers during the load
+        and rebuild them once at the end, defaults to False
+    :type defer_indexes: bool, optional
+    :return: The number of rows inserted into each table
+    :rtype: Dict[str, int]
+    """
+    counts = {}
+    with db.transaction() as conn:
+        deferral = deferred_indexes(conn, LOAD_ORDER) if defer_indexes else nullcontext()
+        with deferral:
+            if replace:
+                for table in reversed(LOAD_ORDER):
+                    conn.execute(f"DELETE FROM {table}")
+            for table in LOAD_ORDER:
+                if table not in rows:
+                    continue
+                counts[table] = conn.executemany(insert_statement(table), rows[table]).rowcount
+    return counts
+
@@ -0,0 +1,291 @@
+"""
+Command-line entry point for running the School Management System without a display.
+
+Nothing here imports PyQt5, so cron jobs and scripts start quickly::
+
+    python cli.py export --per-entity --gzip
+    python cli.py import school_data.csv
+    python cli.py snapshot save --format binary
+    python cli.py search alice
+    python cli.py stats
+    python cli.py audit
+    python cli.py -v migrate
+    python cli.py generate --scale 100k --seed 1
+    python cli.py summaries on
+    python cli.py report course_enrolment --limit 20
+    python cli.py register C101 C102 --id-prefix S2026
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+from typing import List, Optional
+
+from csv_io import CSV_FILE, errors_path, export_csv, import_csv
+from datagen import SCALES, populate
+from database import DB_PATH_ENV, DEFAULT_DB_PATH, RECORD_HEADERS, TABLE_COLUMNS, Database, set_database
+from models import create_tables
+from repository import RepositoryError, SQLiteRepository, StudentFilter
+from reports import REPORTS, create_report_summaries, drop_report_summaries, has_report_summaries, run_report
+from schema import AUDITED_QUERIES, audit_query_plans, explain_query_plan, migrate, schema_version
+from search import build_search_query, create_search_index, has_search_index
+from snapshot import JSON_LINES_FORMAT, SNAPSHOT_FORMATS, load_snapshot, save_snapshot
+
+
+def export_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Exports the database to CSV.
+    """
+    counts = export_csv(db.connection, args.file, args.per_entity, args.gzip)
+    for entity, count in counts.items():
+        print(f"{entity}: {count}")
+    return 0
+
+
+def import_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Imports a CSV file in the export format. Exits with status 1 when rows were rejected.
+    """
+    counts = import_csv(db, args.file, batch_size=args.batch_size)
+    rejected = counts.pop('rejected')
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+    print(f"rejected: {rejected}")
+    if rejected:
+        print(f"Rejected rows were written to {errors_path(args.file)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def snapshot_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Saves or loads a snapshot.
+    """
+    if args.action == 'save':
+        counts = save_snapshot(db, args.dir, snapshot_format=args.format)
+    else:
+        counts = load_snapshot(db, args.dir, snapshot_format=args.format)
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+    return 0
+
+
+def search_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Prints matching records as CSV.
+    """
+    sql, params = build_search_query(db, args.query)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(RECORD_HEADERS)
+    cursor = db.execute(sql, params)
+    remaining = args.limit
+    while remaining:
+        rows = cursor.fetchmany(min(remaining, 1000))
+        if not rows:
+            break
+        writer.writerows(rows)
+        remaining -= len(rows)
+    return 0
+
+
+def stats_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Prints row counts and the size of the database.
+    """
+    for table in TABLE_COLUMNS:
+        print(f"{table}: {db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]}")
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    pages = db.execute("PRAGMA page_count").fetchone()[0]
+    free = db.execute("PRAGMA freelist_count").fetchone()[0]
+    print(f"schema version: {schema_version(db)}")
+    print(f"search index: {'yes' if has_search_index(db) else 'no'}")
+    print(f"report summaries: {'yes' if has_report_summaries(db) else 'no'}")
+    print(f"size: {page_size * pages} bytes ({free} free pages)")
+    return 0
+
+
+def audit_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Prints the query plan of every audited query. Exits with status 1 when one does not use an index.
+    """
+    if not args.live:
+        db = Database(':memory:')
+        migrate(db)
+    failures = dict(audit_query_plans(db))
+    for description, sql, params in AUDITED_QUERIES:
+        plan = failures.get(description) or explain_query_plan(db.connection, sql, params)
+        print(f"{'FAIL' if description in failures else 'ok':<5} {description}: {'; '.join(plan)}")
+    return 1 if failures else 0
+
+
+def migrate_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Upgrades the schema, logging the timing of every step.
+    """
+    before = schema_version(db)
+    applied = migrate(db, args.target, args.batch_size)
+    create_search_index(db)
+    for version, elapsed in applied:
+        print(f"migration {version}: {elapsed:.3f} s")
+    print(f"schema version: {before} -> {schema_version(db)}")
+    return 0
+
+
+def generate_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Replaces the contents of the database with a seeded synthetic school.
+    """
+    students = SCALES[args.scale] if args.scale in SCALES else int(args.scale)
+    counts = populate(db, students, args.seed, args.registrations)
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+    return 0
+
+
+def report_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Prints a report as CSV.
+    """
+    headers, rows = run_report(db, args.name, use_summaries=False if args.live else None)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(headers)
+    writer.writerows(rows[:args.limit] if args.limit else rows)
+    return 0
+
+
+def summaries_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Creates or drops the summary tables that the reports read.
+    """
+    if args.action == 'on':
+        create_report_summaries(db)
+    else:
+        drop_report_summaries(db)
+    print(f"report summaries: {'yes' if has_report_summaries(db) else 'no'}")
+    return 0
+
+
+def register_command(db: Database, args: argparse.Namespace) -> int:
+    """
+    Registers many students to some courses in one transaction. Exits with status 1 when a course does not exist.
+
+    The ID prefix and age filters apply to the students listed in the file, if one is given.
+    """
+    student_ids = None
+    if args.students_file:
+        with open(args.students_file, encoding='utf-8') as file:
+            student_ids = [line.strip() for line in file if line.strip()]
+    student_filter = StudentFilter(args.id_prefix, args.min_age, args.max_age)
+    try:
+        summary = SQLiteRepository(db).register_many(args.courses, student_ids, student_filter)
+    except RepositoryError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for name, count in summary.items():
+        print(f"{name}: {count}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser with one subcommand per operation.
+
+    :return: The parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='cli.py', description="School Management System batch operations.")
+    # Resolved like get_database(), so the command line and the window open the same file.
+    parser.add_argument('--db', default=os.environ.get(DB_PATH_ENV) or DEFAULT_DB_PATH,
+                        help=f"database file, defaults to ${DB_PATH_ENV} or {DEFAULT_DB_PATH}")
+    parser.add_argument('-v', '--verbose', action='count', default=0, help="log progress; twice for every batch")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="export the database to CSV")
+    export.add_argument('--file', default=CSV_FILE, help=f"combined CSV file name, defaults to {CSV_FILE}")
+    export.add_argument('--per-entity', action='store_true', help="write one file per entity")
+    export.add_argument('--gzip', action='store_true', help="gzip the files")
+    export.set_defaults(handler=export_command)
+
+    import_ = commands.add_parser('import', help="import a CSV file in the export format")
+    import_.add_argument('file', nargs='?', default=CSV_FILE, help=f"CSV file, defaults to {CSV_FILE}")
+    import_.add_argument('--batch-size', type=int, default=20000, help="rows committed per transaction")
+    import_.set_defaults(handler=import_command)
+
+    snapshot = commands.add_parser('snapshot', help="save or load a snapshot")
+    snapshot.add_argument('action', choices=('save', 'load'))
+    snapshot.add_argument('--dir', default='.', help="snapshot directory, defaults to the current directory")
+    snapshot.add_argument('--format', choices=SNAPSHOT_FORMATS, default=JSON_LINES_FORMAT,
+                          help=f"snapshot format, defaults to {JSON_LINES_FORMAT}")
+    snapshot.set_defaults(handler=snapshot_command)
+
+    search = commands.add_parser('search', help="print matching records as CSV")
+    search.add_argument('query')
+    search.add_argument('--limit', type=int, default=1000, help="maximum number of records, defaults to 1000")
+    search.set_defaults(handler=search_command)
+
+    stats = commands.add_parser('stats', help="print row counts and the database size")
+    stats.set_defaults(handler=stats_command)
+
+    audit = commands.add_parser('audit', help="check that the application's queries use indexes")
+    audit.add_argument('--live', action='store_true',
+                       help="plan against the database file and its statistics instead of an empty schema")
+    audit.set_defaults(handler=audit_command)
+
+    migrate_ = commands.add_parser('migrate', help="upgrade the schema, resuming an interrupted upgrade")
+    migrate_.add_argument('--target', type=int, help="version to stop at, defaults to the latest")
+    migrate_.add_argument('--batch-size', type=int, help="rows per backfill batch")
+    migrate_.set_defaults(handler=migrate_command)
+
+    generate = commands.add_parser('generate', help="replace the data with a seeded synthetic school")
+    generate.add_argument('--scale', default='1k', help=f"one of {', '.join(SCALES)} or a number of students")
+    generate.add_argument('--seed', type=int, default=0, help="random seed, defaults to 0")
+    generate.add_argument('--registrations', type=float, default=4.0,
+                          help="mean number of courses per student, defaults to 4")
+    generate.set_defaults(handler=generate_command)
+
+    report = commands.add_parser('report', help="print an enrolment report as CSV")
+    report.add_argument('name', choices=tuple(REPORTS))
+    report.add_argument('--limit', type=int, help="maximum number of rows, defaults to all")
+    report.add_argument('--live', action='store_true', help="aggregate the tables even if summaries exist")
+    report.set_defaults(handler=report_command)
+
+    summaries = commands.add_parser('summaries', help="maintain report summary tables, or drop them")
+    summaries.add_argument('action', choices=('on', 'off'))
+    summaries.set_defaults(handler=summaries_command)
+
+    register = commands.add_parser('register', help="register many students to some courses at once")
+    register.add_argument('courses', nargs='+', help="course IDs")
+    register.add_argument('--students-file',
+                          help="file with one student ID per line; the filters below then select among them")
+    register.add_argument('--id-prefix', help="register the students whose ID starts with this")
+    register.add_argument('--min-age', type=int, help="register the students at least this old")
+    register.add_argument('--max-age', type=int, help="register the students at most this old")
+    register.set_defaults(handler=register_command)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs one subcommand against the database.
+
+    :param argv: The command-line arguments, defaults to sys.argv[1:]
+    :type argv: List[str], optional
+    :return: The exit status
+    :rtype: int
+    """
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG if args.verbose > 1 else logging.INFO, format="%(message)s")
+    db = Database(os.path.abspath(args.db))
+    set_database(db)
+    try:
+        if args.handler is not migrate_command:
+            create_tables()
+        return args.handler(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
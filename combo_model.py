@@ -0,0 +1,227 @@
+from bisect import bisect_left
+from typing import Any, List, Optional
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+from PyQt5.QtWidgets import QComboBox, QCompleter
+
+from database import Database
+from metrics import get_metrics
+
+
+class ChoiceListModel(QAbstractListModel):
+    """
+    A list of "ID - name" choices for one table, kept sorted by ID.
+
+    Rows are loaded lazily in ID order through ``canFetchMore``/``fetchMore``
+    using keyset queries, and handlers apply single-row inserts, updates and
+    removals instead of reloading the whole table. The model can be shared by
+    any number of combo boxes. With a filter text or a row limit, it also serves
+    as a database-filtered suggestion list for a completer.
+
+    :param db: The database to read choices from
+    :type db: Database
+    :param table: The table holding the choices
+    :type table: str
+    :param key_column: The ID column of the table
+    :type key_column: str
+    :param name_column: The name column of the table
+    :type name_column: str
+    :param batch_size: The number of rows fetched per window, defaults to 500
+    :type batch_size: int, optional
+    :param limit: The maximum number of rows to load, defaults to no limit
+    :type limit: int, optional
+    :param parent: The parent object, defaults to None
+    :type parent: QObject, optional
+    """
+
+    def __init__(self, db: Database, table: str, key_column: str, name_column: str,
+                 batch_size: int = 500, limit: Optional[int] = None, parent: Optional[QObject] = None):
+
+        super().__init__(parent)
+        self.db = db
+        self.table = table
+        self.key_column = key_column
+        self.name_column = name_column
+        self.batch_size = batch_size
+        self.limit = limit
+        self.filter_text = ""
+        self._keys: List[str] = []
+        self._names: List[str] = []
+        self._exhausted = False
+
+    def reload(self):
+        """
+        Drops every loaded choice and loads the first window again.
+        """
+        self.beginResetModel()
+        self._keys = []
+        self._names = []
+        self._exhausted = False
+        self._load_window()
+        self.endResetModel()
+
+    def set_filter(self, text: str):
+        """
+        Restricts the choices to those whose ID or name contains a text, and reloads.
+
+        :param text: The text to look for, or an empty string for every choice
+        :type text: str
+        """
+        self.filter_text = text
+        self.reload()
+
+    def insert(self, key: str, name: str):
+        """
+        Adds a choice at its sorted position.
+
+        Choices past the loaded window are left for ``fetchMore`` to pick up.
+
+        :param key: The ID of the new record
+        :type key: str
+        :param name: The name of the new record
+        :type name: str
+        """
+        row = bisect_left(self._keys, key)
+        if row < len(self._keys) and self._keys[row] == key:
+            self.update(key, name)
+            return
+        if row == len(self._keys) and not self._exhausted:
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self._names.insert(row, name)
+        self.endInsertRows()
+        get_metrics().add_items(1)
+
+    def update(self, key: str, name: str):
+        """
+        Renames a loaded choice.
+
+        :param key: The ID of the record
+        :type key: str
+        :param name: The new name of the record
+        :type name: str
+        """
+        row = self.row_of(key)
+        if row < 0:
+            return
+        self._names[row] = name
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+
+    def remove(self, key: str):
+        """
+        Removes a loaded choice.
+
+        :param key: The ID of the record
+        :type key: str
+        """
+        row = self.row_of(key)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        del self._names[row]
+        self.endRemoveRows()
+
+    def row_of(self, key: str) -> int:
+        """
+        Finds the row of a loaded choice.
+
+        :param key: The ID of the record
+        :type key: str
+        :return: The row of the choice, or -1 if it is not loaded
+        :rtype: int
+        """
+        row = bisect_left(self._keys, key)
+        if row < len(self._keys) and self._keys[row] == key:
+            return row
+        return -1
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._keys)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return f"{self._keys[row]} - {self._names[row]}"
+        if role == Qt.UserRole:
+            return self._keys[row]
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        start = len(self._keys)
+        rows = self._query_window()
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._append(rows)
+        self.endInsertRows()
+
+    def _load_window(self):
+        self._append(self._query_window())
+
+    def _query_window(self) -> list:
+        size = self.batch_size
+        if self.limit is not None:
+            size = min(size, self.limit - len(self._keys))
+        conditions = []
+        params: List[Any] = []
+        if self._keys:
+            conditions.append(f"{self.key_column} > ?")
+            params.append(self._keys[-1])
+        if self.filter_text:
+            conditions.append(f"({self.key_column} LIKE ? OR {self.name_column} LIKE ?)")
+            params += [f"%{self.filter_text}%"] * 2
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        sql = (f"SELECT {self.key_column}, {self.name_column} FROM {self.table} "
+               f"{where}ORDER BY {self.key_column} LIMIT ?")
+        rows = self.db.execute(sql, params + [size]).fetchall()
+        if len(rows) < size or len(self._keys) + len(rows) == self.limit:
+            self._exhausted = True
+        get_metrics().add_rows(len(rows))
+        return rows
+
+    def _append(self, rows: list):
+        for key, name in rows:
+            self._keys.append(key)
+            self._names.append(name)
+        get_metrics().add_items(len(rows))
+
+
+def attach_choices(combo: QComboBox, model: ChoiceListModel, completion_limit: int = 50):
+    """
+    Backs a combo box with a shared choice model and lets the user type to find a choice.
+
+    Qt completers load their whole model, so the completer gets its own small
+    model that the database filters to the typed text instead of sharing the
+    lazily loaded one.
+
+    :param combo: The combo box to set up
+    :type combo: QComboBox
+    :param model: The model holding the choices
+    :type model: ChoiceListModel
+    :param completion_limit: The maximum number of suggestions shown, defaults to 50
+    :type completion_limit: int, optional
+    """
+    combo.setEditable(True)
+    combo.setInsertPolicy(QComboBox.NoInsert)
+    suggestions = ChoiceListModel(model.db, model.table, model.key_column, model.name_column,
+                                  batch_size=completion_limit, limit=completion_limit, parent=combo)
+    completer = QCompleter(suggestions, combo)
+    completer.setCaseSensitivity(Qt.CaseInsensitive)
+    completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+    combo.setCompleter(completer)
+    combo.setModel(model)
+    combo.lineEdit().textEdited.connect(suggestions.set_filter)
@@ -0,0 +1,305 @@
+import csv
+import gzip
+import io
+import os
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bulk import LOAD_ORDER
+from database import Database, upsert_statement
+from validation import validate_person_data
+
+CSV_FILE = 'school_data.csv'
+CSV_HEADER = ['Type', 'ID', 'Name', 'Age/Course Name', 'Email/Instructor ID']
+
+# (entity, table, statement producing rows in CSV_HEADER order)
+EXPORT_QUERIES: List[Tuple[str, str, str]] = [
+    ('students', 'students', "SELECT 'Student' as type, student_id, name, age, email FROM students"),
+    ('instructors', 'instructors', "SELECT 'Instructor' as type, instructor_id, name, age, email FROM instructors"),
+    ('courses', 'courses', "SELECT 'Course' as type, course_id, course_name, instructor_id, '' FROM courses"),
+    ('registrations', 'registrations', "SELECT 'Registration' as type, student_id, course_id, '', '' FROM registrations"),
+]
+
+
+IMPORT_TABLES = {
+    'Student': 'students',
+    'Instructor': 'instructors',
+    'Course': 'courses',
+    'Registration': 'registrations',
+}
+
+# (position in the row, referenced table, referenced column, label) for each foreign key checked on import.
+IMPORT_REFERENCES = {
+    'courses': [(2, 'instructors', 'instructor_id', 'instructor')],
+    'registrations': [(0, 'students', 'student_id', 'student'), (1, 'courses', 'course_id', 'course')],
+}
+
+
+class ExportCancelled(Exception):
+    """
+    Raised when an export is cancelled before it finishes.
+    """
+
+
+class ImportCancelled(Exception):
+    """
+    Raised when an import is cancelled. Batches committed before cancelling are kept.
+    """
+
+
+def export_paths(filename: str = CSV_FILE, per_entity: bool = False, compress: bool = False) -> Dict[str, str]:
+    """
+    Works out which file each entity is exported to.
+
+    :param filename: The name of the combined CSV file, defaults to CSV_FILE
+    :type filename: str, optional
+    :param per_entity: Whether each entity gets its own file, named after the combined file, defaults to False
+    :type per_entity: bool, optional
+    :param compress: Whether the files are gzip-compressed, defaults to False
+    :type compress: bool, optional
+    :return: The output path for each entity
+    :rtype: Dict[str, str]
+    """
+    suffix = '.gz' if compress else ''
+    if not per_entity:
+        return {entity: filename + suffix for entity, _, _ in EXPORT_QUERIES}
+    stem, extension = os.path.splitext(filename)
+    return {entity: f"{stem}_{entity}{extension or '.csv'}{suffix}" for entity, _, _ in EXPORT_QUERIES}
+
+
+def export_csv(conn: sqlite3.Connection, filename: str = CSV_FILE, per_entity: bool = False,
+               compress: bool = False, batch_size: int = 5000,
+               progress: Optional[Callable[[int, int], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+    """
+    Streams students, instructors, courses and registrations into CSV files.
+
+    Rows are read in ``fetchmany`` batches inside one read transaction and written
+    as they arrive. Each file is written under a temporary name and only replaces
+    the target once the export completes, so a cancelled or failed export leaves
+    existing files untouched.
+
+    :param conn: The connection to read from; use a dedicated one when exporting off the GUI thread
+    :type conn: sqlite3.Connection
+    :param filename: The name of the combined CSV file, defaults to CSV_FILE
+    :type filename: str, optional
+    :param per_entity: Whether each entity gets its own file, defaults to False
+    :type per_entity: bool, optional
+    :param compress: Whether to gzip the files, defaults to False
+    :type compress: bool, optional
+    :param batch_size: The number of rows fetched at a time, defaults to 5000
+    :type batch_size: int, optional
+    :param progress: Called with the rows written so far and the total after every batch
+    :type progress: Callable[[int, int], None], optional
+    :param is_cancelled: Polled after every batch; the export stops when it returns True
+    :type is_cancelled: Callable[[], bool], optional
+    :return: The number of rows exported for each entity
+    :rtype: Dict[str, int]
+    :raises ExportCancelled: If the export was cancelled
+    """
+    paths = export_paths(filename, per_entity, compress)
+    outputs = {}
+    counts = {}
+    in_transaction = conn.in_transaction
+    if not in_transaction:
+        conn.execute("BEGIN")
+    try:
+        total = sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for _, table, _ in EXPORT_QUERIES)
+        done = 0
+        if progress is not None:
+            progress(done, total)
+        for entity, _, sql in EXPORT_QUERIES:
+            path = paths[entity]
+            if path not in outputs:
+                outputs[path] = _open_output(path + '.tmp', compress)
+                csv.writer(outputs[path]).writerow(CSV_HEADER)
+            writer = csv.writer(outputs[path])
+            cursor = conn.execute(sql)
+            counts[entity] = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                counts[entity] += len(rows)
+                done += len(rows)
+                if progress is not None:
+                    progress(done, total)
+                if is_cancelled is not None and is_cancelled():
+                    raise ExportCancelled()
+        for path, output in outputs.items():
+            output.close()
+            os.replace(path + '.tmp', path)
+    finally:
+        if not in_transaction:
+            conn.rollback()
+        for path, output in outputs.items():
+            output.close()
+            if os.path.exists(path + '.tmp'):
+                os.remove(path + '.tmp')
+    return counts
+
+
+def _open_output(path: str, compress: bool):
+    if compress:
+        return gzip.open(path, 'wt', newline='', encoding='utf-8')
+    return open(path, 'w', newline='', encoding='utf-8')
+
+
+def errors_path(filename: str) -> str:
+    """
+    Works out where the rejected rows of an import are written.
+
+    :param filename: The name of the imported CSV file
+    :type filename: str
+    :return: The path of the error file, next to the imported file
+    :rtype: str
+    """
+    base = filename[:-3] if filename.endswith('.gz') else filename
+    stem, _ = os.path.splitext(base)
+    return f"{stem}_errors.csv"
+
+
+def parse_csv_row(row: List[str]) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Validates one exported CSV row and converts it into a row of the table named by its Type column.
+
+    :param row: The CSV fields, in CSV_HEADER order
+    :type row: List[str]
+    :return: The table name and the row to insert into it
+    :rtype: Tuple[str, Tuple[Any, ...]]
+    :raises ValueError: If the row is malformed or fails validation
+    """
+    if len(row) < 3:
+        raise ValueError(f"Expected {len(CSV_HEADER)} columns, got {len(row)}")
+    record_type = row[0]
+    table = IMPORT_TABLES.get(record_type)
+    if table is None:
+        raise ValueError(f"Unknown record type {record_type!r}")
+    record_id = row[1].strip()
+    if not record_id:
+        raise ValueError("ID cannot be empty")
+    if table in ('students', 'instructors'):
+        if len(row) < 5:
+            raise ValueError(f"Expected {len(CSV_HEADER)} columns, got {len(row)}")
+        name, email = row[2], row[4]
+        try:
+            age = int(row[3])
+        except ValueError:
+            raise ValueError(f"Invalid age {row[3]!r}")
+        validate_person_data(name, age, email)
+        return table, (record_id, name, age, email)
+    if table == 'courses':
+        if not row[2]:
+            raise ValueError("Course name cannot be empty")
+        instructor_id = row[3] if len(row) > 3 and row[3] else None
+        return table, (record_id, row[2], instructor_id)
+    if not row[2]:
+        raise ValueError("Course ID cannot be empty")
+    return table, (record_id, row[2])
+
+
+def import_csv(db: Database, filename: str = CSV_FILE, errors_filename: Optional[str] = None,
+               batch_size: int = 20000, progress: Optional[Callable[[int, int], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+    """
+    Streams a CSV file in the export format into the database.
+
+    Rows are dispatched on their Type column, validated, and inserted in chunked
+    transactions of ``batch_size`` rows. Existing students, instructors and
+    courses are updated and duplicate registrations are ignored. Rows that fail
+    validation or reference a missing student, instructor or course are written
+    to an error file with their line number and the reason, instead of stopping
+    the import. Gzip files are read transparently.
+
+    :param db: The database to import into
+    :type db: Database
+    :param filename: The name of the CSV file, defaults to CSV_FILE
+    :type filename: str, optional
+    :param errors_filename: Where to write rejected rows, defaults to errors_path(filename)
+    :type errors_filename: str, optional
+    :param batch_size: The number of rows committed per transaction, defaults to 20000
+    :type batch_size: int, optional
+    :param progress: Called with the bytes read so far and the file size after every batch
+    :type progress: Callable[[int, int], None], optional
+    :param is_cancelled: Polled after every batch; the import stops when it returns True
+    :type is_cancelled: Callable[[], bool], optional
+    :return: The number of rows inserted or updated in each table, plus 'rejected'
+    :rtype: Dict[str, int]
+    :raises ImportCancelled: If the import was cancelled
+    """
+    errors_filename = errors_filename or errors_path(filename)
+    counts = {table: 0 for table in LOAD_ORDER}
+    counts['rejected'] = 0
+    pending: Dict[str, List[Tuple[int, List[str], Tuple[Any, ...]]]] = {table: [] for table in LOAD_ORDER}
+    statements = {table: upsert_statement(table) for table in LOAD_ORDER}
+    total = os.path.getsize(filename)
+    errors: List[Any] = []
+
+    def reject(line_number: int, row: List[str], message: str):
+        if not errors:
+            errors.append(open(errors_filename, 'w', newline='', encoding='utf-8'))
+            errors.append(csv.writer(errors[0]))
+            errors[1].writerow(['Line', 'Error'] + CSV_HEADER)
+        errors[1].writerow([line_number, message] + row)
+        counts['rejected'] += 1
+
+    def flush():
+        with db.transaction() as conn:
+            for table in LOAD_ORDER:
+                rows = pending[table]
+                if table in IMPORT_REFERENCES:
+                    # Referenced rows of this batch were inserted by the tables flushed before.
+                    accepted = []
+                    for line_number, row, values in rows:
+                        message = _missing_reference(conn, table, values)
+                        if message is None:
+                            accepted.append(values)
+                        else:
+                            reject(line_number, row, message)
+                else:
+                    accepted = [values for _, _, values in rows]
+                if accepted:
+                    # rowcount leaves out registrations that were already there.
+                    counts[table] += conn.executemany(statements[table], accepted).rowcount
+                pending[table] = []
+
+    with open(filename, 'rb') as raw:
+        stream = gzip.GzipFile(fileobj=raw) if filename.endswith('.gz') else raw
+        reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+        try:
+            buffered = 0
+            for line_number, row in enumerate(reader, start=1):
+                if line_number == 1 and row == CSV_HEADER:
+                    continue
+                if not row:
+                    continue
+                try:
+                    table, values = parse_csv_row(row)
+                except ValueError as e:
+                    reject(line_number, row, str(e))
+                    continue
+                pending[table].append((line_number, row, values))
+                buffered += 1
+                if buffered >= batch_size:
+                    flush()
+                    buffered = 0
+                    if progress is not None:
+                        progress(raw.tell(), total)
+                    if is_cancelled is not None and is_cancelled():
+                        raise ImportCancelled()
+            flush()
+            if progress is not None:
+                progress(total, total)
+        finally:
+            if errors:
+                errors[0].close()
+    return counts
+
+
+def _missing_reference(conn: sqlite3.Connection, table: str, values: Tuple[Any, ...]) -> Optional[str]:
+    for position, referenced, column, label in IMPORT_REFERENCES[table]:
+        key = values[position]
+        if key is not None and conn.execute(f"SELECT 1 FROM {referenced} WHERE {column}=?", (key,)).fetchone() is None:
+            return f"Unknown {label} {key!r}"
+    return None
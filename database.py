@@ -0,0 +1,359 @@
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+DEFAULT_DB_PATH = 'school_management.db'
+
+# Overrides DEFAULT_DB_PATH for the shared database.
+DB_PATH_ENV = 'SCHOOL_DB_PATH'
+
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+CREATE_TABLES_SQL = (
+    '''CREATE TABLE IF NOT EXISTS students (
+        student_id TEXT PRIMARY KEY,
+        name TEXT,
+        age INTEGER,
+        email TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS instructors (
+        instructor_id TEXT PRIMARY KEY,
+        name TEXT,
+        age INTEGER,
+        email TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS courses (
+        course_id TEXT PRIMARY KEY,
+        course_name TEXT,
+        instructor_id TEXT,
+        FOREIGN KEY (instructor_id) REFERENCES instructors (instructor_id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS registrations (
+        student_id TEXT,
+        course_id TEXT,
+        FOREIGN KEY (student_id) REFERENCES students (student_id),
+        FOREIGN KEY (course_id) REFERENCES courses (course_id),
+        PRIMARY KEY (student_id, course_id)
+    )''',
+)
+
+
+class Database:
+    """
+    Owns a single long-lived SQLite connection for the School Management System.
+
+    The connection is opened lazily on first use and configured once with the
+    given pragmas, so handlers no longer pay for a file open, schema load and
+    lock setup on every click.
+
+    :param path: The path of the SQLite database file, or a ``file:`` URI
+    :type path: str
+    :param pragmas: Pragmas applied when the connection is opened, defaults to DEFAULT_PRAGMAS
+    :type pragmas: Dict[str, Any], optional
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, pragmas: Optional[Dict[str, Any]] = None):
+
+        self.path = path
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        _databases.add(self)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Opens a new connection to the database file with the configured pragmas.
+
+        The shared connection is created through this method; it can also be used
+        to open private connections for worker threads.
+
+        :return: A newly opened connection
+        :rtype: sqlite3.Connection
+        """
+        conn = sqlite3.connect(self.path, check_same_thread=False, uri=self.path.startswith('file:'))
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        if _statement_tracer is not None:
+            conn.set_trace_callback(_statement_tracer)
+        return conn
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        The shared connection, opened on first access.
+        """
+        if self._conn is None:
+            with self.lock:
+                if self._conn is None:
+                    self._conn = self.connect()
+        return self._conn
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """
+        Executes a single statement on the shared connection.
+
+        :param sql: The SQL statement to execute
+        :type sql: str
+        :param params: The statement parameters, defaults to ()
+        :type params: Sequence[Any], optional
+        :return: The cursor holding the statement results
+        :rtype: sqlite3.Cursor
+        """
+        with self.lock:
+            return self.connection.execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        """
+        Executes a statement once for every row on the shared connection.
+
+        :param sql: The SQL statement to execute
+        :type sql: str
+        :param rows: The parameters for each execution
+        :type rows: Iterable[Sequence[Any]]
+        :return: The cursor used for the executions
+        :rtype: sqlite3.Cursor
+        """
+        with self.lock:
+            return self.connection.executemany(sql, rows)
+
+    def commit(self):
+        """
+        Commits the current transaction.
+        """
+        with self.lock:
+            self.connection.commit()
+
+    def rollback(self):
+        """
+        Rolls back the current transaction.
+        """
+        with self.lock:
+            self.connection.rollback()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs a block inside one transaction, committing on success and rolling back on error.
+
+        When a transaction is already open, the block joins it and the outermost
+        block decides whether to commit.
+
+        :return: The shared connection
+        :rtype: Iterator[sqlite3.Connection]
+        """
+        with self.lock:
+            conn = self.connection
+            started = not conn.in_transaction
+            if started:
+                conn.execute("BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                if started:
+                    conn.rollback()
+                raise
+            else:
+                if started:
+                    try:
+                        conn.commit()
+                    except BaseException:
+                        # A failed COMMIT, such as one refused while a reader holds a lock, leaves
+                        # the transaction open; later blocks would join it and never commit.
+                        conn.rollback()
+                        raise
+
+    def close(self):
+        """
+        Closes the shared connection. It is reopened on the next access.
+        """
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def create_tables(self):
+        """
+        Creates the school tables if they do not exist yet.
+        """
+        with self.transaction() as conn:
+            for sql in CREATE_TABLES_SQL:
+                conn.execute(sql)
+
+
+_default_database: Optional[Database] = None
+
+# Every Database still in use, so that a statement tracer reaches their shared connections.
+_databases: 'weakref.WeakSet[Database]' = weakref.WeakSet()
+
+_statement_tracer: Optional[Callable[[str], None]] = None
+
+
+def get_database() -> Database:
+    """
+    Returns the process-wide shared database, creating it on first use.
+
+    The database file is taken from the SCHOOL_DB_PATH environment variable,
+    falling back to DEFAULT_DB_PATH.
+
+    :return: The shared database
+    :rtype: Database
+    """
+    global _default_database
+    if _default_database is None:
+        _default_database = Database(os.environ.get(DB_PATH_ENV) or DEFAULT_DB_PATH)
+    return _default_database
+
+
+def memory_database(name: str = 'school') -> Database:
+    """
+    Creates a database held in RAM.
+
+    Every connection the returned database opens, including the private ones
+    of worker threads, shares the same data. The data is discarded once the
+    last of those connections closes. Readers may see uncommitted writes.
+
+    :param name: Distinguishes independent in-memory databases, defaults to 'school'
+    :type name: str, optional
+    :return: The in-memory database
+    :rtype: Database
+    """
+    return Database(f"file:{name}?mode=memory&cache=shared", dict(DEFAULT_PRAGMAS, read_uncommitted=1))
+
+
+def set_statement_tracer(tracer: Optional[Callable[[str], None]]):
+    """
+    Calls a function with the text of every statement run from now on, on any connection.
+
+    The tracer is installed with ``set_trace_callback`` on the shared connection
+    of every open database and on every connection opened afterwards, including
+    the private connections of worker threads. Tracing costs nothing while no
+    tracer is set.
+
+    :param tracer: Called with each statement, with its parameters expanded, or None to stop tracing
+    :type tracer: Callable[[str], None], optional
+    """
+    global _statement_tracer
+    _statement_tracer = tracer
+    for database in list(_databases):
+        with database.lock:
+            if database._conn is not None:
+                database._conn.set_trace_callback(tracer)
+
+
+def set_database(database: Database):
+    """
+    Replaces the process-wide shared database, closing the previous one.
+
+    :param database: The database to share from now on
+    :type database: Database
+    """
+    global _default_database
+    if _default_database is not None and _default_database is not database:
+        _default_database.close()
+    _default_database = database
+
+
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'students': ('student_id', 'name', 'age', 'email'),
+    'instructors': ('instructor_id', 'name', 'age', 'email'),
+    'courses': ('course_id', 'course_name', 'instructor_id'),
+    'registrations': ('student_id', 'course_id'),
+}
+
+
+def insert_statement(table: str, conflict: str = "") -> str:
+    """
+    Builds the parameterised INSERT statement for one of the school tables.
+
+    :param table: The name of the table
+    :type table: str
+    :param conflict: An optional conflict clause such as "OR IGNORE", defaults to ""
+    :type conflict: str, optional
+    :return: The INSERT statement
+    :rtype: str
+    """
+    columns = TABLE_COLUMNS[table]
+    verb = f"INSERT {conflict} INTO" if conflict else "INSERT INTO"
+    return f"{verb} {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def upsert_statement(table: str) -> str:
+    """
+    Builds an INSERT statement that updates the existing row when the primary key is taken.
+
+    Tables whose columns are all part of the key ignore duplicates instead.
+
+    :param table: The name of the table
+    :type table: str
+    :return: The INSERT ... ON CONFLICT statement
+    :rtype: str
+    """
+    columns = TABLE_COLUMNS[table]
+    if table == 'registrations':
+        return insert_statement(table, "OR IGNORE")
+    updates = ", ".join(f"{column}=excluded.{column}" for column in columns[1:])
+    return f"{insert_statement(table)} ON CONFLICT({columns[0]}) DO UPDATE SET {updates}"
+
+
+def iter_table(db: Database, table: str, batch_size: int = 1000) -> Iterator[Tuple[Any, ...]]:
+    """
+    Reads every row of a school table in ``fetchmany`` batches.
+
+    :param db: The database to read from
+    :type db: Database
+    :param table: The name of the table
+    :type table: str
+    :param batch_size: The number of rows fetched at a time, defaults to 1000
+    :type batch_size: int, optional
+    :return: An iterator over the rows, in the column order of TABLE_COLUMNS
+    :rtype: Iterator[Tuple[Any, ...]]
+    """
+    cursor = db.execute(f"SELECT {', '.join(TABLE_COLUMNS[table])} FROM {table}")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+RECORD_HEADERS = ["Type", "ID", "Name", "Age/Course Name", "Email/Instructor ID"]
+
+# The rows of each table in RECORD_HEADERS order.
+RECORD_SELECTS = {
+    'students': "SELECT 'Student' as type, student_id, name, age, email FROM students",
+    'instructors': "SELECT 'Instructor' as type, instructor_id, name, age, email FROM instructors",
+    'courses': "SELECT 'Course' as type, course_id, course_name, instructor_id, '' FROM courses",
+}
+
+RECORDS_SQL = " UNION ALL ".join(RECORD_SELECTS.values())
+
+
+def search_query(query: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Builds the statement used to search students, instructors and courses by name or ID.
+
+    :param query: The text to search for
+    :type query: str
+    :return: The SQL statement and its parameters
+    :rtype: Tuple[str, Tuple[str, ...]]
+    """
+    pattern = f"%{query}%"
+    sql = (
+        "SELECT 'Student' as type, student_id, name, age, email FROM students "
+        "WHERE name LIKE ? OR student_id LIKE ? "
+        "UNION ALL SELECT 'Instructor' as type, instructor_id, name, age, email FROM instructors "
+        "WHERE name LIKE ? OR instructor_id LIKE ? "
+        "UNION ALL SELECT 'Course' as type, course_id, course_name, instructor_id, '' FROM courses "
+        "WHERE course_name LIKE ? OR course_id LIKE ?"
+    )
+    return sql, (pattern,) * 6
@@ -0,0 +1,139 @@
+import bisect
+import itertools
+import random
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bulk import bulk_load
+from database import Database
+
+# Named dataset sizes, as numbers of students.
+SCALES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+FIRST_NAMES = (
+    'Alice', 'Bilal', 'Chloe', 'Dimitri', 'Elena', 'Farah', 'Georges', 'Hana', 'Ivan', 'Jana',
+    'Karim', 'Lea', 'Marc', 'Nour', 'Omar', 'Paula', 'Rami', 'Sara', 'Tarek', 'Yara',
+)
+LAST_NAMES = (
+    'Abboud', 'Bishara', 'Chami', 'Daher', 'Haddad', 'Khoury', 'Mansour', 'Nassar', 'Rizk', 'Saad',
+    'Salem', 'Tannous', 'Toumieh', 'Wehbe', 'Younes', 'Zein',
+)
+SUBJECTS = (
+    'Algebra', 'Biology', 'Chemistry', 'Databases', 'Economics', 'French', 'Geometry', 'History',
+    'Linguistics', 'Networks', 'Physics', 'Statistics',
+)
+LEVELS = ('I', 'II', 'III', 'Advanced', 'Seminar')
+
+
+def dataset_size(students: int) -> Dict[str, int]:
+    """
+    Works out how many instructors and courses go with a number of students.
+
+    :param students: The number of students
+    :type students: int
+    :return: The number of students, instructors and courses
+    :rtype: Dict[str, int]
+    """
+    return {'students': students, 'instructors': max(1, students // 60), 'courses': max(1, students // 25)}
+
+
+def generate(students: int, seed: int = 0, registrations_per_student: float = 4.0) -> Dict[str, Iterator[Tuple[Any, ...]]]:
+    """
+    Generates a synthetic school in the row format of the school tables.
+
+    Student ages cluster around 20 with a tail of mature students, instructor
+    ages spread from late twenties to seventy, a few courses have no
+    instructor, and course popularity follows a Zipf-like curve so that some
+    courses are much fuller than others. IDs are zero-padded so that ID order
+    matches creation order.
+
+    Each table is drawn from its own random generator derived from the seed, so
+    the same seed always produces the same rows whatever order they are read in.
+    Rows are produced lazily, so the 1M-student scale does not need to fit in memory.
+
+    :param students: The number of students
+    :type students: int
+    :param seed: The random seed, defaults to 0
+    :type seed: int, optional
+    :param registrations_per_student: The mean number of courses per student, defaults to 4.0
+    :type registrations_per_student: float, optional
+    :return: Row iterators keyed by table name
+    :rtype: Dict[str, Iterator[Tuple[Any, ...]]]
+    """
+    size = dataset_size(students)
+    return {
+        'instructors': _instructors(size['instructors'], random.Random(f"{seed}-instructors")),
+        'students': _students(students, random.Random(f"{seed}-students")),
+        'courses': _courses(size['courses'], size['instructors'], random.Random(f"{seed}-courses")),
+        'registrations': _registrations(students, size['courses'], registrations_per_student,
+                                        random.Random(f"{seed}-registrations")),
+    }
+
+
+def populate(db: Database, students: int, seed: int = 0, registrations_per_student: float = 4.0) -> Dict[str, int]:
+    """
+    Replaces the contents of a database with a generated school.
+
+    :param db: The database to fill
+    :type db: Database
+    :param students: The number of students
+    :type students: int
+    :param seed: The random seed, defaults to 0
+    :type seed: int, optional
+    :param registrations_per_student: The mean number of courses per student, defaults to 4.0
+    :type registrations_per_student: float, optional
+    :return: The number of rows inserted into each table
+    :rtype: Dict[str, int]
+    """
+    return bulk_load(db, generate(students, seed, registrations_per_student), defer_indexes=True)
+
+
+def _key(prefix: str, number: int, count: int) -> str:
+    return f"{prefix}{number:0{len(str(count))}d}"
+
+
+def _person(rng: random.Random, number: int) -> Tuple[str, str]:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    return f"{first} {last}", f"{first}.{last}{number}@school.edu".lower()
+
+
+def _students(count: int, rng: random.Random) -> Iterator[Tuple[str, str, int, str]]:
+    for i in range(count):
+        name, email = _person(rng, i)
+        if rng.random() < 0.03:
+            age = rng.randint(26, 60)
+        else:
+            age = min(max(round(rng.gauss(20.5, 2.0)), 17), 30)
+        yield _key('S', i, count), name, age, email
+
+
+def _instructors(count: int, rng: random.Random) -> Iterator[Tuple[str, str, int, str]]:
+    for i in range(count):
+        name, email = _person(rng, i)
+        yield _key('I', i, count), name, min(max(round(rng.gauss(45, 9)), 27), 70), email
+
+
+def _courses(count: int, instructors: int, rng: random.Random) -> Iterator[Tuple[str, str, Optional[str]]]:
+    for i in range(count):
+        name = f"{rng.choice(SUBJECTS)} {rng.choice(LEVELS)}"
+        instructor_id = None if rng.random() < 0.03 else _key('I', rng.randrange(instructors), instructors)
+        yield _key('C', i, count), name, instructor_id
+
+
+def _registrations(students: int, courses: int, mean: float,
+                   rng: random.Random) -> Iterator[Tuple[str, str]]:
+    popularity = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(courses)))
+    total = popularity[-1]
+    # Popularity rank and course ID are shuffled apart so that popular courses are spread out.
+    order = list(range(courses))
+    rng.shuffle(order)
+    for i in range(students):
+        wanted = min(courses, max(1, round(rng.gauss(mean, 1.5))))
+        chosen: List[int] = []
+        while len(chosen) < wanted:
+            course = order[bisect.bisect_left(popularity, rng.random() * total)]
+            if course not in chosen:
+                chosen.append(course)
+        student_id = _key('S', i, students)
+        for course in chosen:
+            yield student_id, _key('C', course, courses)
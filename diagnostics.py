@@ -0,0 +1,112 @@
+import os
+from typing import Optional
+
+from PyQt5.QtGui import QFontDatabase
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QFileDialog, QHBoxLayout, QMessageBox, QPlainTextEdit, QPushButton,
+                             QVBoxLayout, QWidget)
+
+from metrics import Metrics
+from profiling import Profiler
+
+
+class DiagnosticsPanel(QDialog):
+    """
+    Shows the metrics collected by the instrumented handlers and lets them be exported as JSON.
+    It also turns profiling of the slow handlers on and off.
+
+    The panel is not reachable from a button; the main window opens it with a
+    keyboard shortcut.
+
+    :param metrics: The metrics to show
+    :type metrics: Metrics
+    :param profiler: The profiler to toggle, defaults to None
+    :type profiler: Profiler, optional
+    :param parent: The parent widget, defaults to None
+    :type parent: QWidget, optional
+    """
+
+    def __init__(self, metrics: Metrics, profiler: Optional[Profiler] = None, parent: Optional[QWidget] = None):
+
+        super().__init__(parent)
+        self.metrics = metrics
+        self.profiler = profiler
+        self.setWindowTitle("Diagnostics")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+        self.enabled_check = QCheckBox("Collect metrics")
+        self.enabled_check.setChecked(metrics.enabled)
+        self.enabled_check.toggled.connect(self.set_enabled)
+        layout.addWidget(self.enabled_check)
+        if profiler is not None:
+            self.profile_check = QCheckBox(f"Profile {', '.join(sorted(profiler.actions))} "
+                                           f"into {os.path.abspath(profiler.directory)}")
+            self.profile_check.setChecked(profiler.enabled)
+            self.profile_check.toggled.connect(self.set_profiling)
+            layout.addWidget(self.profile_check)
+
+        self.report_view = QPlainTextEdit()
+        self.report_view.setReadOnly(True)
+        self.report_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.report_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.report_view)
+
+        buttons = QHBoxLayout()
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.refresh)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.reset)
+        self.export_button = QPushButton("Export JSON...")
+        self.export_button.clicked.connect(self.export_json)
+        buttons.addWidget(self.refresh_button)
+        buttons.addWidget(self.reset_button)
+        buttons.addStretch()
+        buttons.addWidget(self.export_button)
+        layout.addLayout(buttons)
+
+        self.refresh()
+
+    def set_enabled(self, enabled: bool):
+        """
+        Turns collection on or off.
+
+        :param enabled: Whether to collect metrics
+        :type enabled: bool
+        """
+        if enabled:
+            self.metrics.enable()
+        else:
+            self.metrics.disable()
+        self.refresh()
+
+    def set_profiling(self, enabled: bool):
+        """
+        Turns profiling of the selected handlers on or off.
+
+        :param enabled: Whether to profile
+        :type enabled: bool
+        """
+        self.profiler.enabled = enabled
+
+    def refresh(self):
+        """Shows the metrics collected so far."""
+        if not self.metrics.enabled and not self.metrics.actions:
+            self.report_view.setPlainText("Metrics are off. Tick Collect metrics, or start the application "
+                                          "with SCHOOL_METRICS=1.")
+            return
+        self.report_view.setPlainText(self.metrics.report(statements=25))
+
+    def reset(self):
+        """Forgets the metrics collected so far."""
+        self.metrics.reset()
+        self.refresh()
+
+    def export_json(self):
+        """Writes the metrics to a JSON file chosen by the user."""
+        filename, _ = QFileDialog.getSaveFileName(self, "Export metrics", "metrics.json", "JSON files (*.json)")
+        if not filename:
+            return
+        try:
+            self.metrics.export_json(filename)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Error exporting metrics: {e}")
@@ -0,0 +1,175 @@
+from typing import AbstractSet, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from database import Database, iter_table
+
+_EMPTY: AbstractSet[str] = frozenset()
+
+
+class EnrolmentGraph:
+    """
+    Registrations and course assignments held in memory, keyed by ID.
+
+    Registrations are indexed from both sides, students to courses and courses
+    to students, as are course assignments, so registering, unregistering and
+    membership checks are O(1) and both directions always agree. Registering
+    twice is a no-op.
+    """
+
+    def __init__(self):
+
+        self._courses_of: Dict[str, Set[str]] = {}
+        self._students_of: Dict[str, Set[str]] = {}
+        self._instructor_of: Dict[str, str] = {}
+        self._courses_taught: Dict[str, Set[str]] = {}
+        self._count = 0
+
+    @classmethod
+    def from_rows(cls, registrations: Iterable[Tuple[str, str]],
+                  courses: Iterable[Tuple[str, str, Optional[str]]] = ()) -> 'EnrolmentGraph':
+        """
+        Builds a graph from registration rows and, optionally, course rows.
+
+        :param registrations: (student ID, course ID) pairs
+        :type registrations: Iterable[Tuple[str, str]]
+        :param courses: (course ID, course name, instructor ID) rows, defaults to none
+        :type courses: Iterable[Tuple[str, str, Optional[str]]], optional
+        :rtype: EnrolmentGraph
+        """
+        graph = cls()
+        courses_of = graph._courses_of
+        students_of = graph._students_of
+        count = 0
+        for student_id, course_id in registrations:
+            taken = courses_of.get(student_id)
+            if taken is None:
+                taken = courses_of[student_id] = set()
+            elif course_id in taken:
+                continue
+            taken.add(course_id)
+            count += 1
+            students = students_of.get(course_id)
+            if students is None:
+                students = students_of[course_id] = set()
+            students.add(student_id)
+        graph._count = count
+        for course_id, _, instructor_id in courses:
+            graph.assign(course_id, instructor_id)
+        return graph
+
+    @classmethod
+    def from_database(cls, db: Database, batch_size: int = 10000) -> 'EnrolmentGraph':
+        """
+        Loads every registration and course assignment in one pass over each table.
+
+        :param db: The database to load from
+        :type db: Database
+        :param batch_size: The number of rows fetched at a time, defaults to 10000
+        :type batch_size: int, optional
+        :rtype: EnrolmentGraph
+        """
+        with db.transaction():
+            return cls.from_rows(iter_table(db, 'registrations', batch_size), iter_table(db, 'courses', batch_size))
+
+    def register(self, student_id: str, course_id: str) -> bool:
+        """
+        Registers a student to a course.
+
+        :return: Whether the registration is new
+        :rtype: bool
+        """
+        courses = self._courses_of.setdefault(student_id, set())
+        if course_id in courses:
+            return False
+        courses.add(course_id)
+        self._students_of.setdefault(course_id, set()).add(student_id)
+        self._count += 1
+        return True
+
+    def unregister(self, student_id: str, course_id: str) -> bool:
+        """
+        Removes the registration of a student to a course.
+
+        :return: Whether the student was registered
+        :rtype: bool
+        """
+        courses = self._courses_of.get(student_id)
+        if courses is None or course_id not in courses:
+            return False
+        courses.discard(course_id)
+        self._students_of[course_id].discard(student_id)
+        self._count -= 1
+        return True
+
+    def is_registered(self, student_id: str, course_id: str) -> bool:
+        """
+        Tells whether a student is registered to a course.
+        """
+        return course_id in self._courses_of.get(student_id, _EMPTY)
+
+    def courses_of(self, student_id: str) -> AbstractSet[str]:
+        """
+        The IDs of the courses a student is registered to. The set is live and must not be modified.
+        """
+        return self._courses_of.get(student_id, _EMPTY)
+
+    def students_in(self, course_id: str) -> AbstractSet[str]:
+        """
+        The IDs of the students registered to a course. The set is live and must not be modified.
+        """
+        return self._students_of.get(course_id, _EMPTY)
+
+    def assign(self, course_id: str, instructor_id: Optional[str]):
+        """
+        Makes an instructor teach a course, replacing its previous instructor. None unassigns it.
+        """
+        previous = self._instructor_of.pop(course_id, None)
+        if previous is not None:
+            self._courses_taught[previous].discard(course_id)
+        if instructor_id is not None:
+            self._instructor_of[course_id] = instructor_id
+            self._courses_taught.setdefault(instructor_id, set()).add(course_id)
+
+    def instructor_of(self, course_id: str) -> Optional[str]:
+        """
+        The ID of the instructor teaching a course, or None.
+        """
+        return self._instructor_of.get(course_id)
+
+    def courses_taught_by(self, instructor_id: str) -> AbstractSet[str]:
+        """
+        The IDs of the courses an instructor teaches. The set is live and must not be modified.
+        """
+        return self._courses_taught.get(instructor_id, _EMPTY)
+
+    def remove_student(self, student_id: str):
+        """
+        Removes a student and every registration of theirs.
+        """
+        courses = self._courses_of.pop(student_id, ())
+        for course_id in courses:
+            self._students_of[course_id].discard(student_id)
+        self._count -= len(courses)
+
+    def remove_course(self, course_id: str):
+        """
+        Removes a course, its registrations and its assignment.
+        """
+        students = self._students_of.pop(course_id, ())
+        for student_id in students:
+            self._courses_of[student_id].discard(course_id)
+        self._count -= len(students)
+        self.assign(course_id, None)
+
+    def registrations(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterates over every (student ID, course ID) registration.
+        """
+        for student_id, courses in self._courses_of.items():
+            for course_id in courses:
+                yield student_id, course_id
+
+    def __len__(self) -> int:
+        """
+        The number of registrations.
+        """
+        return self._count
@@ -0,0 +1,369 @@
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from database import set_statement_tracer
+
+# Setting this environment variable to a non-empty value turns metrics on at startup.
+METRICS_ENV = 'SCHOOL_METRICS'
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Statements are grouped by their text with literals replaced by ?, up to this many distinct ones.
+MAX_STATEMENTS = 500
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+# The action name under which statements run outside any instrumented action are counted.
+BACKGROUND = '(background)'
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Turns a traced statement back into its template, so that executions with different values are grouped.
+
+    :param sql: The statement, with its parameters expanded
+    :type sql: str
+    :rtype: str
+    """
+    return _SPACES.sub(' ', _LITERALS.sub('?', sql)).strip()
+
+
+class Histogram:
+    """
+    Counts latencies in fixed buckets, keeping the total and the maximum.
+
+    :param bounds: The upper bound of each bucket in milliseconds, defaults to LATENCY_BUCKETS_MS
+    :type bounds: Tuple[float, ...], optional
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, milliseconds: float):
+        """
+        Adds one latency.
+
+        :param milliseconds: The latency in milliseconds
+        :type milliseconds: float
+        """
+        self.counts[bisect_left(self.bounds, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        if milliseconds > self.max:
+            self.max = milliseconds
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimates a percentile as the upper bound of the bucket it falls in.
+
+        :param fraction: The percentile, between 0 and 1
+        :type fraction: float
+        :return: The estimate in milliseconds, capped at the maximum seen
+        :rtype: float
+        """
+        if not self.count:
+            return 0.0
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= fraction * self.count:
+                return min(bound, self.max)
+        return self.max
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Summarises the histogram.
+
+        :rtype: Dict[str, Any]
+        """
+        labels = [f"<={bound}ms" for bound in self.bounds] + [f">{self.bounds[-1]}ms"]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max, 3),
+            'buckets': {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class ActionStats:
+    """
+    What the invocations of one action cost.
+    """
+    __slots__ = ('latency', 'statements', 'sql_ms', 'rows_fetched', 'items_created')
+
+    def __init__(self):
+
+        self.latency = Histogram()
+        self.statements = 0
+        self.sql_ms = 0.0
+        self.rows_fetched = 0
+        self.items_created = 0
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Summarises the action.
+
+        :rtype: Dict[str, Any]
+        """
+        return {
+            'latency': self.latency.to_json(),
+            'statements': self.statements,
+            'sql_ms': round(self.sql_ms, 3),
+            'rows_fetched': self.rows_fetched,
+            'items_created': self.items_created,
+        }
+
+
+class Metrics:
+    """
+    Collects per-action latency histograms, SQL statement timings, and counts
+    of rows fetched and model items created.
+
+    While disabled, instrumented handlers call straight through and no
+    statement tracer is installed, so the cost is one attribute check.
+
+    Statements are seen through ``set_trace_callback``, which reports when a
+    statement starts. A statement run inside an action is timed until the next
+    statement on the same thread or the end of the action, so its time
+    includes fetching its rows. The current action is tracked per thread:
+    statements, rows and items of other threads, such as the background
+    writer and search, are counted under BACKGROUND and not timed.
+
+    :param enabled: Whether to collect from the start, defaults to False
+    :type enabled: bool, optional
+    """
+
+    def __init__(self, enabled: bool = False):
+
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.actions: Dict[str, ActionStats] = {}
+        self.statements: Dict[str, List[float]] = {}
+        self._local = threading.local()
+        self._pending: Dict[int, Tuple[str, float, ActionStats]] = {}
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        """
+        Starts collecting.
+        """
+        self.enabled = True
+        set_statement_tracer(self._trace)
+
+    def disable(self):
+        """
+        Stops collecting, keeping what was collected so far.
+        """
+        self.enabled = False
+        set_statement_tracer(None)
+
+    def reset(self):
+        """
+        Forgets everything collected so far.
+        """
+        with self.lock:
+            self.actions = {}
+            self.statements = {}
+            self._pending = {}
+
+    @contextmanager
+    def action(self, name: str) -> Iterator[None]:
+        """
+        Measures a block as one invocation of an action.
+
+        :param name: The name of the action
+        :type name: str
+        """
+        if not self.enabled:
+            yield
+            return
+        with self.lock:
+            stats = self.actions.get(name)
+            if stats is None:
+                stats = self.actions[name] = ActionStats()
+            outer = self._current
+            self._local.current = stats
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self._close_pending(end)
+                stats.latency.record((end - start) * 1000)
+                self._local.current = outer
+
+    def instrument(self, name: str, handler: Callable[[], Any]) -> Callable[[], Any]:
+        """
+        Wraps a handler so that each call is measured as an action.
+
+        The wrapper takes no arguments, so it can be connected to signals such as
+        ``clicked`` without receiving their arguments.
+
+        :param name: The name of the action
+        :type name: str
+        :param handler: The handler to wrap
+        :type handler: Callable[[], Any]
+        :return: The wrapped handler
+        :rtype: Callable[[], Any]
+        """
+        def run():
+            if not self.enabled:
+                return handler()
+            with self.action(name):
+                return handler()
+        run.__name__ = getattr(handler, '__name__', name)
+        run.__doc__ = handler.__doc__
+        return run
+
+    def add_rows(self, count: int):
+        """
+        Counts rows fetched from the database for the current action.
+
+        :param count: The number of rows
+        :type count: int
+        """
+        if self.enabled:
+            with self.lock:
+                self._stats().rows_fetched += count
+
+    def add_items(self, count: int):
+        """
+        Counts items added to Qt models for the current action.
+
+        :param count: The number of items
+        :type count: int
+        """
+        if self.enabled:
+            with self.lock:
+                self._stats().items_created += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summarises everything collected so far.
+
+        :return: Per-action statistics and per-statement timings, slowest statements first
+        :rtype: Dict[str, Any]
+        """
+        with self.lock:
+            statements = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+            return {
+                'enabled': self.enabled,
+                'actions': {name: stats.to_json() for name, stats in sorted(self.actions.items())},
+                'statements': [
+                    {'sql': sql, 'count': int(count), 'total_ms': round(total, 3), 'max_ms': round(slowest, 3)}
+                    for sql, (count, total, slowest) in statements
+                ],
+            }
+
+    def export_json(self, filename: str):
+        """
+        Writes the snapshot to a JSON file.
+
+        :param filename: The file to write
+        :type filename: str
+        """
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+    def report(self, statements: int = 10) -> str:
+        """
+        Formats the snapshot as plain text.
+
+        :param statements: The number of slowest statements listed, defaults to 10
+        :type statements: int, optional
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+        lines = [f"{'action':<28}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+                 f"{'SQL':>8}{'SQL ms':>10}{'rows':>9}{'items':>9}"]
+        for name, stats in snapshot['actions'].items():
+            latency = stats['latency']
+            lines.append(f"{name:<28}{latency['count']:>7}{latency['p50_ms']:>9.1f}{latency['p95_ms']:>9.1f}"
+                         f"{latency['max_ms']:>9.1f}{stats['statements']:>8}{stats['sql_ms']:>10.1f}"
+                         f"{stats['rows_fetched']:>9}{stats['items_created']:>9}")
+        lines.append("")
+        lines.append(f"{'count':>7}{'total ms':>11}{'max ms':>9}  statement")
+        for statement in snapshot['statements'][:statements]:
+            lines.append(f"{statement['count']:>7}{statement['total_ms']:>11.1f}{statement['max_ms']:>9.1f}"
+                         f"  {statement['sql'][:200]}")
+        return "\n".join(lines)
+
+    @property
+    def _current(self) -> Optional[ActionStats]:
+        return getattr(self._local, 'current', None)
+
+    def _stats(self) -> ActionStats:
+        # Called with the lock held.
+        stats = self._current
+        if stats is None:
+            stats = self.actions.get(BACKGROUND)
+            if stats is None:
+                stats = self.actions[BACKGROUND] = ActionStats()
+        return stats
+
+    def _trace(self, sql: str):
+        now = time.perf_counter()
+        thread = threading.get_ident()
+        with self.lock:
+            pending = self._pending.pop(thread, None)
+            if pending is not None:
+                self._record(pending[0], now - pending[1], pending[2])
+            stats = self._stats()
+            stats.statements += 1
+            template = normalize_sql(sql)
+            if self._current is not None:
+                self._pending[thread] = (template, now, stats)
+            else:
+                self._record(template, None, None)
+
+    def _close_pending(self, now: float):
+        pending = self._pending.pop(threading.get_ident(), None)
+        if pending is not None:
+            self._record(pending[0], now - pending[1], pending[2])
+
+    def _record(self, template: str, seconds: Optional[float], stats: Optional[ActionStats]):
+        timing = self.statements.get(template)
+        if timing is None:
+            if len(self.statements) >= MAX_STATEMENTS:
+                return
+            timing = self.statements[template] = [0, 0.0, 0.0]
+        timing[0] += 1
+        if seconds is not None:
+            milliseconds = seconds * 1000
+            timing[1] += milliseconds
+            if milliseconds > timing[2]:
+                timing[2] = milliseconds
+            stats.sql_ms += milliseconds
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """
+    Returns the process-wide metrics, enabled when SCHOOL_METRICS is set.
+
+    :rtype: Metrics
+    """
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(enabled=bool(os.environ.get(METRICS_ENV)))
+    return _metrics
@@ -0,0 +1,436 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from database import TABLE_COLUMNS, get_database
+from schema import migrate
+from search import create_search_index
+from snapshot import iter_records, record_to_row, write_records
+
+# Domain events are INFO records carrying an ``event`` name and the IDs involved
+# as record attributes. Nothing is formatted unless INFO is enabled for this logger.
+logger = logging.getLogger(__name__)
+
+
+class Person:
+    """
+    This is a base class representation of a person in the School Management System.
+
+    Persons and courses use ``__slots__`` instead of a per-instance ``__dict__``,
+    and create their course and student lists only when something is added.
+    Those lists are kept as dictionaries keyed by ID, so membership checks and
+    removals are O(1), and registrations and assignments are linked on both sides.
+
+    :param name: The name of the person
+    :type name: str
+    :param age: The age of the person
+    :type age: int
+    :param email: The email address of the person
+    :type email: str
+    """
+    __slots__ = ('name', 'age', '_email')
+
+    def __init__(self, name: str, age: int, email: str):
+
+        self.name = name
+        self.age = age
+        self._email = email
+
+    @property
+    def email(self) -> str:
+        """
+        The email address of the person.
+        """
+        return self._email
+
+    def introduce(self) -> str:
+        """
+        Introduces the person, logging an ``introduce`` event.
+
+        :return: The introduction
+        :rtype: str
+        """
+        introduction = f"Hi, I'm {self.name}, {self.age} years old."
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(introduction, extra={'event': 'introduce'})
+        return introduction
+
+
+
+
+class Student(Person):
+    """
+    This class represents a student in the School Management System. It inherits from the Person class.
+
+    :param name: The name of the student
+    :type name: str
+    :param age: The age of the student
+    :type age: int
+    :param email: The email address of the student
+    :type email: str
+    :param student_id: The unique identifier for the student
+    :type student_id: str
+    """
+    __slots__ = ('student_id', '_registered_courses')
+
+    def __init__(self, name: str, age: int, email: str, student_id: str):
+
+        super().__init__(name, age, email)
+        self.student_id = student_id
+        self._registered_courses: Optional[Dict[str, 'Course']] = None
+
+    @property
+    def registered_courses(self) -> List['Course']:
+        """
+        The courses the student registered for, in registration order.
+        """
+        return list(self._registered_courses.values()) if self._registered_courses else []
+
+    def is_registered(self, course: 'Course') -> bool:
+        """
+        Tells whether the student is registered for a course.
+
+        :param course: The course
+        :type course: Course
+        :rtype: bool
+        """
+        return self._registered_courses is not None and course.course_id in self._registered_courses
+
+    def register_course(self, course: 'Course') -> bool:
+        """
+        Registers the student for a course, which also enrolls them in it, logging a ``register`` event.
+
+        :param course: The course to register for
+        :type course: Course
+        :return: Whether the student was not registered yet
+        :rtype: bool
+        """
+        if not _link_registration(self, course):
+            return False
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s has registered for %s.", self.name, course.course_name,
+                        extra={'event': 'register', 'student_id': self.student_id, 'course_id': course.course_id})
+        return True
+
+    def unregister_course(self, course: 'Course') -> bool:
+        """
+        Removes the student from a course.
+
+        :param course: The course to leave
+        :type course: Course
+        :return: Whether the student was registered
+        :rtype: bool
+        """
+        return _unlink_registration(self, course)
+
+    def to_row(self) -> Tuple[str, str, int, str]:
+        """
+        Converts the student into a row of the students table.
+
+        :rtype: Tuple[str, str, int, str]
+        """
+        return self.student_id, self.name, self.age, self._email
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> 'Student':
+        """
+        Creates a student from a row of the students table.
+
+        :param row: The student ID, name, age and email
+        :type row: Sequence[Any]
+        :rtype: Student
+        """
+        return cls(row[1], row[2], row[3], row[0])
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Converts the student into a snapshot record.
+
+        :rtype: Dict[str, Any]
+        """
+        return dict(zip(TABLE_COLUMNS['students'], self.to_row()))
+
+    @classmethod
+    def from_json(cls, record: Dict[str, Any]) -> 'Student':
+        """
+        Creates a student from a snapshot record, including records written by older versions.
+
+        :param record: The record
+        :type record: Dict[str, Any]
+        :rtype: Student
+        """
+        return cls.from_row(record_to_row('students', record))
+
+
+class Instructor(Person):
+    """
+    This class represents an instructor in the School Management System. It inherits from the Person class.
+
+    :param name: The name of the instructor
+    :type name: str
+    :param age: The age of the instructor
+    :type age: int
+    :param email: The email address of the instructor
+    :type email: str
+    :param instructor_id: The unique identifier for the instructor
+    :type instructor_id: str
+    """
+    __slots__ = ('instructor_id', '_assigned_courses')
+
+    def __init__(self, name: str, age: int, email: str, instructor_id: str):
+
+        super().__init__(name, age, email)
+        self.instructor_id = instructor_id
+        self._assigned_courses: Optional[Dict[str, 'Course']] = None
+
+    @property
+    def assigned_courses(self) -> List['Course']:
+        """
+        The courses assigned to the instructor, in assignment order.
+        """
+        return list(self._assigned_courses.values()) if self._assigned_courses else []
+
+    def assign_course(self, course: 'Course') -> bool:
+        """
+        Assigns a course to the instructor, taking it over from its previous instructor, logging an
+        ``assign`` event.
+
+        :param course: The course to assign
+        :type course: Course
+        :return: Whether the course was not assigned to the instructor yet
+        :rtype: bool
+        """
+        if self._assigned_courses is not None and course.course_id in self._assigned_courses:
+            return False
+        previous = course.instructor
+        if previous is not None and previous._assigned_courses is not None:
+            previous._assigned_courses.pop(course.course_id, None)
+        if self._assigned_courses is None:
+            self._assigned_courses = {}
+        self._assigned_courses[course.course_id] = course
+        course.instructor = self
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s is assigned to teach %s.", self.name, course.course_name,
+                        extra={'event': 'assign', 'instructor_id': self.instructor_id, 'course_id': course.course_id})
+        return True
+
+    def unassign_course(self, course: 'Course') -> bool:
+        """
+        Takes a course away from the instructor, leaving it without one.
+
+        :param course: The course to unassign
+        :type course: Course
+        :return: Whether the course was assigned to the instructor
+        :rtype: bool
+        """
+        if self._assigned_courses is None or self._assigned_courses.pop(course.course_id, None) is None:
+            return False
+        course.instructor = None
+        course._instructor_id = None
+        return True
+
+    def to_row(self) -> Tuple[str, str, int, str]:
+        """
+        Converts the instructor into a row of the instructors table.
+
+        :rtype: Tuple[str, str, int, str]
+        """
+        return self.instructor_id, self.name, self.age, self._email
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> 'Instructor':
+        """
+        Creates an instructor from a row of the instructors table.
+
+        :param row: The instructor ID, name, age and email
+        :type row: Sequence[Any]
+        :rtype: Instructor
+        """
+        return cls(row[1], row[2], row[3], row[0])
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Converts the instructor into a snapshot record.
+
+        :rtype: Dict[str, Any]
+        """
+        return dict(zip(TABLE_COLUMNS['instructors'], self.to_row()))
+
+    @classmethod
+    def from_json(cls, record: Dict[str, Any]) -> 'Instructor':
+        """
+        Creates an instructor from a snapshot record, including records written by older versions.
+
+        :param record: The record
+        :type record: Dict[str, Any]
+        :rtype: Instructor
+        """
+        return cls.from_row(record_to_row('instructors', record))
+
+
+class Course:
+    """
+    This class represents a course in the School Management System.
+
+    :param course_id: The unique identifier for the course
+    :type course_id: str
+    :param course_name: The name of the course
+    :type course_name: str
+    :param instructor: The instructor teaching the course
+    :type instructor: Instructor
+    """
+    __slots__ = ('course_id', 'course_name', 'instructor', '_instructor_id', '_enrolled_students')
+
+    def __init__(self, course_id: str, course_name: str, instructor: Optional[Instructor]):
+
+        self.course_id = course_id
+        self.course_name = course_name
+        self.instructor = instructor
+        self._instructor_id: Optional[str] = None
+        self._enrolled_students: Optional[Dict[str, Student]] = None
+
+    @property
+    def instructor_id(self) -> Optional[str]:
+        """
+        The ID of the instructor, also known when the course was loaded without its instructor.
+        """
+        return self.instructor.instructor_id if self.instructor is not None else self._instructor_id
+
+    @property
+    def enrolled_students(self) -> List[Student]:
+        """
+        The students enrolled in the course, in enrolment order.
+        """
+        return list(self._enrolled_students.values()) if self._enrolled_students else []
+
+    def has_student(self, student: Student) -> bool:
+        """
+        Tells whether a student is enrolled in the course.
+
+        :param student: The student
+        :type student: Student
+        :rtype: bool
+        """
+        return self._enrolled_students is not None and student.student_id in self._enrolled_students
+
+    def add_student(self, student: Student) -> bool:
+        """
+        Adds a student to the course, which also registers them for it, logging a ``register`` event.
+
+        :param student: The student to add to the course
+        :type student: Student
+        :return: Whether the student was not enrolled yet
+        :rtype: bool
+        """
+        if not _link_registration(student, self):
+            return False
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s has been added to %s.", student.name, self.course_name,
+                        extra={'event': 'register', 'student_id': student.student_id, 'course_id': self.course_id})
+        return True
+
+    def remove_student(self, student: Student) -> bool:
+        """
+        Removes a student from the course.
+
+        :param student: The student to remove
+        :type student: Student
+        :return: Whether the student was enrolled
+        :rtype: bool
+        """
+        return _unlink_registration(student, self)
+
+    def to_row(self) -> Tuple[str, str, Optional[str]]:
+        """
+        Converts the course into a row of the courses table.
+
+        :rtype: Tuple[str, str, Optional[str]]
+        """
+        return self.course_id, self.course_name, self.instructor_id
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any], instructors: Optional[Dict[str, Instructor]] = None) -> 'Course':
+        """
+        Creates a course from a row of the courses table.
+
+        :param row: The course ID, name and instructor ID
+        :type row: Sequence[Any]
+        :param instructors: Instructors by ID, used to link the course to its instructor
+        :type instructors: Dict[str, Instructor], optional
+        :rtype: Course
+        """
+        course = cls(row[0], row[1], instructors.get(row[2]) if instructors and row[2] is not None else None)
+        course._instructor_id = row[2]
+        return course
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Converts the course into a snapshot record.
+
+        :rtype: Dict[str, Any]
+        """
+        return dict(zip(TABLE_COLUMNS['courses'], self.to_row()))
+
+    @classmethod
+    def from_json(cls, record: Dict[str, Any]) -> 'Course':
+        """
+        Creates a course from a snapshot record, including records that embed their instructor.
+
+        :param record: The record
+        :type record: Dict[str, Any]
+        :rtype: Course
+        """
+        return cls.from_row(record_to_row('courses', record))
+
+
+def _link_registration(student: Student, course: Course) -> bool:
+    if student._registered_courses is None:
+        student._registered_courses = {}
+    elif course.course_id in student._registered_courses:
+        return False
+    if course._enrolled_students is None:
+        course._enrolled_students = {}
+    student._registered_courses[course.course_id] = course
+    course._enrolled_students[student.student_id] = student
+    return True
+
+
+def _unlink_registration(student: Student, course: Course) -> bool:
+    if student._registered_courses is None or student._registered_courses.pop(course.course_id, None) is None:
+        return False
+    course._enrolled_students.pop(student.student_id, None)
+    return True
+
+
+def create_tables():
+    """
+    Brings the shared database up to the current schema version, along with the
+    full-text search index when SQLite supports it.
+    """
+    db = get_database()
+    migrate(db)
+    create_search_index(db)
+
+def save_data_to_file(data: Iterable[Union[Student, Instructor, Course]], filename: str):
+    """
+    Saves data to a JSON Lines file, writing one object per line as it is produced.
+
+    :param data: The objects to save
+    :type data: Iterable[Union[Student, Instructor, Course]]
+    :param filename: The name of the file to save the data to
+    :type filename: str
+    """
+    write_records(filename, (obj.to_json() for obj in data))
+
+
+def load_data_from_file(filename: str, class_type: type) -> List[Union[Student, Instructor, Course]]:
+    """
+    Loads data from a JSON Lines file or from a legacy JSON array file.
+
+    :param filename: The name of the file to load the data from
+    :type filename: str
+    :param class_type: The type of class to instantiate (Student, Instructor, or Course)
+    :type class_type: type
+    :return: A list of instantiated objects
+    :rtype: List[Union[Student, Instructor, Course]]
+    """
+    return [class_type.from_json(item) for item in iter_records(filename)]
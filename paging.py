@@ -0,0 +1,144 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+from database import RECORD_SELECTS, TABLE_COLUMNS, Database
+
+
+def page_statement(table: str, comparison: Optional[str] = None, descending: bool = False) -> str:
+    """
+    Builds the keyset query reading one page of a table, plus one row.
+
+    :param table: students, instructors or courses
+    :type table: str
+    :param comparison: How IDs compare with the bound parameter: '>', '<' or '>=', defaults to no bound
+    :type comparison: str, optional
+    :param descending: Whether to read in descending ID order, defaults to False
+    :type descending: bool, optional
+    :return: The statement, taking the bound ID, if any, and the row limit
+    :rtype: str
+    """
+    key_column = TABLE_COLUMNS[table][0]
+    where = f"WHERE {key_column} {comparison} ? " if comparison else ""
+    order = f"{key_column} DESC" if descending else key_column
+    return f"{RECORD_SELECTS[table]} {where}ORDER BY {order} LIMIT ?"
+
+
+class KeysetPager:
+    """
+    Pages through the records of one table in ID order using keyset queries.
+
+    Pages are located by comparing IDs with the first or last ID of the current
+    page instead of using OFFSET, so every page costs one index seek plus the
+    rows shown, however deep the user goes. One extra row is fetched to know
+    whether there is a page beyond.
+
+    :param db: The database to read from
+    :type db: Database
+    :param table: The table to page through: students, instructors or courses
+    :type table: str
+    :param page_size: The number of records per page, defaults to 100
+    :type page_size: int, optional
+    """
+
+    def __init__(self, db: Database, table: str, page_size: int = 100):
+
+        self.db = db
+        self.table = table
+        self.page_size = page_size
+        self.key_column = TABLE_COLUMNS[table][0]
+        self.rows: List[Tuple[Any, ...]] = []
+        self.has_previous = False
+        self.has_next = False
+
+    @property
+    def first_key(self) -> Optional[str]:
+        """
+        The ID of the first record on the current page, or None when it is empty.
+        """
+        return self.rows[0][1] if self.rows else None
+
+    @property
+    def last_key(self) -> Optional[str]:
+        """
+        The ID of the last record on the current page, or None when it is empty.
+        """
+        return self.rows[-1][1] if self.rows else None
+
+    def first(self) -> List[Tuple[Any, ...]]:
+        """
+        Moves to the first page.
+
+        :return: The records of the page, in RECORD_HEADERS order
+        :rtype: List[Tuple[Any, ...]]
+        """
+        rows = self._fetch(None, ())
+        self._show(rows, has_previous=False)
+        return self.rows
+
+    def next(self) -> List[Tuple[Any, ...]]:
+        """
+        Moves to the page after the current one. Stays put when there is none.
+
+        :return: The records of the page
+        :rtype: List[Tuple[Any, ...]]
+        """
+        if self.last_key is None:
+            return self.first()
+        rows = self._fetch('>', (self.last_key,))
+        if rows:
+            self._show(rows, has_previous=True)
+        else:
+            self.has_next = False
+        return self.rows
+
+    def previous(self) -> List[Tuple[Any, ...]]:
+        """
+        Moves to the page before the current one, or to the first page.
+
+        :return: The records of the page
+        :rtype: List[Tuple[Any, ...]]
+        """
+        if self.first_key is None:
+            return self.first()
+        rows = self._fetch('<', (self.first_key,), descending=True)
+        if len(rows) <= self.page_size:
+            return self.first()
+        self.rows = rows[:self.page_size][::-1]
+        self.has_previous = True
+        self.has_next = True
+        return self.rows
+
+    def jump(self, key: str) -> List[Tuple[Any, ...]]:
+        """
+        Moves to the page starting at an ID, or at the next ID after it when it does not exist.
+
+        :param key: The ID to start from
+        :type key: str
+        :return: The records of the page
+        :rtype: List[Tuple[Any, ...]]
+        """
+        rows = self._fetch('>=', (key,))
+        earlier = self.db.execute(f"SELECT 1 FROM {self.table} WHERE {self.key_column} < ? LIMIT 1",
+                                  (key,)).fetchone()
+        self._show(rows, has_previous=earlier is not None)
+        return self.rows
+
+    def refresh(self) -> List[Tuple[Any, ...]]:
+        """
+        Reloads the current page, for instance after records were added or deleted.
+
+        :return: The records of the page
+        :rtype: List[Tuple[Any, ...]]
+        """
+        if self.first_key is None:
+            return self.first()
+        return self.jump(self.first_key)
+
+    def _fetch(self, comparison: Optional[str], params: Sequence[Any],
+               descending: bool = False) -> List[Tuple[Any, ...]]:
+        sql = page_statement(self.table, comparison, descending)
+        return self.db.execute(sql, (*params, self.page_size + 1)).fetchall()
+
+    def _show(self, rows: List[Tuple[Any, ...]], has_previous: bool):
+        self.rows = rows[:self.page_size]
+        self.has_previous = has_previous
+        self.has_next = len(rows) > self.page_size
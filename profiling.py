@@ -0,0 +1,169 @@
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# Turns profiling on at startup: "1" profiles PROFILED_ACTIONS, or give a comma-separated list of actions.
+PROFILE_ENV = 'SCHOOL_PROFILE'
+
+# Where the profiles are written, defaults to PROFILE_DIR in the current directory.
+PROFILE_DIR_ENV = 'SCHOOL_PROFILE_DIR'
+PROFILE_DIR = 'profiles'
+
+# The operations that can be profiled by default.
+PROFILED_ACTIONS = ('load_data', 'save_data', 'export_to_csv', 'display_records')
+
+# The number of frames kept per allocation.
+TRACEMALLOC_FRAMES = 10
+
+
+class Profiler:
+    """
+    Profiles selected actions with ``cProfile`` and ``tracemalloc`` while enabled.
+
+    Every profiled invocation writes a ``.prof`` file, readable with ``pstats``
+    or snakeviz, and a ``.txt`` report with the slowest functions and the lines
+    that allocated the most memory. Actions outside the selection are not
+    wrapped at all, and selected ones only check a flag while disabled.
+
+    Only one invocation is profiled at a time, as Python allows one active
+    ``cProfile`` profiler: an action started while another is being profiled,
+    nested or on another thread, runs unprofiled. Tracing that tracemalloc was
+    already doing when profiling started is left running.
+
+    :param actions: The names of the actions that can be profiled, defaults to PROFILED_ACTIONS
+    :type actions: Iterable[str], optional
+    :param directory: Where to write the profiles, defaults to PROFILE_DIR
+    :type directory: str, optional
+    :param enabled: Whether to profile from the start, defaults to False
+    :type enabled: bool, optional
+    :param top: The number of functions and allocation sites listed in each report, defaults to 25
+    :type top: int, optional
+    """
+
+    def __init__(self, actions: Iterable[str] = PROFILED_ACTIONS, directory: str = PROFILE_DIR,
+                 enabled: bool = False, top: int = 25):
+
+        self.actions = frozenset(actions)
+        self.directory = directory
+        self.enabled = enabled
+        self.top = top
+        self.written: List[str] = []
+        self._started_tracemalloc = False
+        self._active = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    @contextmanager
+    def profile(self, name: str, label: Optional[str] = None) -> Iterator[None]:
+        """
+        Profiles a block as one invocation of an action, when the action is selected and profiling is on.
+
+        :param name: The name of the action
+        :type name: str
+        :param label: Names the files instead of the action, such as for the worker half of an action
+        :type label: str, optional
+        """
+        if not self.enabled or name not in self.actions or not self._active.acquire(blocking=False):
+            yield
+            return
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler, such as one started outside the application, is active.
+                profiler = None
+            if profiler is None:
+                yield
+                return
+            self._start_tracing()
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                self._stop_tracing()
+                self._write(label or name, profiler, snapshot, peak, elapsed)
+        finally:
+            self._active.release()
+
+    def wrap(self, name: str, handler: Callable[[], Any]) -> Callable[[], Any]:
+        """
+        Wraps a handler so that each call is profiled, if the action is selected.
+
+        :param name: The name of the action
+        :type name: str
+        :param handler: The handler to wrap
+        :type handler: Callable[[], Any]
+        :return: The wrapped handler, or the handler itself when the action is not selected
+        :rtype: Callable[[], Any]
+        """
+        if name not in self.actions:
+            return handler
+
+        def run():
+            if not self.enabled:
+                return handler()
+            with self.profile(name):
+                return handler()
+        run.__name__ = getattr(handler, '__name__', name)
+        run.__doc__ = handler.__doc__
+        return run
+
+    def _start_tracing(self):
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        else:
+            tracemalloc.reset_peak()
+
+    def _stop_tracing(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _write(self, label: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot, peak: int,
+               elapsed: float):
+        os.makedirs(self.directory, exist_ok=True)
+        stem = os.path.join(self.directory, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{next(self._sequence)}")
+        profiler.dump_stats(stem + '.prof')
+
+        functions = io.StringIO()
+        pstats.Stats(profiler, stream=functions).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        with open(stem + '.txt', 'w', encoding='utf-8') as report:
+            report.write(f"{label}: {elapsed:.3f} s, peak traced memory {peak / 1024 / 1024:.1f} MiB\n\n")
+            report.write(f"Top {self.top} allocation sites:\n")
+            for statistic in snapshot.statistics('lineno')[:self.top]:
+                report.write(f"  {statistic}\n")
+            report.write("\n")
+            report.write(functions.getvalue())
+        self.written.append(stem + '.prof')
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    """
+    Returns the process-wide profiler, configured from SCHOOL_PROFILE and SCHOOL_PROFILE_DIR.
+
+    :rtype: Profiler
+    """
+    global _profiler
+    if _profiler is None:
+        setting = os.environ.get(PROFILE_ENV, '').strip()
+        actions = PROFILED_ACTIONS
+        if setting and setting not in ('1', 'all'):
+            actions = tuple(name.strip() for name in setting.split(',') if name.strip())
+        _profiler = Profiler(actions, os.environ.get(PROFILE_DIR_ENV) or PROFILE_DIR, enabled=bool(setting))
+    return _profiler
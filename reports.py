@@ -0,0 +1,178 @@
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import Database
+
+COURSE_COUNTS_TABLE = 'course_enrolment_counts'
+AGE_COUNTS_TABLE = 'student_age_counts'
+
+_SUMMARY_TRIGGERS = {
+    'registrations_counts_insert': f'''CREATE TRIGGER IF NOT EXISTS registrations_counts_insert
+        AFTER INSERT ON registrations BEGIN
+        UPDATE {COURSE_COUNTS_TABLE} SET students = students + 1 WHERE course_id = new.course_id;
+    END''',
+    'registrations_counts_delete': f'''CREATE TRIGGER IF NOT EXISTS registrations_counts_delete
+        AFTER DELETE ON registrations BEGIN
+        UPDATE {COURSE_COUNTS_TABLE} SET students = students - 1 WHERE course_id = old.course_id;
+    END''',
+    'registrations_counts_update': f'''CREATE TRIGGER IF NOT EXISTS registrations_counts_update
+        AFTER UPDATE OF course_id ON registrations WHEN old.course_id IS NOT new.course_id BEGIN
+        UPDATE {COURSE_COUNTS_TABLE} SET students = students - 1 WHERE course_id = old.course_id;
+        UPDATE {COURSE_COUNTS_TABLE} SET students = students + 1 WHERE course_id = new.course_id;
+    END''',
+    'courses_counts_insert': f'''CREATE TRIGGER IF NOT EXISTS courses_counts_insert
+        AFTER INSERT ON courses BEGIN
+        INSERT OR IGNORE INTO {COURSE_COUNTS_TABLE} (course_id, students) VALUES (new.course_id, 0);
+    END''',
+    'courses_counts_delete': f'''CREATE TRIGGER IF NOT EXISTS courses_counts_delete
+        AFTER DELETE ON courses BEGIN
+        DELETE FROM {COURSE_COUNTS_TABLE} WHERE course_id = old.course_id;
+    END''',
+    'courses_counts_update': f'''CREATE TRIGGER IF NOT EXISTS courses_counts_update
+        AFTER UPDATE OF course_id ON courses WHEN old.course_id IS NOT new.course_id BEGIN
+        UPDATE {COURSE_COUNTS_TABLE} SET course_id = new.course_id WHERE course_id = old.course_id;
+    END''',
+    'students_ages_insert': f'''CREATE TRIGGER IF NOT EXISTS students_ages_insert
+        AFTER INSERT ON students WHEN new.age IS NOT NULL BEGIN
+        INSERT INTO {AGE_COUNTS_TABLE} (age, students) VALUES (new.age, 1)
+            ON CONFLICT (age) DO UPDATE SET students = students + 1;
+    END''',
+    'students_ages_delete': f'''CREATE TRIGGER IF NOT EXISTS students_ages_delete
+        AFTER DELETE ON students WHEN old.age IS NOT NULL BEGIN
+        UPDATE {AGE_COUNTS_TABLE} SET students = students - 1 WHERE age = old.age;
+    END''',
+    'students_ages_update': f'''CREATE TRIGGER IF NOT EXISTS students_ages_update
+        AFTER UPDATE OF age ON students WHEN old.age IS NOT new.age BEGIN
+        UPDATE {AGE_COUNTS_TABLE} SET students = students - 1 WHERE age = old.age;
+        INSERT INTO {AGE_COUNTS_TABLE} (age, students) SELECT new.age, 1 WHERE new.age IS NOT NULL
+            ON CONFLICT (age) DO UPDATE SET students = students + 1;
+    END''',
+}
+
+# name: (title, column headers, live statement, statement over the summary tables).
+# Every report is one aggregate statement.
+REPORTS: Dict[str, Tuple[str, List[str], str, str]] = {
+    'course_enrolment': (
+        "Enrolment per course",
+        ["Course ID", "Course Name", "Instructor ID", "Students"],
+        "SELECT c.course_id, c.course_name, c.instructor_id, COUNT(r.student_id) AS students FROM courses c "
+        "LEFT JOIN registrations r ON r.course_id = c.course_id "
+        "GROUP BY c.course_id ORDER BY students DESC, c.course_id",
+        "SELECT c.course_id, c.course_name, c.instructor_id, s.students FROM courses c "
+        f"JOIN {COURSE_COUNTS_TABLE} s ON s.course_id = c.course_id ORDER BY s.students DESC, c.course_id",
+    ),
+    'instructor_load': (
+        "Teaching load per instructor",
+        ["Instructor ID", "Name", "Courses", "Students"],
+        "SELECT i.instructor_id, i.name, COUNT(DISTINCT c.course_id) AS courses, COUNT(r.student_id) AS students "
+        "FROM instructors i LEFT JOIN courses c ON c.instructor_id = i.instructor_id "
+        "LEFT JOIN registrations r ON r.course_id = c.course_id "
+        "GROUP BY i.instructor_id ORDER BY students DESC, i.instructor_id",
+        "SELECT i.instructor_id, i.name, COUNT(c.course_id) AS courses, COALESCE(SUM(s.students), 0) AS students "
+        "FROM instructors i LEFT JOIN courses c ON c.instructor_id = i.instructor_id "
+        f"LEFT JOIN {COURSE_COUNTS_TABLE} s ON s.course_id = c.course_id "
+        "GROUP BY i.instructor_id ORDER BY students DESC, i.instructor_id",
+    ),
+    'age_distribution': (
+        "Students per age",
+        ["Age", "Students"],
+        "SELECT age, COUNT(*) FROM students WHERE age IS NOT NULL GROUP BY age ORDER BY age",
+        f"SELECT age, students FROM {AGE_COUNTS_TABLE} WHERE students > 0 ORDER BY age",
+    ),
+    'empty_courses': (
+        "Courses without students",
+        ["Course ID", "Course Name", "Instructor ID"],
+        "SELECT c.course_id, c.course_name, c.instructor_id FROM courses c "
+        "WHERE NOT EXISTS (SELECT 1 FROM registrations r WHERE r.course_id = c.course_id) ORDER BY c.course_id",
+        "SELECT c.course_id, c.course_name, c.instructor_id FROM courses c "
+        f"JOIN {COURSE_COUNTS_TABLE} s ON s.course_id = c.course_id WHERE s.students = 0 ORDER BY c.course_id",
+    ),
+}
+
+
+def has_report_summaries(db: Database) -> bool:
+    """
+    Checks whether the report summary tables exist in the database.
+
+    :param db: The database to check
+    :type db: Database
+    :rtype: bool
+    """
+    row = db.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (COURSE_COUNTS_TABLE,)).fetchone()
+    return row is not None
+
+
+def create_report_summaries(db: Database):
+    """
+    Creates the summary tables behind the reports, with the triggers that keep them up to date.
+
+    The tables hold the number of students per course and per age, so reports
+    read a few thousand summary rows instead of aggregating every registration.
+    Each registration and student write pays for one extra indexed update.
+
+    :param db: The database to add the summaries to
+    :type db: Database
+    """
+    with db.transaction() as conn:
+        exists = has_report_summaries(db)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {COURSE_COUNTS_TABLE} "
+                     "(course_id TEXT PRIMARY KEY, students INTEGER NOT NULL)")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {AGE_COUNTS_TABLE} "
+                     "(age INTEGER PRIMARY KEY, students INTEGER NOT NULL)")
+        for sql in _SUMMARY_TRIGGERS.values():
+            conn.execute(sql)
+        if not exists:
+            populate_report_summaries(conn)
+
+
+def drop_report_summaries(db: Database):
+    """
+    Drops the summary tables and their triggers; reports then aggregate the base tables.
+
+    :param db: The database to remove the summaries from
+    :type db: Database
+    """
+    with db.transaction() as conn:
+        for name in _SUMMARY_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute(f"DROP TABLE IF EXISTS {COURSE_COUNTS_TABLE}")
+        conn.execute(f"DROP TABLE IF EXISTS {AGE_COUNTS_TABLE}")
+
+
+def populate_report_summaries(conn: sqlite3.Connection):
+    """
+    Recomputes the summary tables from the base tables, each with one aggregate statement.
+
+    Runs inside the caller's transaction, so bulk loaders can refresh the
+    summaries once after inserting with their triggers dropped.
+
+    :param conn: The connection to use
+    :type conn: sqlite3.Connection
+    """
+    conn.execute(f"DELETE FROM {COURSE_COUNTS_TABLE}")
+    conn.execute(f'''INSERT INTO {COURSE_COUNTS_TABLE} (course_id, students)
+        SELECT c.course_id, COUNT(r.student_id) FROM courses c
+        LEFT JOIN registrations r ON r.course_id = c.course_id GROUP BY c.course_id''')
+    conn.execute(f"DELETE FROM {AGE_COUNTS_TABLE}")
+    conn.execute(f'''INSERT INTO {AGE_COUNTS_TABLE} (age, students)
+        SELECT age, COUNT(*) FROM students WHERE age IS NOT NULL GROUP BY age''')
+
+
+def run_report(db: Database, name: str,
+               use_summaries: Optional[bool] = None) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """
+    Computes one report with a single aggregate statement.
+
+    :param db: The database to report on
+    :type db: Database
+    :param name: The name of the report, a key of REPORTS
+    :type name: str
+    :param use_summaries: Whether to read the summary tables, defaults to whenever they exist
+    :type use_summaries: bool, optional
+    :return: The column headers and the rows of the report
+    :rtype: Tuple[List[str], List[Tuple[Any, ...]]]
+    """
+    _, headers, live_sql, summary_sql = REPORTS[name]
+    if use_summaries is None:
+        use_summaries = has_report_summaries(db)
+    return headers, db.execute(summary_sql if use_summaries else live_sql).fetchall()
@@ -0,0 +1,618 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from database import TABLE_COLUMNS, Database, insert_statement
+from enrolment import EnrolmentGraph
+from models import Course, Instructor, Student
+
+# The tables with a single-column ID, and how their records are named in messages.
+RECORD_LABELS = {'students': 'student', 'instructors': 'instructor', 'courses': 'course'}
+
+
+class RepositoryError(Exception):
+    """
+    Raised when a repository refuses a change. The message is meant for the user.
+    """
+
+
+class RecordNotFound(RepositoryError):
+    """
+    Raised when a change refers to a student, instructor or course that does not exist.
+    """
+
+
+class DuplicateRecord(RepositoryError):
+    """
+    Raised when adding a record whose ID, or registration, already exists.
+    """
+
+
+class RecordInUse(RepositoryError):
+    """
+    Raised when deleting a record that others still refer to.
+    """
+
+
+class StudentFilter:
+    """
+    Selects students by ID prefix and age range, for registering a whole cohort at once.
+
+    Every condition left as None matches all students.
+
+    :param id_prefix: The start of the student IDs, defaults to None
+    :type id_prefix: str, optional
+    :param min_age: The lowest age, defaults to None
+    :type min_age: int, optional
+    :param max_age: The highest age, defaults to None
+    :type max_age: int, optional
+    """
+    __slots__ = ('id_prefix', 'min_age', 'max_age')
+
+    def __init__(self, id_prefix: Optional[str] = None, min_age: Optional[int] = None,
+                 max_age: Optional[int] = None):
+
+        self.id_prefix = id_prefix or None
+        self.min_age = min_age
+        self.max_age = max_age
+
+    def where(self, alias: str = 's') -> Tuple[str, Tuple[Any, ...]]:
+        """
+        Builds the WHERE clause over the students table.
+
+        The prefix becomes a range on the primary key, so it is answered from the index.
+
+        :param alias: The alias of the students table, defaults to 's'
+        :type alias: str, optional
+        :return: The clause, empty when everything matches, and its parameters
+        :rtype: Tuple[str, Tuple[Any, ...]]
+        """
+        conditions = []
+        params: List[Any] = []
+        if self.id_prefix is not None:
+            conditions.append(f"{alias}.student_id >= ? AND {alias}.student_id < ?")
+            params += [self.id_prefix, self.id_prefix[:-1] + chr(ord(self.id_prefix[-1]) + 1)]
+        if self.min_age is not None:
+            conditions.append(f"{alias}.age >= ?")
+            params.append(self.min_age)
+        if self.max_age is not None:
+            conditions.append(f"{alias}.age <= ?")
+            params.append(self.max_age)
+        return ("WHERE " + " AND ".join(conditions) if conditions else ""), tuple(params)
+
+    def matches(self, row: Tuple[Any, ...]) -> bool:
+        """
+        Tells whether a students row, in TABLE_COLUMNS order, is selected.
+
+        :rtype: bool
+        """
+        student_id, _, age = row[:3]
+        if self.id_prefix is not None and not student_id.startswith(self.id_prefix):
+            return False
+        if self.min_age is not None and (age is None or age < self.min_age):
+            return False
+        return self.max_age is None or (age is not None and age <= self.max_age)
+
+
+class SchoolRepository(ABC):
+    """
+    Stores the students, instructors, courses and registrations of the school.
+
+    Every change is validated and applied atomically, or refused with a
+    RepositoryError. Deleting a student or course also deletes its
+    registrations; an instructor can only be deleted once no course refers to it.
+    """
+
+    @abstractmethod
+    def transaction(self) -> Iterator['SchoolRepository']:
+        """
+        Groups several changes. For SQLite repositories they commit or roll back together.
+        """
+
+    @abstractmethod
+    def add_student(self, student_id: str, name: str, age: int, email: str):
+        """
+        Adds a student.
+
+        :raises DuplicateRecord: If the ID is taken
+        """
+
+    @abstractmethod
+    def update_student(self, student_id: str, name: str, age: int, email: str):
+        """
+        Replaces the details of a student.
+
+        :raises RecordNotFound: If there is no such student
+        """
+
+    @abstractmethod
+    def delete_student(self, student_id: str):
+        """
+        Deletes a student and its registrations.
+
+        :raises RecordNotFound: If there is no such student
+        """
+
+    @abstractmethod
+    def get_student(self, student_id: str) -> Optional[Student]:
+        """
+        Returns a student, or None if there is no such student.
+        """
+
+    @abstractmethod
+    def add_instructor(self, instructor_id: str, name: str, age: int, email: str):
+        """
+        Adds an instructor.
+
+        :raises DuplicateRecord: If the ID is taken
+        """
+
+    @abstractmethod
+    def update_instructor(self, instructor_id: str, name: str, age: int, email: str):
+        """
+        Replaces the details of an instructor.
+
+        :raises RecordNotFound: If there is no such instructor
+        """
+
+    @abstractmethod
+    def delete_instructor(self, instructor_id: str):
+        """
+        Deletes an instructor.
+
+        :raises RecordInUse: If a course is assigned to the instructor
+        :raises RecordNotFound: If there is no such instructor
+        """
+
+    @abstractmethod
+    def get_instructor(self, instructor_id: str) -> Optional[Instructor]:
+        """
+        Returns an instructor, or None if there is no such instructor.
+        """
+
+    @abstractmethod
+    def add_course(self, course_id: str, course_name: str, instructor_id: Optional[str]):
+        """
+        Adds a course.
+
+        :raises DuplicateRecord: If the ID is taken
+        :raises RecordNotFound: If the instructor does not exist
+        """
+
+    @abstractmethod
+    def update_course(self, course_id: str, course_name: str, instructor_id: Optional[str]):
+        """
+        Replaces the name and instructor of a course.
+
+        :raises RecordNotFound: If the course or the instructor does not exist
+        """
+
+    @abstractmethod
+    def delete_course(self, course_id: str):
+        """
+        Deletes a course and its registrations.
+
+        :raises RecordNotFound: If there is no such course
+        """
+
+    @abstractmethod
+    def get_course(self, course_id: str) -> Optional[Course]:
+        """
+        Returns a course with its instructor, or None if there is no such course.
+        """
+
+    @abstractmethod
+    def register(self, student_id: str, course_id: str):
+        """
+        Registers a student to a course.
+
+        :raises DuplicateRecord: If the student is already registered to the course
+        :raises RecordNotFound: If the student or the course does not exist
+        """
+
+    @abstractmethod
+    def register_many(self, course_ids: Iterable[str], student_ids: Optional[Iterable[str]] = None,
+                      student_filter: Optional[StudentFilter] = None) -> Dict[str, int]:
+        """
+        Registers many students to many courses at once, skipping registrations that already exist.
+
+        Students are given as a list of IDs, where unknown IDs are skipped and
+        counted, as a filter, or as both, in which case only the listed
+        students the filter selects are registered. With neither, every
+        student is registered.
+
+        :param course_ids: The courses to register to
+        :type course_ids: Iterable[str]
+        :param student_ids: The students to register, defaults to every student
+        :type student_ids: Iterable[str], optional
+        :param student_filter: Selects among those students, defaults to selecting them all
+        :type student_filter: StudentFilter, optional
+        :return: The numbers of registrations 'inserted' and of 'duplicates' skipped, and of 'unknown_students'
+        :rtype: Dict[str, int]
+        :raises RecordNotFound: If a course does not exist; nothing is registered then
+        """
+
+    @abstractmethod
+    def unregister(self, student_id: str, course_id: str):
+        """
+        Removes the registration of a student to a course.
+
+        :raises RecordNotFound: If the student is not registered to the course
+        """
+
+    @abstractmethod
+    def courses_of_student(self, student_id: str) -> List[str]:
+        """
+        Returns the IDs of the courses a student is registered to, in ID order.
+        """
+
+    @abstractmethod
+    def students_in_course(self, course_id: str) -> List[str]:
+        """
+        Returns the IDs of the students registered to a course, in ID order.
+        """
+
+    @abstractmethod
+    def count(self, table: str) -> int:
+        """
+        Returns the number of rows in a table.
+        """
+
+    @abstractmethod
+    def choices(self, table: str, after: Optional[str] = None, limit: int = 500) -> List[Tuple[str, str]]:
+        """
+        Returns a window of (ID, name) pairs of a table in ID order, starting after an ID.
+
+        :param table: 'students', 'instructors' or 'courses'
+        :type table: str
+        :param after: The last ID of the previous window, defaults to the start
+        :type after: str, optional
+        :param limit: The maximum number of pairs, defaults to 500
+        :type limit: int, optional
+        """
+
+
+class SQLiteRepository(SchoolRepository):
+    """
+    A repository stored in a SQLite database.
+
+    Inside a transaction that is already open, such as a writer batch, changes
+    join it instead of committing on their own. Pass :func:`database.memory_database`
+    for a SQLite repository held in RAM.
+
+    :param db: The database to store the records in, at the current schema version
+    :type db: Database
+    """
+
+    def __init__(self, db: Database):
+
+        self.db = db
+
+    @contextmanager
+    def transaction(self) -> Iterator['SQLiteRepository']:
+        with self.db.transaction():
+            yield self
+
+    def add_student(self, student_id: str, name: str, age: int, email: str):
+        self._insert('students', (student_id, name, age, email))
+
+    def update_student(self, student_id: str, name: str, age: int, email: str):
+        self._update('students', "name=?, age=?, email=?", (name, age, email), student_id)
+
+    def delete_student(self, student_id: str):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM registrations WHERE student_id=?", (student_id,))
+            self._delete(conn, 'students', student_id)
+
+    def get_student(self, student_id: str) -> Optional[Student]:
+        row = self._get('students', student_id)
+        return Student.from_row(row) if row else None
+
+    def add_instructor(self, instructor_id: str, name: str, age: int, email: str):
+        self._insert('instructors', (instructor_id, name, age, email))
+
+    def update_instructor(self, instructor_id: str, name: str, age: int, email: str):
+        self._update('instructors', "name=?, age=?, email=?", (name, age, email), instructor_id)
+
+    def delete_instructor(self, instructor_id: str):
+        with self.db.transaction() as conn:
+            course_count = conn.execute("SELECT COUNT(*) FROM courses WHERE instructor_id=?",
+                                        (instructor_id,)).fetchone()[0]
+            if course_count > 0:
+                raise RecordInUse(f"Cannot delete instructor. They are assigned to {course_count} course(s).")
+            self._delete(conn, 'instructors', instructor_id)
+
+    def get_instructor(self, instructor_id: str) -> Optional[Instructor]:
+        row = self._get('instructors', instructor_id)
+        return Instructor.from_row(row) if row else None
+
+    def add_course(self, course_id: str, course_name: str, instructor_id: Optional[str]):
+        self._insert('courses', (course_id, course_name, instructor_id))
+
+    def update_course(self, course_id: str, course_name: str, instructor_id: Optional[str]):
+        self._update('courses', "course_name=?, instructor_id=?", (course_name, instructor_id), course_id)
+
+    def delete_course(self, course_id: str):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM registrations WHERE course_id=?", (course_id,))
+            self._delete(conn, 'courses', course_id)
+
+    def get_course(self, course_id: str) -> Optional[Course]:
+        row = self._get('courses', course_id)
+        if row is None:
+            return None
+        return Course(row[0], row[1], self.get_instructor(row[2]) if row[2] is not None else None)
+
+    def register(self, student_id: str, course_id: str):
+        self._insert('registrations', (student_id, course_id))
+
+    def register_many(self, course_ids: Iterable[str], student_ids: Optional[Iterable[str]] = None,
+                      student_filter: Optional[StudentFilter] = None) -> Dict[str, int]:
+        with self.db.transaction() as conn:
+            # The IDs go through temporary tables so the insert is a single INSERT ... SELECT.
+            courses = self._load_ids(conn, 'batch_courses', course_ids)
+            missing = conn.execute("SELECT b.id FROM temp.batch_courses b WHERE NOT EXISTS "
+                                   "(SELECT 1 FROM courses c WHERE c.course_id = b.id) ORDER BY b.id").fetchone()
+            if missing is not None:
+                raise RecordNotFound(f"No course found with ID {missing[0]}")
+            unknown = 0
+            if student_ids is not None:
+                requested = self._load_ids(conn, 'batch_students', student_ids)
+                source = "temp.batch_students b JOIN students s ON s.student_id = b.id"
+                unknown = requested - conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+            else:
+                source = "students s"
+            where, params = (student_filter or StudentFilter()).where()
+            students = conn.execute(f"SELECT COUNT(*) FROM {source} {where}", params).fetchone()[0]
+            cursor = conn.execute(f"INSERT OR IGNORE INTO registrations (student_id, course_id) "
+                                  f"SELECT s.student_id, c.id FROM {source} CROSS JOIN temp.batch_courses c {where}",
+                                  params)
+            inserted = cursor.rowcount
+        return {
+            'inserted': inserted,
+            'duplicates': students * courses - inserted,
+            'unknown_students': unknown,
+        }
+
+    def unregister(self, student_id: str, course_id: str):
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM registrations WHERE student_id=? AND course_id=?",
+                                  (student_id, course_id))
+            if cursor.rowcount == 0:
+                raise RecordNotFound(f"Student {student_id} is not registered to course {course_id}.")
+
+    def courses_of_student(self, student_id: str) -> List[str]:
+        rows = self.db.execute("SELECT course_id FROM registrations WHERE student_id=? ORDER BY course_id",
+                               (student_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def students_in_course(self, course_id: str) -> List[str]:
+        rows = self.db.execute("SELECT student_id FROM registrations WHERE course_id=? ORDER BY student_id",
+                               (course_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, table: str) -> int:
+        return self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def choices(self, table: str, after: Optional[str] = None, limit: int = 500) -> List[Tuple[str, str]]:
+        key_column, name_column = TABLE_COLUMNS[table][:2]
+        where = f"WHERE {key_column} > ? " if after is not None else ""
+        params = (after, limit) if after is not None else (limit,)
+        return self.db.execute(f"SELECT {key_column}, {name_column} FROM {table} {where}"
+                               f"ORDER BY {key_column} LIMIT ?", params).fetchall()
+
+    def _get(self, table: str, key: str) -> Optional[Tuple[Any, ...]]:
+        columns = TABLE_COLUMNS[table]
+        return self.db.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE {columns[0]}=?",
+                               (key,)).fetchone()
+
+    def _load_ids(self, conn: sqlite3.Connection, name: str, ids: Iterable[str]) -> int:
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {name} (id TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute(f"DELETE FROM temp.{name}")
+        conn.executemany(f"INSERT OR IGNORE INTO temp.{name} (id) VALUES (?)", ((key,) for key in ids))
+        return conn.execute(f"SELECT COUNT(*) FROM temp.{name}").fetchone()[0]
+
+    def _insert(self, table: str, row: Tuple[Any, ...]):
+        try:
+            with self.db.transaction() as conn:
+                conn.execute(insert_statement(table), row)
+        except sqlite3.IntegrityError as e:
+            if 'FOREIGN KEY' in str(e):
+                raise self._missing_reference(table, row) from e
+            if table == 'registrations':
+                raise DuplicateRecord(f"Student {row[0]} is already registered to course {row[1]}.") from e
+            raise DuplicateRecord(f"{RECORD_LABELS[table].capitalize()} {row[0]} already exists.") from e
+
+    def _update(self, table: str, assignments: str, values: Tuple[Any, ...], key: str):
+        try:
+            with self.db.transaction() as conn:
+                cursor = conn.execute(f"UPDATE {table} SET {assignments} WHERE {TABLE_COLUMNS[table][0]}=?",
+                                      values + (key,))
+                if cursor.rowcount == 0:
+                    raise RecordNotFound(f"No {RECORD_LABELS[table]} found with ID {key}")
+        except sqlite3.IntegrityError as e:
+            raise self._missing_reference(table, (key,) + values) from e
+
+    def _delete(self, conn: sqlite3.Connection, table: str, key: str):
+        cursor = conn.execute(f"DELETE FROM {table} WHERE {TABLE_COLUMNS[table][0]}=?", (key,))
+        if cursor.rowcount == 0:
+            raise RecordNotFound(f"No {RECORD_LABELS[table]} found with ID {key}")
+
+    def _missing_reference(self, table: str, row: Tuple[Any, ...]) -> RecordNotFound:
+        if table == 'courses':
+            return RecordNotFound(f"No instructor found with ID {row[2]}")
+        if self._get('students', row[0]) is None:
+            return RecordNotFound(f"No student found with ID {row[0]}")
+        return RecordNotFound(f"No course found with ID {row[1]}")
+
+
+class MemoryRepository(SchoolRepository):
+    """
+    A repository held in dictionaries, for tests and benchmarks that should not touch SQLite.
+
+    Rows are kept by ID with sorted ID lists for windows, and registrations are
+    kept in an EnrolmentGraph. Each change is atomic; a transaction only holds
+    the lock and does not roll back earlier changes when a later one fails.
+    """
+
+    def __init__(self):
+
+        self.lock = threading.RLock()
+        self._rows: Dict[str, Dict[str, Tuple[Any, ...]]] = {table: {} for table in RECORD_LABELS}
+        self._keys: Dict[str, List[str]] = {table: [] for table in RECORD_LABELS}
+        self._graph = EnrolmentGraph()
+
+    @contextmanager
+    def transaction(self) -> Iterator['MemoryRepository']:
+        with self.lock:
+            yield self
+
+    def add_student(self, student_id: str, name: str, age: int, email: str):
+        with self.lock:
+            self._insert('students', (student_id, name, age, email))
+
+    def update_student(self, student_id: str, name: str, age: int, email: str):
+        with self.lock:
+            self._replace('students', (student_id, name, age, email))
+
+    def delete_student(self, student_id: str):
+        with self.lock:
+            self._delete('students', student_id)
+            self._graph.remove_student(student_id)
+
+    def get_student(self, student_id: str) -> Optional[Student]:
+        row = self._rows['students'].get(student_id)
+        return Student.from_row(row) if row else None
+
+    def add_instructor(self, instructor_id: str, name: str, age: int, email: str):
+        with self.lock:
+            self._insert('instructors', (instructor_id, name, age, email))
+
+    def update_instructor(self, instructor_id: str, name: str, age: int, email: str):
+        with self.lock:
+            self._replace('instructors', (instructor_id, name, age, email))
+
+    def delete_instructor(self, instructor_id: str):
+        with self.lock:
+            course_count = len(self._graph.courses_taught_by(instructor_id))
+            if course_count > 0:
+                raise RecordInUse(f"Cannot delete instructor. They are assigned to {course_count} course(s).")
+            self._delete('instructors', instructor_id)
+
+    def get_instructor(self, instructor_id: str) -> Optional[Instructor]:
+        row = self._rows['instructors'].get(instructor_id)
+        return Instructor.from_row(row) if row else None
+
+    def add_course(self, course_id: str, course_name: str, instructor_id: Optional[str]):
+        with self.lock:
+            self._check_instructor(instructor_id)
+            self._insert('courses', (course_id, course_name, instructor_id))
+            self._graph.assign(course_id, instructor_id)
+
+    def update_course(self, course_id: str, course_name: str, instructor_id: Optional[str]):
+        with self.lock:
+            if course_id in self._rows['courses']:
+                self._check_instructor(instructor_id)
+            self._replace('courses', (course_id, course_name, instructor_id))
+            self._graph.assign(course_id, instructor_id)
+
+    def delete_course(self, course_id: str):
+        with self.lock:
+            self._delete('courses', course_id)
+            self._graph.remove_course(course_id)
+
+    def get_course(self, course_id: str) -> Optional[Course]:
+        row = self._rows['courses'].get(course_id)
+        if row is None:
+            return None
+        return Course(row[0], row[1], self.get_instructor(row[2]) if row[2] is not None else None)
+
+    def register(self, student_id: str, course_id: str):
+        with self.lock:
+            if student_id not in self._rows['students']:
+                raise RecordNotFound(f"No student found with ID {student_id}")
+            if course_id not in self._rows['courses']:
+                raise RecordNotFound(f"No course found with ID {course_id}")
+            if not self._graph.register(student_id, course_id):
+                raise DuplicateRecord(f"Student {student_id} is already registered to course {course_id}.")
+
+    def register_many(self, course_ids: Iterable[str], student_ids: Optional[Iterable[str]] = None,
+                      student_filter: Optional[StudentFilter] = None) -> Dict[str, int]:
+        with self.lock:
+            courses = list(dict.fromkeys(course_ids))
+            for course_id in courses:
+                if course_id not in self._rows['courses']:
+                    raise RecordNotFound(f"No course found with ID {course_id}")
+            rows = self._rows['students']
+            unknown = 0
+            if student_ids is not None:
+                requested = list(dict.fromkeys(student_ids))
+                students = [student_id for student_id in requested if student_id in rows]
+                unknown = len(requested) - len(students)
+            else:
+                students = self._keys['students']
+            student_filter = student_filter or StudentFilter()
+            students = [student_id for student_id in students if student_filter.matches(rows[student_id])]
+            inserted = sum(self._graph.register(student_id, course_id)
+                           for student_id in students for course_id in courses)
+            return {
+                'inserted': inserted,
+                'duplicates': len(students) * len(courses) - inserted,
+                'unknown_students': unknown,
+            }
+
+    def unregister(self, student_id: str, course_id: str):
+        with self.lock:
+            if not self._graph.unregister(student_id, course_id):
+                raise RecordNotFound(f"Student {student_id} is not registered to course {course_id}.")
+
+    def courses_of_student(self, student_id: str) -> List[str]:
+        with self.lock:
+            return sorted(self._graph.courses_of(student_id))
+
+    def students_in_course(self, course_id: str) -> List[str]:
+        with self.lock:
+            return sorted(self._graph.students_in(course_id))
+
+    def count(self, table: str) -> int:
+        with self.lock:
+            if table == 'registrations':
+                return len(self._graph)
+            return len(self._rows[table])
+
+    def choices(self, table: str, after: Optional[str] = None, limit: int = 500) -> List[Tuple[str, str]]:
+        with self.lock:
+            keys = self._keys[table]
+            start = bisect_right(keys, after) if after is not None else 0
+            rows = self._rows[table]
+            return [(key, rows[key][1]) for key in keys[start:start + limit]]
+
+    def _insert(self, table: str, row: Tuple[Any, ...]):
+        rows = self._rows[table]
+        if row[0] in rows:
+            raise DuplicateRecord(f"{RECORD_LABELS[table].capitalize()} {row[0]} already exists.")
+        rows[row[0]] = row
+        insort(self._keys[table], row[0])
+
+    def _replace(self, table: str, row: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        rows = self._rows[table]
+        previous = rows.get(row[0])
+        if previous is None:
+            raise RecordNotFound(f"No {RECORD_LABELS[table]} found with ID {row[0]}")
+        rows[row[0]] = row
+        return previous
+
+    def _delete(self, table: str, key: str) -> Tuple[Any, ...]:
+        previous = self._rows[table].pop(key, None)
+        if previous is None:
+            raise RecordNotFound(f"No {RECORD_LABELS[table]} found with ID {key}")
+        keys = self._keys[table]
+        del keys[bisect_left(keys, key)]
+        return previous
+
+    def _check_instructor(self, instructor_id: Optional[str]):
+        if instructor_id is not None and instructor_id not in self._rows['instructors']:
+            raise RecordNotFound(f"No instructor found with ID {instructor_id}")
@@ -0,0 +1,251 @@
+import logging
+import sqlite3
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+from database import CREATE_TABLES_SQL, Database
+from paging import page_statement
+
+# Indexes for the lookups the handlers make by a non-key column. The primary
+# keys already cover lookups by ID and registrations by student.
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_courses_instructor ON courses (instructor_id, course_id)",
+    "CREATE INDEX IF NOT EXISTS idx_registrations_course ON registrations (course_id, student_id)",
+)
+
+# Rows sampled per index by ANALYZE, so that it stays quick on large databases.
+ANALYSIS_LIMIT = 1000
+
+
+MIGRATION_PROGRESS_TABLE = 'schema_migration_progress'
+
+logger = logging.getLogger(__name__)
+
+
+class Backfill:
+    """
+    A data migration applied to a table in batches of rows, in rowid order.
+
+    Every batch commits on its own together with the position reached, so the
+    write lock is only held for one batch at a time, and an interrupted
+    backfill resumes after the last committed batch.
+
+    :param table: The table to walk; it must be a rowid table
+    :type table: str
+    :param apply: Called inside the batch's transaction with the connection and
+        the rowid range ``first < rowid <= last`` to migrate
+    :type apply: Callable[[sqlite3.Connection, int, int], None]
+    :param batch_size: The number of rows per batch, defaults to 10000
+    :type batch_size: int, optional
+    """
+
+    def __init__(self, table: str, apply: Callable[[sqlite3.Connection, int, int], None], batch_size: int = 10000):
+
+        self.table = table
+        self.apply = apply
+        self.batch_size = batch_size
+
+    def run(self, db: Database, version: int, batch_size: Optional[int] = None) -> int:
+        """
+        Applies the remaining batches of the backfill.
+
+        :param db: The database to migrate
+        :type db: Database
+        :param version: The version of the migration, used to store its progress
+        :type version: int
+        :param batch_size: Overrides the batch size given to the constructor, defaults to None
+        :type batch_size: int, optional
+        :return: The number of batches applied
+        :rtype: int
+        """
+        batch_size = batch_size or self.batch_size
+        with db.transaction() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {MIGRATION_PROGRESS_TABLE} "
+                         "(version INTEGER PRIMARY KEY, position INTEGER NOT NULL)")
+            row = conn.execute(f"SELECT position FROM {MIGRATION_PROGRESS_TABLE} WHERE version=?",
+                               (version,)).fetchone()
+        position = row[0] if row else 0
+        if position:
+            logger.info("Resuming migration %d after rowid %d", version, position)
+        batches = 0
+        while True:
+            start = time.perf_counter()
+            with db.transaction() as conn:
+                last = conn.execute(f"SELECT MAX(rowid) FROM (SELECT rowid FROM {self.table} WHERE rowid > ? "
+                                    "ORDER BY rowid LIMIT ?)", (position, batch_size)).fetchone()[0]
+                if last is None:
+                    break
+                self.apply(conn, position, last)
+                conn.execute(f"INSERT OR REPLACE INTO {MIGRATION_PROGRESS_TABLE} (version, position) VALUES (?, ?)",
+                             (version, last))
+            batches += 1
+            logger.debug("Migration %d: rows %d-%d of %s in %.3f s",
+                         version, position + 1, last, self.table, time.perf_counter() - start)
+            position = last
+        return batches
+
+
+def _create_base_tables(conn: sqlite3.Connection):
+    for sql in CREATE_TABLES_SQL:
+        conn.execute(sql)
+
+
+def _create_indexes(conn: sqlite3.Connection):
+    for sql in INDEXES:
+        conn.execute(sql)
+
+
+# (version, description, step). A schema step is called with the connection and
+# commits together with the version bump; a Backfill commits batch by batch and
+# the version is bumped once its last batch is done.
+MIGRATIONS: List[Tuple[int, str, Union[Callable[[sqlite3.Connection], None], Backfill]]] = [
+    (1, "create the school tables", _create_base_tables),
+    (2, "index courses by instructor and registrations by course", _create_indexes),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(db: Database) -> int:
+    """
+    Reads the schema version stored in ``PRAGMA user_version``.
+
+    :param db: The database to inspect
+    :type db: Database
+    :return: The version of the last migration applied, 0 for a new or unversioned database
+    :rtype: int
+    """
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db: Database, target: Optional[int] = None, batch_size: Optional[int] = None,
+            migrations: Optional[Sequence[Tuple[int, str, Any]]] = None) -> List[Tuple[int, float]]:
+    """
+    Applies the migrations newer than the database's schema version, in order.
+
+    Schema migrations commit together with their version bump. Backfills commit
+    one batch at a time and record how far they got, so an interrupted upgrade
+    resumes where it stopped. Each step's timing is logged. When anything was
+    applied, a bounded ``ANALYZE`` refreshes the planner statistics.
+
+    :param db: The database to upgrade
+    :type db: Database
+    :param target: The version to stop at, defaults to the latest
+    :type target: int, optional
+    :param batch_size: Overrides the batch size of every backfill, defaults to None
+    :type batch_size: int, optional
+    :param migrations: The migrations to apply, defaults to MIGRATIONS
+    :type migrations: Sequence[Tuple[int, str, Any]], optional
+    :return: The version and duration in seconds of every migration applied
+    :rtype: List[Tuple[int, float]]
+    """
+    applied = []
+    for version, description, step in migrations or MIGRATIONS:
+        if version <= schema_version(db):
+            continue
+        if target is not None and version > target:
+            break
+        start = time.perf_counter()
+        if isinstance(step, Backfill):
+            batches = step.run(db, version, batch_size)
+            with db.transaction() as conn:
+                conn.execute(f"DELETE FROM {MIGRATION_PROGRESS_TABLE} WHERE version=?", (version,))
+                conn.execute(f"PRAGMA user_version={version}")
+            detail = f" in {batches} batches"
+        else:
+            with db.transaction() as conn:
+                step(conn)
+                conn.execute(f"PRAGMA user_version={version}")
+            detail = ""
+        elapsed = time.perf_counter() - start
+        logger.info("Applied migration %d (%s)%s in %.3f s", version, description, detail, elapsed)
+        applied.append((version, elapsed))
+    if applied:
+        start = time.perf_counter()
+        db.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        db.execute("ANALYZE")
+        db.commit()
+        logger.info("Analyzed in %.3f s", time.perf_counter() - start)
+    return applied
+
+
+# (description, statement, sample parameters) of the keyed queries, for auditing a live database from the
+# command line. tests/test_query_plans.py plans the statements the code actually runs.
+AUDITED_QUERIES: List[Tuple[str, str, Sequence[Any]]] = [
+    ("update student", "UPDATE students SET name=?, age=?, email=? WHERE student_id=?", ('', 0, '', 'S1')),
+    ("delete student registrations", "DELETE FROM registrations WHERE student_id=?", ('S1',)),
+    ("delete student", "DELETE FROM students WHERE student_id=?", ('S1',)),
+    ("update instructor", "UPDATE instructors SET name=?, age=?, email=? WHERE instructor_id=?", ('', 0, '', 'I1')),
+    ("count instructor courses", "SELECT COUNT(*) FROM courses WHERE instructor_id=?", ('I1',)),
+    ("delete instructor", "DELETE FROM instructors WHERE instructor_id=?", ('I1',)),
+    ("update course", "UPDATE courses SET course_name=?, instructor_id=? WHERE course_id=?", ('', 'I1', 'C1')),
+    ("delete course registrations", "DELETE FROM registrations WHERE course_id=?", ('C1',)),
+    ("delete course", "DELETE FROM courses WHERE course_id=?", ('C1',)),
+    ("student choices window",
+     "SELECT student_id, name FROM students WHERE student_id > ? ORDER BY student_id LIMIT ?", ('S1', 500)),
+    ("instructor choices window",
+     "SELECT instructor_id, name FROM instructors WHERE instructor_id > ? ORDER BY instructor_id LIMIT ?",
+     ('I1', 500)),
+    ("course choices window",
+     "SELECT course_id, course_name FROM courses WHERE course_id > ? ORDER BY course_id LIMIT ?", ('C1', 500)),
+    ("student previous page", page_statement('students', '<', descending=True), ('S1', 101)),
+    ("instructor previous page", page_statement('instructors', '<', descending=True), ('I1', 101)),
+    ("course previous page", page_statement('courses', '<', descending=True), ('C1', 101)),
+    ("student page from ID", page_statement('students', '>='), ('S1', 101)),
+]
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> List[str]:
+    """
+    Returns the steps of a statement's query plan.
+
+    :param conn: The connection to plan on
+    :type conn: sqlite3.Connection
+    :param sql: The statement to plan
+    :type sql: str
+    :param params: The statement parameters, defaults to ()
+    :type params: Sequence[Any], optional
+    :return: The detail text of each plan step
+    :rtype: List[str]
+    """
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def uses_index(plan: List[str]) -> bool:
+    """
+    Tells whether a query plan avoids full table scans and temporary sort trees.
+
+    :param plan: The plan steps, as returned by explain_query_plan
+    :type plan: List[str]
+    :rtype: bool
+    """
+    for step in plan:
+        if step.startswith('SCAN ') and 'USING' not in step and 'VIRTUAL TABLE' not in step:
+            return False
+        if step.startswith('USE TEMP B-TREE'):
+            return False
+    return True
+
+
+def audit_query_plans(db: Optional[Database] = None) -> List[Tuple[str, List[str]]]:
+    """
+    Checks with ``EXPLAIN QUERY PLAN`` that every query in AUDITED_QUERIES uses an index.
+
+    By default the audit runs against an empty in-memory database at the current
+    schema version. On a small live database, ANALYZE statistics can make a
+    scan the cheaper plan, so auditing one only reflects its current data.
+
+    :param db: The database to audit, defaults to a new in-memory database
+    :type db: Database, optional
+    :return: The description and plan of every query that does not use an index
+    :rtype: List[Tuple[str, List[str]]]
+    """
+    if db is None:
+        db = Database(':memory:')
+        migrate(db)
+    failures = []
+    for description, sql, params in AUDITED_QUERIES:
+        plan = explain_query_plan(db.connection, sql, params)
+        if not uses_index(plan):
+            failures.append((description, plan))
+    return failures
@@ -0,0 +1,172 @@
+import sqlite3
+from typing import Optional, Tuple
+
+from database import Database, search_query
+
+SEARCH_INDEX_TABLE = 'search_index'
+
+# Each indexed table gets its own slice of the index rowid space, so a row can be
+# found again from its base table rowid: index rowid = base rowid * 4 + code.
+_INDEXED_TABLES = (
+    # (table, type label, code, id column, name column, detail column, extra column)
+    ('students', 'Student', 1, 'student_id', 'name', 'age', 'email'),
+    ('instructors', 'Instructor', 2, 'instructor_id', 'name', 'age', 'email'),
+    ('courses', 'Course', 3, 'course_id', 'course_name', 'instructor_id', "''"),
+)
+
+# Trigram phrases need at least three characters to match anything.
+MIN_TOKEN_LENGTH = 3
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """
+    Checks whether the SQLite library supports FTS5 with the trigram tokenizer.
+
+    :param conn: The connection to check
+    :type conn: sqlite3.Connection
+    :return: True if a trigram FTS5 table can be created, False otherwise
+    :rtype: bool
+    """
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.fts5_probe")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def has_search_index(db: Database) -> bool:
+    """
+    Checks whether the full-text search index exists in the database.
+
+    :param db: The database to check
+    :type db: Database
+    :return: True if the index exists, False otherwise
+    :rtype: bool
+    """
+    row = db.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                     (SEARCH_INDEX_TABLE,)).fetchone()
+    return row is not None
+
+
+def create_search_index(db: Database) -> bool:
+    """
+    Creates the full-text search index over names and IDs, with the triggers that keep it in sync.
+
+    The index is only created when SQLite supports FTS5; existing rows are indexed
+    the first time it is created.
+
+    :param db: The database to index
+    :type db: Database
+    :return: True if the index is available, False if FTS5 is not supported
+    :rtype: bool
+    """
+    with db.transaction() as conn:
+        if not fts5_available(conn):
+            return False
+        exists = has_search_index(db)
+        conn.execute(f'''CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} USING fts5(
+            record_type UNINDEXED,
+            record_id,
+            name,
+            detail UNINDEXED,
+            extra UNINDEXED,
+            tokenize='trigram'
+        )''')
+        for table, label, code, id_col, name_col, detail_col, extra_col in _INDEXED_TABLES:
+            new_values = f"new.rowid * 4 + {code}, '{label}', new.{id_col}, new.{name_col}, " \
+                         f"new.{detail_col}, {_column('new', extra_col)}"
+            conn.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {SEARCH_INDEX_TABLE} (rowid, record_type, record_id, name, detail, extra)
+                VALUES ({new_values});
+            END''')
+            conn.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN
+                DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid = old.rowid * 4 + {code};
+                INSERT INTO {SEARCH_INDEX_TABLE} (rowid, record_type, record_id, name, detail, extra)
+                VALUES ({new_values});
+            END''')
+            conn.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+                DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid = old.rowid * 4 + {code};
+            END''')
+        if not exists:
+            populate_search_index(conn)
+    return True
+
+
+def rebuild_search_index(db: Database):
+    """
+    Re-indexes every student, instructor and course from scratch.
+
+    Needed after operations that renumber table rowids, such as ``VACUUM``.
+
+    :param db: The database to re-index
+    :type db: Database
+    """
+    with db.transaction() as conn:
+        populate_search_index(conn)
+
+
+def full_text_query(query: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    """
+    Builds a ranked full-text search statement for a query.
+
+    Every whitespace-separated token must appear in the ID or the name, as a
+    prefix, a substring or a whole word. Records whose ID or name starts with the
+    query come first, the rest are ordered by relevance.
+
+    :param query: The text to search for
+    :type query: str
+    :return: The SQL statement and its parameters, or None if the query has a token too short for the index
+    :rtype: Optional[Tuple[str, Tuple[str, ...]]]
+    """
+    tokens = query.split()
+    if not tokens or any(len(token) < MIN_TOKEN_LENGTH for token in tokens):
+        return None
+    match = "{record_id name} : (" + " ".join('"' + t.replace('"', '""') + '"' for t in tokens) + ")"
+    prefix = query.strip() + "%"
+    sql = (
+        f"SELECT record_type, record_id, name, detail, extra FROM {SEARCH_INDEX_TABLE} "
+        f"WHERE {SEARCH_INDEX_TABLE} MATCH ? "
+        "ORDER BY (record_id LIKE ? OR name LIKE ?) DESC, rank"
+    )
+    return sql, (match, prefix, prefix)
+
+
+def build_search_query(db: Database, query: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Builds the statement used by the search box.
+
+    The full-text index is used when it exists and the query is long enough for
+    it; otherwise the plain ``LIKE`` scan is used.
+
+    :param db: The database that will run the statement
+    :type db: Database
+    :param query: The text to search for
+    :type query: str
+    :return: The SQL statement and its parameters
+    :rtype: Tuple[str, Tuple[str, ...]]
+    """
+    statement = full_text_query(query)
+    if statement is not None and has_search_index(db):
+        return statement
+    return search_query(query)
+
+
+def populate_search_index(conn: sqlite3.Connection):
+    """
+    Empties the search index and indexes every student, instructor and course again.
+
+    Runs inside the caller's transaction, so bulk loaders can rebuild the index
+    once after inserting with the sync triggers dropped.
+
+    :param conn: The connection to use
+    :type conn: sqlite3.Connection
+    """
+    conn.execute(f"DELETE FROM {SEARCH_INDEX_TABLE}")
+    for table, label, code, id_col, name_col, detail_col, extra_col in _INDEXED_TABLES:
+        conn.execute(f'''INSERT INTO {SEARCH_INDEX_TABLE} (rowid, record_type, record_id, name, detail, extra)
+            SELECT rowid * 4 + {code}, '{label}', {id_col}, {name_col}, {detail_col}, {extra_col} FROM {table}''')
+
+
+def _column(alias: str, column: str) -> str:
+    return column if column.startswith("'") else f"{alias}.{column}"
@@ -0,0 +1,248 @@
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from binary_snapshot import BINARY_SNAPSHOT_FILE, BINARY_TABLES, load_binary_snapshot, save_binary_snapshot
+from bulk import bulk_load
+from database import Database, TABLE_COLUMNS, iter_table
+
+SNAPSHOT_TABLES = ('students', 'instructors', 'courses', 'registrations')
+
+# Snapshots written before registrations were saved have no file for them.
+OPTIONAL_TABLES = ('registrations',)
+
+JSON_LINES_FORMAT = 'jsonl'
+BINARY_FORMAT = 'binary'
+SNAPSHOT_FORMATS = (JSON_LINES_FORMAT, BINARY_FORMAT)
+
+SNAPSHOT_EXTENSION = '.jsonl'
+LEGACY_EXTENSION = '.json'
+
+READ_CHUNK_SIZE = 65536
+
+
+def snapshot_path(directory: str, table: str) -> str:
+    """
+    Finds the snapshot file of a table, preferring JSON Lines over a legacy JSON array file.
+
+    :param directory: The directory holding the snapshot
+    :type directory: str
+    :param table: The name of the table
+    :type table: str
+    :return: The path of the existing file, or of the JSON Lines file if neither exists
+    :rtype: str
+    """
+    path = os.path.join(directory, table + SNAPSHOT_EXTENSION)
+    legacy = os.path.join(directory, table + LEGACY_EXTENSION)
+    if not os.path.exists(path) and os.path.exists(legacy):
+        return legacy
+    return path
+
+
+def write_records(filename: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Writes records to a JSON Lines file, one object per line.
+
+    The records are consumed one at a time and the file is replaced atomically
+    once every record has been written.
+
+    :param filename: The name of the file to write
+    :type filename: str
+    :param records: The records to write
+    :type records: Iterable[Dict[str, Any]]
+    :return: The number of records written
+    :rtype: int
+    """
+    count = 0
+    temporary = filename + '.tmp'
+    try:
+        with open(temporary, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record))
+                f.write('\n')
+                count += 1
+        os.replace(temporary, filename)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return count
+
+
+def iter_records(filename: str) -> Iterator[Dict[str, Any]]:
+    """
+    Reads records one at a time from a JSON Lines file or from a legacy JSON array file.
+
+    :param filename: The name of the file to read
+    :type filename: str
+    :return: An iterator over the records in the file
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from _iter_json_array(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def record_to_row(table: str, record: Dict[str, Any],
+                  instructor_ids: Optional[Dict[str, str]] = None) -> Tuple[Any, ...]:
+    """
+    Converts a snapshot record into a row of a school table.
+
+    Records written by older versions are accepted: persons may store their
+    email as ``_email``, and courses may embed their instructor instead of
+    storing its ID, in which case the instructor is looked up by ID or by name.
+
+    :param table: The name of the table
+    :type table: str
+    :param record: The record to convert
+    :type record: Dict[str, Any]
+    :param instructor_ids: Instructor IDs by instructor name, used for legacy course records
+    :type instructor_ids: Dict[str, str], optional
+    :return: The row, in the column order of TABLE_COLUMNS
+    :rtype: Tuple[Any, ...]
+    """
+    if table in ('students', 'instructors'):
+        id_column = TABLE_COLUMNS[table][0]
+        email = record['email'] if 'email' in record else record.get('_email')
+        return record[id_column], record['name'], record['age'], email
+    if table == 'courses':
+        instructor_id = record.get('instructor_id')
+        instructor = record.get('instructor')
+        if instructor_id is None and instructor is not None:
+            if isinstance(instructor, dict):
+                instructor_id = instructor.get('instructor_id')
+                instructor = instructor.get('name')
+            if instructor_id is None and instructor_ids is not None:
+                instructor_id = instructor_ids.get(instructor)
+        return record['course_id'], record['course_name'], instructor_id
+    return tuple(record[column] for column in TABLE_COLUMNS[table])
+
+
+def save_snapshot(db: Database, directory: str = '.', tables: Optional[Sequence[str]] = None,
+                  batch_size: int = 1000, snapshot_format: str = JSON_LINES_FORMAT) -> Dict[str, int]:
+    """
+    Streams tables into a snapshot.
+
+    The JSON Lines format writes one file per table; the binary format writes a
+    single columnar file, see :mod:`binary_snapshot`. All tables are read inside
+    one transaction, so the snapshot is consistent.
+
+    :param db: The database to save
+    :type db: Database
+    :param directory: The directory to write the snapshot to, defaults to the current directory
+    :type directory: str, optional
+    :param tables: The tables to save, defaults to every table the format stores
+    :type tables: Sequence[str], optional
+    :param batch_size: The number of rows fetched at a time, defaults to 1000
+    :type batch_size: int, optional
+    :param snapshot_format: One of SNAPSHOT_FORMATS, defaults to JSON_LINES_FORMAT
+    :type snapshot_format: str, optional
+    :return: The number of records written for each table
+    :rtype: Dict[str, int]
+    :raises ValueError: If the format is unknown
+    """
+    if snapshot_format == BINARY_FORMAT:
+        return save_binary_snapshot(db, os.path.join(directory, BINARY_SNAPSHOT_FILE),
+                                    tables or BINARY_TABLES, batch_size)
+    if snapshot_format != JSON_LINES_FORMAT:
+        raise ValueError(f"Unknown snapshot format {snapshot_format}")
+
+    counts = {}
+    with db.transaction():
+        for table in tables or SNAPSHOT_TABLES:
+            columns = TABLE_COLUMNS[table]
+            records = (dict(zip(columns, row)) for row in iter_table(db, table, batch_size))
+            counts[table] = write_records(os.path.join(directory, table + SNAPSHOT_EXTENSION), records)
+    return counts
+
+
+def load_snapshot(db: Database, directory: str = '.', tables: Optional[Sequence[str]] = None,
+                  defer_indexes: bool = True, snapshot_format: str = JSON_LINES_FORMAT) -> Dict[str, int]:
+    """
+    Replaces the contents of the database with a snapshot, streaming it into the bulk loader.
+
+    For the JSON Lines format, JSON Lines files are preferred and legacy JSON
+    array files are read when no JSON Lines file exists for a table. Snapshots
+    without a registrations file load with no registrations. The binary format
+    is memory-mapped and always loads every table it contains.
+
+    :param db: The database to load into
+    :type db: Database
+    :param directory: The directory holding the snapshot, defaults to the current directory
+    :type directory: str, optional
+    :param tables: The tables to load from JSON Lines files, defaults to SNAPSHOT_TABLES
+    :type tables: Sequence[str], optional
+    :param defer_indexes: Whether to rebuild indexes once after loading, defaults to True
+    :type defer_indexes: bool, optional
+    :param snapshot_format: One of SNAPSHOT_FORMATS, defaults to JSON_LINES_FORMAT
+    :type snapshot_format: str, optional
+    :return: The number of rows inserted into each table
+    :rtype: Dict[str, int]
+    :raises ValueError: If the format is unknown
+    """
+    if snapshot_format == BINARY_FORMAT:
+        return load_binary_snapshot(db, os.path.join(directory, BINARY_SNAPSHOT_FILE), defer_indexes)
+    if snapshot_format != JSON_LINES_FORMAT:
+        raise ValueError(f"Unknown snapshot format {snapshot_format}")
+
+    paths = {}
+    for table in tables or SNAPSHOT_TABLES:
+        path = snapshot_path(directory, table)
+        if os.path.exists(path):
+            paths[table] = path
+        elif table not in OPTIONAL_TABLES:
+            raise FileNotFoundError(f"No snapshot file {path}")
+
+    instructor_ids: Dict[str, str] = {}
+
+    def rows(table: str) -> Iterator[Tuple[Any, ...]]:
+        for record in iter_records(paths[table]):
+            row = record_to_row(table, record, instructor_ids)
+            if table == 'instructors':
+                instructor_ids.setdefault(row[1], row[0])
+            yield row
+
+    return bulk_load(db, {table: rows(table) for table in paths}, defer_indexes=defer_indexes)
+
+
+def _iter_json_array(f, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Decodes the elements of a top-level JSON array one at a time, reading the file in chunks.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = f.read(chunk_size), 0
+    opened = False
+    while True:
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or (opened and buffer[position] == ',')):
+                position += 1
+            if position < len(buffer):
+                break
+            buffer, position = f.read(chunk_size), 0
+            if not buffer:
+                raise ValueError("Unterminated JSON array" if opened else "Expected a JSON array")
+        if not opened:
+            if buffer[position] != '[':
+                raise ValueError("Expected a JSON array")
+            opened = True
+            position += 1
+            continue
+        if buffer[position] == ']':
+            return
+        while True:
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError:
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buffer, position = buffer[position:] + more, 0
+        yield item
@@ -0,0 +1,169 @@
+import sqlite3
+from typing import Any, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt
+
+from database import Database, RECORD_HEADERS
+from metrics import get_metrics
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    A read-only table model that streams rows from the database as the view scrolls.
+
+    Rows are pulled from an open cursor in windows of ``batch_size`` through
+    ``canFetchMore``/``fetchMore``, so only the rows the user has scrolled to are
+    ever materialised, and the same model is reused for every refresh.
+
+    The cursor runs on a private read-only connection. Its read snapshot stays
+    open until the rows are exhausted or replaced, so it must not be the shared
+    connection: that one would stop seeing the writer's commits meanwhile.
+    In a shared-cache in-memory database, connections share table locks, so
+    schema changes still wait for the cursor to be exhausted or cleared.
+
+    :param db: The database to read records from
+    :type db: Database
+    :param batch_size: The number of rows fetched per window, defaults to 256
+    :type batch_size: int, optional
+    :param parent: The parent object, defaults to None
+    :type parent: QObject, optional
+    """
+
+    def __init__(self, db: Database, batch_size: int = 256, parent: Optional[QObject] = None):
+
+        super().__init__(parent)
+        self.db = db
+        self.batch_size = batch_size
+        self.headers = list(RECORD_HEADERS)
+        self._rows: List[Tuple[Any, ...]] = []
+        self._cursor: Optional[sqlite3.Cursor] = None
+        self._reader: Optional[sqlite3.Connection] = None
+
+    def set_query(self, sql: str, params: Sequence[Any] = (), headers: Optional[Sequence[str]] = None):
+        """
+        Replaces the rows shown by the model with the results of a query.
+
+        Only the first window is fetched; the rest is fetched on demand.
+
+        :param sql: The SQL statement producing the rows
+        :type sql: str
+        :param params: The statement parameters, defaults to ()
+        :type params: Sequence[Any], optional
+        :param headers: The column headers, defaults to RECORD_HEADERS
+        :type headers: Sequence[str], optional
+        """
+        self.beginResetModel()
+        self._close_cursor()
+        self.headers = list(headers or RECORD_HEADERS)
+        self._rows = []
+        self._cursor = self._connection().cursor()
+        self._cursor.execute(sql, params)
+        self._rows = self._fetch_window()
+        self.endResetModel()
+        get_metrics().add_items(len(self._rows))
+
+    def set_rows(self, rows: List[Tuple[Any, ...]], headers: Optional[Sequence[str]] = None):
+        """
+        Replaces the rows shown by the model with rows read elsewhere, such as a page of records or a report.
+
+        :param rows: The rows to show
+        :type rows: List[Tuple[Any, ...]]
+        :param headers: The column headers, defaults to RECORD_HEADERS
+        :type headers: Sequence[str], optional
+        """
+        self.beginResetModel()
+        self._close_cursor()
+        self.headers = list(headers or RECORD_HEADERS)
+        self._rows = list(rows)
+        self.endResetModel()
+        get_metrics().add_items(len(self._rows))
+
+    def clear(self):
+        """
+        Removes every row from the model, going back to the record headers.
+        """
+        self.beginResetModel()
+        self._close_cursor()
+        self.headers = list(RECORD_HEADERS)
+        self._rows = []
+        self.endResetModel()
+
+    def append_rows(self, rows: List[Tuple[Any, ...]]):
+        """
+        Appends rows produced elsewhere, such as batches streamed by a background search.
+
+        :param rows: The rows to append
+        :type rows: List[Tuple[Any, ...]]
+        """
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+        get_metrics().add_items(len(rows))
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return str(self._rows[index.row()][index.column()])
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return self._cursor is not None
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid() or self._cursor is None:
+            return
+        self.append_rows(self._fetch_window())
+
+    def _fetch_window(self) -> List[Tuple[Any, ...]]:
+        """
+        Reads the next window of rows, closing the cursor once it is exhausted.
+        """
+        try:
+            rows = self._cursor.fetchmany(self.batch_size)
+        except sqlite3.Error:
+            rows = []
+        if len(rows) < self.batch_size:
+            self._close_cursor()
+        get_metrics().add_rows(len(rows))
+        return rows
+
+    def close(self):
+        """
+        Drops the rows and closes the model's connection. It is reopened by the next query.
+        """
+        self.clear()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._reader is None:
+            self._reader = self.db.connect()
+            self._reader.execute("PRAGMA query_only=ON")
+        return self._reader
+
+    def _close_cursor(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database  # noqa: E402
+from schema import migrate  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A migrated database file in a temporary directory."""
+    database = Database(str(tmp_path / 'school.db'))
+    migrate(database)
+    yield database
+    database.close()
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """The Qt application, needed for signals delivered across threads."""
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,39 @@
+import os
+
+from cli import build_parser, main
+from database import DB_PATH_ENV, DEFAULT_DB_PATH
+
+
+def test_db_defaults_to_the_environment(monkeypatch, tmp_path):
+    path = str(tmp_path / 'env.db')
+    monkeypatch.setenv(DB_PATH_ENV, path)
+    assert build_parser().parse_args(['stats']).db == path
+    monkeypatch.delenv(DB_PATH_ENV)
+    assert build_parser().parse_args(['stats']).db == DEFAULT_DB_PATH
+
+
+def test_stats_uses_the_environment_database(monkeypatch, tmp_path, capsys):
+    path = tmp_path / 'env.db'
+    monkeypatch.setenv(DB_PATH_ENV, str(path))
+    assert main(['stats']) == 0
+    assert os.path.exists(path)
+    assert "students: 0" in capsys.readouterr().out
+
+
+def test_register_applies_filters_to_the_listed_students(tmp_path, capsys):
+    from database import Database, insert_statement
+    from schema import migrate
+    path = str(tmp_path / 'school.db')
+    db = Database(path)
+    migrate(db)
+    with db.transaction() as conn:
+        conn.execute(insert_statement('courses'), ("C1", "Math", None))
+        conn.executemany(insert_statement('students'),
+                         [("S1", "Young", 18, "a@school.edu"), ("S2", "Old", 30, "b@school.edu"),
+                          ("S3", "Older", 40, "c@school.edu")])
+    db.close()
+    students = tmp_path / 'students.txt'
+    students.write_text("S1\nS2\nS9\n", encoding='utf-8')
+
+    assert main(['--db', path, 'register', 'C1', '--students-file', str(students), '--min-age', '21']) == 0
+    assert capsys.readouterr().out.split() == ['inserted:', '1', 'duplicates:', '0', 'unknown_students:', '1']
@@ -0,0 +1,57 @@
+import csv
+
+from csv_io import CSV_HEADER, export_csv, import_csv
+from database import Database, insert_statement
+from schema import migrate
+
+
+def populate(db):
+    with db.transaction() as conn:
+        conn.execute(insert_statement('instructors'), ("I1", "Ivy", 40, "ivy@school.edu"))
+        conn.execute(insert_statement('courses'), ("C1", "Math", "I1"))
+        conn.execute(insert_statement('courses'), ("C2", "Art", None))
+        conn.executemany(insert_statement('students'),
+                         ((f"S{i}", f"Student {i}", 20 + i, f"s{i}@school.edu") for i in range(5)))
+        conn.executemany(insert_statement('registrations'), ((f"S{i}", "C1") for i in range(3)))
+
+
+def dump(db):
+    return {table: sorted(db.execute(f"SELECT * FROM {table}").fetchall())
+            for table in ('students', 'instructors', 'courses', 'registrations')}
+
+
+def test_export_import_round_trip(db, tmp_path):
+    populate(db)
+    filename = str(tmp_path / 'school.csv')
+    export_csv(db.connection, filename)
+
+    copy = Database(str(tmp_path / 'copy.db'))
+    migrate(copy)
+    counts = import_csv(copy, filename)
+    assert counts == {'instructors': 1, 'students': 5, 'courses': 2, 'registrations': 3, 'rejected': 0}
+    assert dump(copy) == dump(db)
+    copy.close()
+
+
+def test_import_counts_only_new_registrations(db, tmp_path):
+    populate(db)
+    filename = str(tmp_path / 'school.csv')
+    with open(filename, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        writer.writerow(['Registration', 'S0', 'C1', '', ''])
+        writer.writerow(['Registration', 'S4', 'C1', '', ''])
+        writer.writerow(['Registration', 'S9', 'C1', '', ''])
+    counts = import_csv(db, filename)
+    assert counts['registrations'] == 1
+    assert counts['rejected'] == 1
+
+
+def test_import_task_reports_malformed_file(qapp, db, tmp_path):
+    from test_workers import run_task
+    from workers import ImportTask
+    filename = tmp_path / 'huge.csv'
+    filename.write_text(",".join(CSV_HEADER) + "\nStudent,S1,\"" + "x" * (csv.field_size_limit() + 1) + "\",20,a@b.c\n",
+                        encoding='utf-8')
+    name, (message,) = run_task(ImportTask(db, str(filename)))
+    assert name == 'failed' and 'field larger than field limit' in message
@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+
+from database import insert_statement
+
+
+def test_failed_commit_rolls_back_and_next_transaction_commits(db):
+    # A reader in rollback-journal mode holds a SHARED lock, so COMMIT cannot take the exclusive lock.
+    db.connection.execute("PRAGMA journal_mode=DELETE")
+    db.connection.execute("PRAGMA busy_timeout=0")
+    reader = sqlite3.connect(db.path, timeout=0)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM students").fetchone()
+
+    with pytest.raises(sqlite3.OperationalError):
+        with db.transaction() as conn:
+            conn.execute(insert_statement('students'), ("S1", "Alice", 20, "alice@school.edu"))
+    assert not db.connection.in_transaction
+
+    reader.rollback()
+    with db.transaction() as conn:
+        conn.execute(insert_statement('students'), ("S2", "Bob", 21, "bob@school.edu"))
+    assert not db.connection.in_transaction
+
+    assert reader.execute("SELECT student_id FROM students").fetchall() == [("S2",)]
+    reader.close()
+
+
+def test_nested_transaction_rolls_back_with_outer(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute(insert_statement('students'), ("S1", "Alice", 20, "alice@school.edu"))
+            with db.transaction() as inner:
+                inner.execute(insert_statement('students'), ("S2", "Bob", 21, "bob@school.edu"))
+            raise RuntimeError
+    assert db.execute("SELECT COUNT(*) FROM students").fetchone()[0] == 0
@@ -0,0 +1,51 @@
+import threading
+
+from metrics import BACKGROUND, Metrics
+
+
+def test_counts_from_other_threads_are_not_charged_to_the_current_action(db):
+    metrics = Metrics(enabled=True)
+    try:
+        other = db.connect()
+        with metrics.action('display_records'):
+            metrics.add_rows(10)
+            db.execute("SELECT COUNT(*) FROM students").fetchone()
+
+            def background():
+                metrics.add_rows(1000)
+                metrics.add_items(7)
+                other.execute("SELECT COUNT(*) FROM courses").fetchone()
+            thread = threading.Thread(target=background)
+            thread.start()
+            thread.join()
+        other.close()
+    finally:
+        metrics.disable()
+
+    action = metrics.actions['display_records']
+    assert (action.rows_fetched, action.items_created, action.statements) == (10, 0, 1)
+    assert action.latency.count == 1
+    background_stats = metrics.actions[BACKGROUND]
+    assert (background_stats.rows_fetched, background_stats.items_created) == (1000, 7)
+    assert background_stats.statements >= 1
+
+
+def test_nested_actions_restore_the_outer_one():
+    metrics = Metrics(enabled=True)
+    try:
+        with metrics.action('outer'):
+            with metrics.action('inner'):
+                metrics.add_items(1)
+            metrics.add_items(2)
+    finally:
+        metrics.disable()
+    assert metrics.actions['inner'].items_created == 1
+    assert metrics.actions['outer'].items_created == 2
+
+
+def test_disabled_metrics_collect_nothing(db):
+    metrics = Metrics()
+    handler = metrics.instrument('noop', lambda: 42)
+    assert handler() == 42
+    metrics.add_rows(5)
+    assert metrics.actions == {}
@@ -0,0 +1,53 @@
+import cProfile
+import threading
+import tracemalloc
+
+import profiling
+from profiling import Profiler
+
+
+def test_profile_writes_a_report(tmp_path):
+    profiler = Profiler(['load_data'], str(tmp_path), enabled=True)
+    assert profiler.wrap('load_data', lambda: sum(range(1000)))() == 499500
+    assert len(profiler.written) == 1
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_running(tmp_path):
+    tracemalloc.start()
+    try:
+        profiler = Profiler(['load_data'], str(tmp_path), enabled=True)
+        profiler.wrap('load_data', lambda: None)()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_nested_and_concurrent_profiles_are_skipped(tmp_path):
+    profiler = Profiler(['load_data', 'save_data'], str(tmp_path), enabled=True)
+    inner = profiler.wrap('save_data', lambda: 'inner')
+    assert profiler.wrap('load_data', inner)() == 'inner'
+    assert len(profiler.written) == 1
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+    thread = threading.Thread(target=profiler.wrap('load_data', slow))
+    thread.start()
+    started.wait(5)
+    assert profiler.wrap('save_data', lambda: 'ran')() == 'ran'
+    release.set()
+    thread.join()
+    assert len(profiler.written) == 2
+
+
+def test_handler_runs_when_another_profiler_is_active(tmp_path, monkeypatch):
+    class Busy(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+    monkeypatch.setattr(profiling.cProfile, 'Profile', Busy)
+    profiler = Profiler(['load_data'], str(tmp_path), enabled=True)
+    assert profiler.wrap('load_data', lambda: 'ran')() == 'ran'
+    assert profiler.written == []
@@ -0,0 +1,125 @@
+"""
+Plans every statement the application runs for keyed operations and checks that none scans a base table.
+
+The statements are captured with set_statement_tracer while the real code
+paths run, so they cannot drift from what the code issues.
+"""
+import re
+from typing import List
+
+import pytest
+
+from csv_io import import_csv
+from database import insert_statement, set_statement_tracer
+from paging import KeysetPager
+from repository import SQLiteRepository, StudentFilter
+from schema import explain_query_plan
+
+BASE_TABLES = ('students', 'instructors', 'courses', 'registrations')
+
+# Statements that read a whole table on purpose: row counts for progress and statistics, and the
+# substring filter of the combo boxes, which no B-tree index can answer.
+WHOLE_TABLE = (
+    re.compile(r"^SELECT COUNT\(\*\) FROM (students|instructors|courses|registrations)$"),
+    re.compile(r"^SELECT \w+, \w+ FROM \w+ WHERE .*\bLIKE '%.*%'.* ORDER BY \w+ LIMIT \d+$"),
+)
+
+# A window read in index order, such as the first page, walks the index and stops at the limit.
+_BOUNDED = re.compile(r"\bORDER BY [\w.]+(?: DESC)? LIMIT \d+$")
+
+_ALIAS = re.compile(r"\b(students|instructors|courses|registrations)\s+(?:AS\s+)?(\w+)", re.IGNORECASE)
+_SKIPPED = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA', 'CREATE', 'DROP', 'ANALYZE')
+
+
+def scanned_tables(conn, sql: str) -> List[str]:
+    """Returns the plan steps of a statement that scan a base table, through any alias."""
+    names = set(BASE_TABLES)
+    names.update(alias for table, alias in _ALIAS.findall(sql)
+                 if alias.upper() not in ('WHERE', 'SET', 'ON', 'JOIN', 'ORDER', 'LIMIT', 'VALUES', 'CROSS',
+                                          'LEFT', 'GROUP', 'USING', 'AS'))
+    plan = explain_query_plan(conn, sql)
+    bounded = _BOUNDED.search(sql) and not any(step.startswith('USE TEMP B-TREE') for step in plan)
+    return [step for step in plan
+            if step.startswith('SCAN ') and step.split()[1] in names
+            and not (bounded and ' USING ' in step and 'INDEX' in step)]
+
+
+@pytest.fixture
+def traced(db):
+    statements: List[str] = []
+    with db.transaction() as conn:
+        conn.execute(insert_statement('instructors'), ("I1", "Ivy", 40, "ivy@school.edu"))
+        conn.executemany(insert_statement('courses'), ((f"C{i}", f"Course {i}", "I1") for i in range(5)))
+        conn.executemany(insert_statement('students'),
+                         ((f"S{i:03d}", f"Student {i}", 20, f"s{i}@school.edu") for i in range(300)))
+    set_statement_tracer(statements.append)
+    yield statements
+    set_statement_tracer(None)
+
+
+def check(db, statements: List[str]):
+    failures = []
+    for sql in dict.fromkeys(statement.strip() for statement in statements):
+        if sql.split(None, 1)[0].upper() in _SKIPPED or any(pattern.match(sql) for pattern in WHOLE_TABLE):
+            continue
+        steps = scanned_tables(db.connection, sql)
+        if steps:
+            failures.append(f"{sql}\n    {'; '.join(steps)}")
+    assert not failures, "statements scanning a base table:\n" + "\n".join(failures)
+
+
+def test_repository_statements(db, traced):
+    repository = SQLiteRepository(db)
+    repository.add_student("S900", "New", 20, "new@school.edu")
+    repository.update_student("S900", "Renamed", 21, "new@school.edu")
+    repository.get_student("S900")
+    repository.add_instructor("I2", "Ian", 50, "ian@school.edu")
+    repository.update_instructor("I2", "Ian", 51, "ian@school.edu")
+    repository.get_instructor("I2")
+    repository.add_course("C9", "Physics", "I2")
+    repository.update_course("C9", "Physics II", "I1")
+    repository.get_course("C9")
+    repository.register("S900", "C9")
+    repository.courses_of_student("S900")
+    repository.students_in_course("C9")
+    repository.unregister("S900", "C9")
+    repository.register_many(["C1", "C2"], ["S001", "S002", "missing"])
+    repository.register_many(["C3"], student_filter=StudentFilter("S01", min_age=18))
+    repository.choices('students', after="S100", limit=50)
+    repository.delete_course("C9")
+    repository.delete_instructor("I2")
+    repository.delete_student("S900")
+    check(db, traced)
+
+
+def test_pager_statements(db, traced):
+    pager = KeysetPager(db, 'students', page_size=50)
+    pager.first()
+    pager.next()
+    pager.next()
+    pager.previous()
+    pager.jump("S150")
+    pager.refresh()
+    check(db, traced)
+
+
+def test_choice_model_statements(qapp, db, traced):
+    from combo_model import ChoiceListModel
+    model = ChoiceListModel(db, 'students', 'student_id', 'name')
+    model.reload()
+    while model.canFetchMore():
+        model.fetchMore()
+    model.set_filter("Student 1")
+    check(db, traced)
+
+
+def test_csv_import_statements(db, traced, tmp_path):
+    path = tmp_path / 'import.csv'
+    path.write_text("Type,ID,Name,Age/Course Name,Email/Instructor ID\n"
+                    "Student,S500,Ann,22,ann@school.edu\n"
+                    "Course,C50,Chemistry,I1\n"
+                    "Course,C51,Biology,I404\n"
+                    "Registration,S500,C50,,\n"
+                    "Registration,S404,C50,,\n", encoding='utf-8')
+    import_csv(db, str(path))
+    check(db, traced)
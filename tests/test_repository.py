@@ -0,0 +1,82 @@
+from models import Course, Instructor, Student
+from repository import MemoryRepository, RepositoryError, SQLiteRepository, StudentFilter
+
+# Every step runs on both engines; results and refusals must be the same.
+STEPS = [
+    ('add_instructor', ("I1", "Ivy", 40, "ivy@school.edu")),
+    ('add_instructor', ("I2", "Ian", 50, "ian@school.edu")),
+    ('add_instructor', ("I1", "Ivy", 40, "ivy@school.edu")),
+    ('add_course', ("C1", "Math", "I1")),
+    ('add_course', ("C2", "Art", None)),
+    ('add_course', ("C3", "Music", "I9")),
+    ('add_course', ("C1", "Math", "I1")),
+    ('add_student', ("S1", "Ann", 20, "ann@school.edu")),
+    ('add_student', ("S2", "Bob", 25, "bob@school.edu")),
+    ('add_student', ("T1", "Tom", 30, "tom@school.edu")),
+    ('add_student', ("S3", "Cat", None, None)),
+    ('add_student', ("S1", "Ann", 20, "ann@school.edu")),
+    ('update_student', ("S2", "Bob", 26, "bob@uni.edu")),
+    ('update_student', ("S9", "Nobody", 1, "")),
+    ('update_instructor', ("I2", "Ian", 51, "ian@uni.edu")),
+    ('update_instructor', ("I9", "Nobody", 1, "")),
+    ('update_course', ("C2", "Fine Art", "I2")),
+    ('update_course', ("C2", "Fine Art", "I9")),
+    ('update_course', ("C9", "Nothing", "I1")),
+    ('update_course', ("C9", "Nothing", "I9")),
+    ('register', ("S1", "C1")),
+    ('register', ("S1", "C1")),
+    ('register', ("S9", "C1")),
+    ('register', ("S1", "C9")),
+    ('register_many', (["C1", "C2"], ["S1", "S2", "S9", "S2"])),
+    ('register_many', (["C1", "C9"],)),
+    ('register_many', (["C2"], None, StudentFilter(id_prefix="S", min_age=21))),
+    ('register_many', (["C1"], ["S3", "T1"], StudentFilter(max_age=29))),
+    ('register_many', (["C1"], ["T1", "S3"], StudentFilter(id_prefix="T"))),
+    ('register_many', (["C2"],)),
+    ('courses_of_student', ("S2",)),
+    ('students_in_course', ("C1",)),
+    ('students_in_course', ("C2",)),
+    ('unregister', ("S1", "C2")),
+    ('unregister', ("S1", "C2")),
+    ('get_student', ("S2",)),
+    ('get_student', ("S9",)),
+    ('get_instructor', ("I2",)),
+    ('get_course', ("C1",)),
+    ('get_course', ("C2",)),
+    ('get_course', ("C9",)),
+    ('choices', ('students',)),
+    ('choices', ('students', "S1", 2)),
+    ('choices', ('courses', "C2")),
+    ('delete_instructor', ("I1",)),
+    ('delete_instructor', ("I9",)),
+    ('delete_course', ("C1",)),
+    ('delete_course', ("C1",)),
+    ('delete_instructor', ("I1",)),
+    ('delete_student', ("S2",)),
+    ('delete_student', ("S2",)),
+    ('students_in_course', ("C2",)),
+    ('count', ('students',)),
+    ('count', ('instructors',)),
+    ('count', ('courses',)),
+    ('count', ('registrations',)),
+]
+
+
+def run(repository, method, args):
+    try:
+        result = getattr(repository, method)(*args)
+    except RepositoryError as e:
+        return type(e).__name__, str(e)
+    if isinstance(result, (Student, Instructor)):
+        return result.to_row()
+    if isinstance(result, Course):
+        return result.to_row(), result.instructor.to_row() if result.instructor else None
+    if isinstance(result, list):
+        return [tuple(item) if isinstance(item, tuple) else item for item in result]
+    return result
+
+
+def test_sqlite_and_memory_repositories_agree(db):
+    sqlite, memory = SQLiteRepository(db), MemoryRepository()
+    for method, args in STEPS:
+        assert run(sqlite, method, args) == run(memory, method, args), (method, args)
@@ -0,0 +1,39 @@
+import pytest
+
+from database import insert_statement
+from schema import MIGRATION_PROGRESS_TABLE, MIGRATIONS, SCHEMA_VERSION, Backfill, migrate, schema_version
+
+
+def lowercase_emails(conn, first, last):
+    conn.execute("UPDATE students SET email=lower(email) WHERE rowid > ? AND rowid <= ?", (first, last))
+
+
+def test_interrupted_backfill_resumes_after_last_committed_batch(db):
+    db.executemany(insert_statement('students'),
+                   [(f"S{i:02d}", f"Student {i}", 20, f"S{i:02d}@SCHOOL.EDU") for i in range(10)])
+    db.commit()
+    ranges = []
+
+    def interrupted(conn, first, last):
+        if len(ranges) == 2:
+            raise KeyboardInterrupt
+        ranges.append((first, last))
+        lowercase_emails(conn, first, last)
+
+    version = SCHEMA_VERSION + 1
+    with pytest.raises(KeyboardInterrupt):
+        migrate(db, batch_size=3, migrations=MIGRATIONS + [(version, "test backfill", Backfill('students', interrupted))])
+    assert schema_version(db) == SCHEMA_VERSION
+    assert db.execute(f"SELECT position FROM {MIGRATION_PROGRESS_TABLE} WHERE version=?",
+                      (version,)).fetchone() == (6,)
+    assert db.execute("SELECT COUNT(*) FROM students WHERE email=lower(email)").fetchone()[0] == 6
+
+    def resumed(conn, first, last):
+        ranges.append((first, last))
+        lowercase_emails(conn, first, last)
+
+    migrate(db, batch_size=3, migrations=MIGRATIONS + [(version, "test backfill", Backfill('students', resumed))])
+    assert ranges == [(0, 3), (3, 6), (6, 9), (9, 10)]
+    assert schema_version(db) == version
+    assert db.execute(f"SELECT COUNT(*) FROM {MIGRATION_PROGRESS_TABLE}").fetchone()[0] == 0
+    assert db.execute("SELECT COUNT(*) FROM students WHERE email=lower(email)").fetchone()[0] == 10
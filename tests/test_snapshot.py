@@ -0,0 +1,53 @@
+import json
+
+from database import Database, insert_statement
+from schema import migrate
+from snapshot import BINARY_FORMAT, load_snapshot, save_snapshot
+from test_csv_io import dump, populate
+
+
+def migrated_copy(tmp_path, name='copy.db'):
+    copy = Database(str(tmp_path / name))
+    migrate(copy)
+    return copy
+
+
+def test_json_lines_round_trip(db, tmp_path):
+    populate(db)
+    db.execute(insert_statement('students'), ("S9", "Zoë \"Z\" Ünal\n", None, None))
+    db.commit()
+    counts = save_snapshot(db, str(tmp_path))
+    assert counts == {'students': 6, 'instructors': 1, 'courses': 2, 'registrations': 3}
+
+    copy = migrated_copy(tmp_path)
+    assert load_snapshot(copy, str(tmp_path)) == counts
+    assert dump(copy) == dump(db)
+    copy.close()
+
+
+def test_loads_legacy_json_arrays_without_registrations(tmp_path):
+    (tmp_path / 'students.json').write_text(json.dumps([{'student_id': 'S1', 'name': 'Ann', 'age': 20,
+                                                         '_email': 'ann@school.edu'}]), encoding='utf-8')
+    (tmp_path / 'instructors.json').write_text(json.dumps([{'instructor_id': 'I1', 'name': 'Ivy', 'age': 40,
+                                                            'email': 'ivy@school.edu'}]), encoding='utf-8')
+    (tmp_path / 'courses.json').write_text(json.dumps([{'course_id': 'C1', 'course_name': 'Math',
+                                                        'instructor': 'Ivy'}]), encoding='utf-8')
+    copy = migrated_copy(tmp_path)
+    assert load_snapshot(copy, str(tmp_path)) == {'students': 1, 'instructors': 1, 'courses': 1}
+    assert copy.execute("SELECT * FROM students").fetchall() == [("S1", "Ann", 20, "ann@school.edu")]
+    assert copy.execute("SELECT * FROM courses").fetchall() == [("C1", "Math", "I1")]
+    copy.close()
+
+
+def test_binary_round_trip(db, tmp_path):
+    populate(db)
+    db.execute(insert_statement('students'), ("S9", "Zoë Ünal", None, None))
+    db.execute("DELETE FROM registrations")
+    db.commit()
+    counts = save_snapshot(db, str(tmp_path), snapshot_format=BINARY_FORMAT)
+    assert counts == {'students': 6, 'instructors': 1, 'courses': 2, 'registrations': 0}
+
+    copy = migrated_copy(tmp_path)
+    assert load_snapshot(copy, str(tmp_path), snapshot_format=BINARY_FORMAT) == counts
+    assert dump(copy) == dump(db)
+    copy.close()
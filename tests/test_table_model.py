@@ -0,0 +1,48 @@
+from database import RECORDS_SQL, insert_statement
+from reports import run_report
+from table_model import RecordTableModel
+from workers import DatabaseWriter
+
+from test_workers import wait_for
+
+
+def populate(db, students: int):
+    with db.transaction() as conn:
+        conn.execute(insert_statement('instructors'), ("I1", "Ivy", 40, "ivy@school.edu"))
+        conn.execute(insert_statement('courses'), ("C1", "Math", "I1"))
+        conn.executemany(insert_statement('students'),
+                         ((f"S{i:04d}", f"Student {i}", 20, f"s{i}@school.edu") for i in range(students)))
+        conn.executemany(insert_statement('registrations'), ((f"S{i:04d}", "C1") for i in range(10)))
+
+
+def test_model_streams_windows(qapp, db):
+    populate(db, 1000)
+    model = RecordTableModel(db, batch_size=100)
+    model.set_query(RECORDS_SQL)
+    assert model.rowCount() == 100 and model.canFetchMore()
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 1000 + 1 + 1
+    model.close()
+
+
+def test_open_cursor_does_not_hide_writer_commits(qapp, db):
+    populate(db, 1000)
+    model = RecordTableModel(db, batch_size=100)
+    model.set_query(RECORDS_SQL)
+    assert model.canFetchMore()
+
+    writer = DatabaseWriter(db)
+    try:
+        writer.submit(lambda repository: repository.add_student("S9999", "New", 20, "new@school.edu"))
+        writer.submit(lambda repository: repository.register("S9999", "C1"))
+        wait_for(qapp, writer)
+    finally:
+        writer.close()
+
+    _, rows = run_report(db, 'course_enrolment')
+    assert rows == [("C1", "Math", "I1", 11)]
+    with db.transaction() as conn:
+        conn.execute("DROP INDEX IF EXISTS idx_registrations_course")
+    assert model.canFetchMore()
+    model.close()
@@ -0,0 +1,95 @@
+import sqlite3
+import time
+
+from database import DEFAULT_PRAGMAS, Database
+from workers import DatabaseWriter
+
+
+def wait_for(qapp, writer: DatabaseWriter, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while writer.pending():
+        assert time.monotonic() < deadline, "writer did not deliver its results"
+        qapp.processEvents()
+        time.sleep(0.001)
+
+
+def submit(writer: DatabaseWriter, command):
+    outcome = {}
+    writer.submit(command, lambda result: outcome.setdefault('done', result),
+                  lambda message: outcome.setdefault('error', message))
+    return outcome
+
+
+def test_writes_are_visible_on_the_shared_connection(qapp, db):
+    writer = DatabaseWriter(db)
+    try:
+        outcome = submit(writer, lambda repository: repository.add_student("S1", "Alice", 20, "alice@school.edu"))
+        wait_for(qapp, writer)
+        assert 'done' in outcome
+        assert db.execute("SELECT name FROM students WHERE student_id='S1'").fetchone() == ("Alice",)
+    finally:
+        writer.close()
+
+
+def test_failed_command_only_rolls_back_itself(qapp, db):
+    writer = DatabaseWriter(db)
+    try:
+        first = submit(writer, lambda repository: repository.add_student("S1", "Alice", 20, "alice@school.edu"))
+        duplicate = submit(writer, lambda repository: repository.add_student("S1", "Again", 20, "a@school.edu"))
+        wait_for(qapp, writer)
+        assert 'done' in first and 'error' in duplicate
+        assert db.execute("SELECT name FROM students").fetchall() == [("Alice",)]
+    finally:
+        writer.close()
+
+
+def test_failed_commit_discards_the_batch(qapp, tmp_path):
+    # Rollback-journal mode, so a reader's SHARED lock makes the writer's COMMIT fail at once.
+    pragmas = dict(DEFAULT_PRAGMAS, journal_mode='DELETE', busy_timeout=0)
+    db = Database(str(tmp_path / 'school.db'), pragmas)
+    db.create_tables()
+    writer = DatabaseWriter(db)
+    reader = sqlite3.connect(db.path, timeout=0)
+    try:
+        reader.execute("BEGIN")
+        reader.execute("SELECT COUNT(*) FROM students").fetchone()
+        locked = submit(writer, lambda repository: repository.add_student("S1", "Alice", 20, "alice@school.edu"))
+        wait_for(qapp, writer)
+        assert 'error' in locked
+        reader.rollback()
+
+        later = submit(writer, lambda repository: repository.add_student("S2", "Bob", 21, "bob@school.edu"))
+        wait_for(qapp, writer)
+        assert 'done' in later
+        assert reader.execute("SELECT student_id FROM students").fetchall() == [("S2",)]
+    finally:
+        reader.close()
+        writer.close()
+        db.close()
+
+
+def run_task(task):
+    """Runs a task on the calling thread and returns the name and arguments of its last signal."""
+    outcome = []
+    for name in ('finished', 'cancelled', 'failed'):
+        getattr(task.signals, name).connect(lambda *args, name=name: outcome.append((name, args)))
+    task.run()
+    assert len(outcome) == 1
+    return outcome[0]
+
+
+def test_export_task_round_trip(qapp, db, tmp_path):
+    from workers import ExportTask
+    db.execute("INSERT INTO students VALUES ('S1', 'Alice', 20, 'alice@school.edu')")
+    db.commit()
+    name, (counts,) = run_task(ExportTask(db, str(tmp_path / 'export.csv')))
+    assert name == 'finished' and counts['students'] == 1
+
+
+def test_export_task_reports_unexpected_errors(qapp, db, tmp_path, monkeypatch):
+    import workers
+
+    def broken(*args, **kwargs):
+        raise ValueError("bad value")
+    monkeypatch.setattr(workers, 'export_csv', broken)
+    assert run_task(workers.ExportTask(db, str(tmp_path / 'export.csv'))) == ('failed', ("bad value",))
@@ -0,0 +1,35 @@
+import re
+
+EMAIL_PATTERN = re.compile(r"[^@]+@[^@]+\.[^@]+")
+
+
+def is_valid_email(email: str) -> bool:
+    """
+    Checks if an email address is valid.
+
+    :param email: The email address to validate
+    :type email: str
+    :return: True if the email is valid, False otherwise
+    :rtype: bool
+    """
+    return EMAIL_PATTERN.match(email) is not None
+
+
+def validate_person_data(name: str, age: int, email: str):
+    """
+    Validates the data for a person (Student or Instructor).
+
+    :param name: The name to validate
+    :type name: str
+    :param age: The age to validate
+    :type age: int
+    :param email: The email address to validate
+    :type email: str
+    :raises ValueError: If any of the data is invalid
+    """
+    if not name:
+        raise ValueError("Name cannot be empty")
+    if age < 0:
+        raise ValueError("Age cannot be negative")
+    if not is_valid_email(email):
+        raise ValueError("Invalid email format")
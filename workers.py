@@ -0,0 +1,438 @@
+import queue
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from csv_io import CSV_FILE, ExportCancelled, ImportCancelled, export_csv, import_csv
+from database import Database
+from profiling import get_profiler
+from repository import SQLiteRepository
+from search import build_search_query
+
+
+class SearchSignals(QObject):
+    """
+    Signals emitted by a SearchTask. Each carries the generation of the search that produced it.
+    """
+    rows_ready = pyqtSignal(int, list)
+    finished = pyqtSignal(int)
+    failed = pyqtSignal(int, str)
+
+
+class SearchTask(QRunnable):
+    """
+    Runs one search query on a worker thread and streams the rows back in batches.
+
+    The task uses its own connection so that :meth:`cancel` can abort it
+    mid-query through ``sqlite3.Connection.interrupt``.
+
+    :param db: The database to search
+    :type db: Database
+    :param generation: The number identifying this search
+    :type generation: int
+    :param sql: The SQL statement to run
+    :type sql: str
+    :param params: The statement parameters
+    :type params: Sequence[Any]
+    :param batch_size: The number of rows per emitted batch, defaults to 200
+    :type batch_size: int, optional
+    :param max_rows: The maximum number of rows to stream, defaults to 5000
+    :type max_rows: int, optional
+    """
+
+    def __init__(self, db: Database, generation: int, sql: str, params: Sequence[Any],
+                 batch_size: int = 200, max_rows: int = 5000):
+
+        super().__init__()
+        self.db = db
+        self.generation = generation
+        self.sql = sql
+        self.params = params
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.signals = SearchSignals()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cancelled = False
+
+    def cancel(self):
+        """
+        Stops the task, interrupting its query if it is already running.
+        """
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def run(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._conn = self.db.connect()
+        try:
+            cursor = self._conn.execute(self.sql, self.params)
+            sent = 0
+            while sent < self.max_rows and not self._cancelled:
+                rows = cursor.fetchmany(min(self.batch_size, self.max_rows - sent))
+                if not rows:
+                    break
+                sent += len(rows)
+                self.signals.rows_ready.emit(self.generation, rows)
+            if not self._cancelled:
+                self.signals.finished.emit(self.generation)
+        except sqlite3.Error as e:
+            if not self._cancelled:
+                self.signals.failed.emit(self.generation, str(e))
+        finally:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+
+class SearchController(QObject):
+    """
+    Debounces search-box keystrokes and runs the newest search on a worker thread.
+
+    Scheduling a new search cancels the one in flight, and only the rows of the
+    newest search are re-emitted.
+
+    :param db: The database to search
+    :type db: Database
+    :param delay_ms: How long typing must pause before a search starts, defaults to 250
+    :type delay_ms: int, optional
+    :param parent: The parent object, defaults to None
+    :type parent: QObject, optional
+    """
+    started = pyqtSignal()
+    rows_ready = pyqtSignal(list)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, db: Database, delay_ms: int = 250, parent: Optional[QObject] = None):
+
+        super().__init__(parent)
+        self.db = db
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self._start)
+        self._query = ""
+        self._generation = 0
+        self._task: Optional[SearchTask] = None
+
+    def schedule(self, query: str):
+        """
+        Restarts the debounce timer for a new query.
+
+        :param query: The text to search for
+        :type query: str
+        """
+        self._query = query
+        self.timer.start()
+
+    def cancel(self):
+        """
+        Drops the pending search and cancels the one in flight.
+        """
+        self.timer.stop()
+        self._generation += 1
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _start(self):
+        self.cancel()
+        sql, params = build_search_query(self.db, self._query)
+        task = SearchTask(self.db, self._generation, sql, params)
+        task.signals.rows_ready.connect(self._on_rows)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._task = task
+        self.started.emit()
+        self.pool.start(task)
+
+    def _on_rows(self, generation: int, rows: list):
+        if generation == self._generation:
+            self.rows_ready.emit(rows)
+
+    def _on_finished(self, generation: int):
+        if generation == self._generation:
+            self._task = None
+            self.finished.emit()
+
+    def _on_failed(self, generation: int, message: str):
+        if generation == self._generation:
+            self._task = None
+            self.failed.emit(message)
+
+
+class ExportSignals(QObject):
+    """
+    Signals emitted by an ExportTask. Every run ends with exactly one of finished, cancelled or failed.
+    """
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(dict)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+
+class ExportTask(QRunnable):
+    """
+    Runs a streaming CSV export on a worker thread with its own connection.
+
+    :param db: The database to export
+    :type db: Database
+    :param filename: The name of the combined CSV file, defaults to CSV_FILE
+    :type filename: str, optional
+    :param per_entity: Whether each entity gets its own file, defaults to False
+    :type per_entity: bool, optional
+    :param compress: Whether to gzip the files, defaults to False
+    :type compress: bool, optional
+    """
+
+    def __init__(self, db: Database, filename: str = CSV_FILE, per_entity: bool = False, compress: bool = False):
+
+        super().__init__()
+        self.db = db
+        self.filename = filename
+        self.per_entity = per_entity
+        self.compress = compress
+        self.signals = ExportSignals()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cancelled = False
+
+    def cancel(self):
+        """
+        Stops the export after the current batch, interrupting a running query.
+        """
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def run(self):
+        with self._lock:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+        try:
+            with self._lock:
+                self._conn = self.db.connect()
+            with get_profiler().profile('export_to_csv', label='export_to_csv-worker'):
+                counts = export_csv(self._conn, self.filename, self.per_entity, self.compress,
+                                    progress=self.signals.progress.emit,
+                                    is_cancelled=lambda: self._cancelled)
+            self.signals.finished.emit(counts)
+        except ExportCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            # Anything else would be swallowed by the thread pool, leaving the window waiting forever.
+            if self._cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e) or type(e).__name__)
+        finally:
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+
+class ImportSignals(QObject):
+    """
+    Signals emitted by an ImportTask. Progress is reported in KiB read. Every run ends with exactly one of
+    finished, cancelled or failed.
+    """
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(dict)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+
+class ImportTask(QRunnable):
+    """
+    Runs a chunked CSV import on a worker thread with its own connection.
+
+    :param db: The database to import into
+    :type db: Database
+    :param filename: The name of the CSV file, defaults to CSV_FILE
+    :type filename: str, optional
+    """
+
+    def __init__(self, db: Database, filename: str = CSV_FILE):
+
+        super().__init__()
+        self.db = db
+        self.filename = filename
+        self.signals = ImportSignals()
+        self._lock = threading.Lock()
+        self._worker_db: Optional[Database] = None
+        self._cancelled = False
+
+    def cancel(self):
+        """
+        Stops the import after the current batch, interrupting a running statement.
+        """
+        with self._lock:
+            self._cancelled = True
+            if self._worker_db is not None:
+                self._worker_db.connection.interrupt()
+
+    def run(self):
+        with self._lock:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+            self._worker_db = Database(self.db.path, self.db.pragmas)
+        try:
+            counts = import_csv(self._worker_db, self.filename,
+                                progress=lambda done, total: self.signals.progress.emit(done // 1024, total // 1024),
+                                is_cancelled=lambda: self._cancelled)
+            self.signals.finished.emit(counts)
+        except ImportCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            # Such as csv.Error on a malformed file; the thread pool would swallow it and leave the dialog open.
+            if self._cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e) or type(e).__name__)
+        finally:
+            with self._lock:
+                self._worker_db.close()
+                self._worker_db = None
+
+
+class WriteRejected(Exception):
+    """
+    Raised by a write command to fail with a message. Only that command's changes are rolled back.
+    """
+
+
+class DatabaseWriter(QObject):
+    """
+    Runs database writes on a dedicated thread so handlers never wait on SQLite.
+
+    Commands are callables taking a :class:`SQLiteRepository` on the writer's own
+    connection. The thread takes every command queued since the last commit,
+    runs each in its own savepoint and commits them together, so a burst of
+    edits costs one commit. A command that raises only rolls back its own
+    savepoint. Results come back on the GUI
+    thread through :attr:`finished` and :attr:`failed`, and through the optional
+    callbacks given to :meth:`submit`.
+
+    :param db: The database to write to; the writer opens its own connection to the same file
+    :type db: Database
+    :param max_batch: The maximum number of commands committed together, defaults to 256
+    :type max_batch: int, optional
+    :param parent: The parent object, defaults to None
+    :type parent: QObject, optional
+    """
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    _completed = pyqtSignal(list)
+
+    def __init__(self, db: Database, max_batch: int = 256, parent: Optional[QObject] = None):
+
+        super().__init__(parent)
+        self.db = Database(db.path, db.pragmas)
+        self.repository = SQLiteRepository(self.db)
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Tuple[int, Callable[[SQLiteRepository], Any]]]]" = queue.Queue()
+        self._callbacks: Dict[int, Tuple[Optional[Callable[[Any], None]], Optional[Callable[[str], None]]]] = {}
+        self._next_id = 0
+        self._completed.connect(self._dispatch)
+        self._thread = threading.Thread(target=self._run, name='DatabaseWriter', daemon=True)
+        self._thread.start()
+
+    def submit(self, command: Callable[[SQLiteRepository], Any],
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None) -> int:
+        """
+        Queues a write command.
+
+        :param command: Called on the writer thread with its repository; its return value is the result
+        :type command: Callable[[SQLiteRepository], Any]
+        :param on_done: Called on the GUI thread with the result once the command is committed
+        :type on_done: Callable[[Any], None], optional
+        :param on_error: Called on the GUI thread with the error message if the command failed
+        :type on_error: Callable[[str], None], optional
+        :return: The request ID carried by finished and failed
+        :rtype: int
+        """
+        self._next_id += 1
+        self._callbacks[self._next_id] = (on_done, on_error)
+        self._queue.put((self._next_id, command))
+        return self._next_id
+
+    def pending(self) -> int:
+        """
+        The number of submitted commands whose results have not been delivered yet.
+        """
+        return len(self._callbacks)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Commits every queued command, then stops the writer thread and closes its connection.
+
+        :param timeout: The number of seconds to wait for the thread, defaults to waiting until it stops
+        :type timeout: float, optional
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [item for item in batch if item is not None]
+            if batch:
+                self._completed.emit(self._write(batch))
+        self.db.close()
+
+    def _write(self, batch: List[Tuple[int, Callable[[SQLiteRepository], Any]]]) -> List[Tuple[int, bool, Any]]:
+        results = []
+        try:
+            with self.db.transaction() as conn:
+                for request_id, command in batch:
+                    conn.execute("SAVEPOINT command")
+                    try:
+                        result = command(self.repository)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO command")
+                        results.append((request_id, False, str(e)))
+                    else:
+                        results.append((request_id, True, result))
+                    conn.execute("RELEASE command")
+        except sqlite3.Error as e:
+            # The whole batch failed, such as a COMMIT refused while the file was locked. Nothing
+            # of it may stay in the connection to be committed with the next batch.
+            if self.db.connection.in_transaction:
+                self.db.rollback()
+            return [(request_id, False, str(e)) for request_id, _ in batch]
+        return results
+
+    def _dispatch(self, results: List[Tuple[int, bool, Any]]):
+        for request_id, ok, value in results:
+            on_done, on_error = self._callbacks.pop(request_id, (None, None))
+            if ok:
+                self.finished.emit(request_id, value)
+                if on_done is not None:
+                    on_done(value)
+            else:
+                self.failed.emit(request_id, value)
+                if on_error is not None:
+                    on_error(value)